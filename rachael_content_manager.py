@@ -6,23 +6,242 @@ Based on Ocean Bight Content Manager pattern
 """
 
 import os
+import sys
 import shutil
 import re
 import json
-from datetime import datetime
+import gzip
+import zlib
+import io
+import time
+import struct
+import colorsys
+import hashlib
+import copy
+import mmap
+import argparse
+import heapq
+import bisect
+import queue
+import threading
+import traceback
+import uuid
+import math
+import random
+import socket
+import subprocess
+import asyncio
+import mimetypes
+import posixpath
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from html import escape, unescape
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Optional: pip install Pillow
+    Image = None
+    ImageOps = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Build configuration
+BUILD_OUTPUT_DIR = "_site"
+BUILD_STATE_DIR = ".build_cache"
+SITE_PAGES = ['index.html', 'about.html', 'updates.html', 'contact.html',
+              'available.html', 'project.html']
+SITE_SHELL_ASSETS = ['styles.css', 'script.js']
+SITE_EXTRA_FILES = ['CNAME']
+WEB_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif'}
+WEB_MEDIA_EXTENSIONS = WEB_IMAGE_EXTENSIONS | {'.mov', '.mp4', '.webm'}
+
+# Same lookup order as loadGridBackgroundImages() in script.js
+GRID_IMAGE_NAMES = [
+    'main.png', 'main.jpg', 'main.JPG', 'main.jpeg',
+    'primary.png', 'primary.jpg', 'primary.jpeg',
+    'hero.png', 'hero.jpg', 'hero.jpeg'
+]
+
+# Square index tiles cut from each project's main image, one per pixel density
+GRID_TILE_SIZES = [480, 960]
+GRID_TILE_DIR = "tiles"
+GRID_TILE_QUALITY = 80
+GRID_TILE_BACKGROUND = (108, 99, 0)  # Gold page under the .work-item shading, behind transparency
+GRID_TILE_SIZES_ATTRIBUTE = "(max-width: 768px) 100vw, (max-width: 900px) 50vw, min(33vw, 520px)"
+GRID_EAGER_TILES = 3  # First row of the grid
+GRID_CROP_SAMPLE_SIZE = 256
+GRID_CROP_STEP = 4
+
+# Scaled copies of each project page's hero, so the preload doesn't fetch the original
+HERO_IMAGE_SIZES = [800, 1600]
+HERO_IMAGE_DIR = "hero"
+HERO_IMAGE_QUALITY = 82
+HERO_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}  # Not GIFs: scaling drops the animation
+HERO_SIZES_ATTRIBUTE = "(max-width: 768px) 100vw, 50vw"
+
+BUILD_CACHE_VERSION = 1
+BUILD_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Builders sharing a cache directory make an output once per key stripe
+BUILD_CACHE_LOCK_STRIPES = 64
+
+# script.js is split into shared code and these page-specific chunks, by the
+# functions each chunk declares; a page loads a chunk when it contains the marker
+SCRIPT_CHUNKS = {
+    'grid': ['animateWorkItems', 'loadGridBackgroundImages'],
+    'project': ['loadProjectContent', 'showProjectContent', 'showProjectError',
+                'loadProjectImages', 'renderProjectImages', 'setImageDimensions',
+                'probeProjectImages', 'showImagePlaceholders']
+}
+SCRIPT_CHUNK_PAGES = {'grid': 'class="work-grid"', 'project': 'id="project-main-image"'}
+PROJECT_DATA_PATTERN = re.compile(r'^(?://[^\n]*\n)*const projectData = ')
+PROJECT_DATA_FIELDS = ['title', 'subtitle', 'description', 'folder']
+MINIFIED_EXTENSIONS = {'.html', '.css', '.js'}
+JS_PARSE_MS_PER_KB = 1.0  # Rough parse/compile cost on a mid-range phone, for the script report
+
+# Text outputs that get pre-compressed .br/.gz siblings
+COMPRESSIBLE_EXTENSIONS = {'.html', '.css', '.js', '.json', '.xml', '.svg', '.txt', '.webmanifest'}
+COMPRESSED_SUFFIXES = ['.gz', '.br']
+
+# Available works (admin_data/available_works.json); statuses in display order
+AVAILABLE_STATUSES = {'available': 'Available', 'on hold': 'On Hold', 'sold': 'SOLD'}
+AVAILABLE_WORK_FIELDS = {'title': str, 'medium': str, 'dimensions': str, 'price': float,
+                         'status': str, 'images': list}
+
+# CV (admin_data/cv_sections.json): '<years> - <text>' lines and about.html sections
+CV_ENTRY_PATTERN = re.compile(r'^(\d{4}(?:\s*[-–]\s*(?:\d{4}|present))?(?:\s*\([^)]*\))?)\s+-\s+(.*)$',
+                              re.I)
+CV_SECTION_PATTERN = re.compile(r'<div class="cv-section">\s*<h2>(.*?)</h2>\s*'
+                                r'<ul class="cv-list">(.*?)</ul>\s*</div>', re.S)
+
+# Updates (admin_data/updates.json): listing pages, permalinks and feeds
+UPDATES_PER_PAGE = 5
+FEED_LIMIT = 20
+FEED_TITLE = "Rachael Juzeler | Updates"
+FEED_DESCRIPTION = "News and announcements from Rachael Juzeler"
+FEED_LINKS = ('    <link rel="alternate" type="application/rss+xml" title="Updates" href="feed.xml">\n'
+              '    <link rel="alternate" type="application/atom+xml" title="Updates" href="atom.xml">\n'
+              '    <link rel="alternate" type="application/feed+json" title="Updates" href="feed.json">\n')
+
+# Imports read each source once, in slices of this size
+IMPORT_CHUNK_SIZE = 8 * 1024 * 1024
+# Extensions an import may keep for a sniffed format (the first one is used otherwise)
+SNIFFED_EXTENSIONS = {'jpeg': ('.jpg', '.jpeg'), 'png': ('.png',), 'gif': ('.gif',),
+                      'webp': ('.webp',), 'video': ('.mp4', '.mov', '.webm')}
+# Names an import gives project files; a new upload replaces all of them
+PROJECT_IMAGE_NAME = re.compile(r'^(main|detail-\d+)\.\w+$')
+
+# Image catalog
+CATALOG_VERSION = 2
+CATALOG_EXTENSIONS = WEB_MEDIA_EXTENSIONS | {'.bmp', '.tif', '.tiff'}
+CATALOG_STAT_FIELDS = {'path', 'size', 'mtime_ns', 'modified'}
+PALETTE_SAMPLE_SIZE = 64
+PALETTE_COLOURS = 5
+COLOUR_FAMILIES = ['red', 'orange', 'yellow', 'chartreuse', 'green', 'spring',
+                   'cyan', 'azure', 'blue', 'violet', 'magenta', 'rose']
+
+# Perceptual hashes: 64-bit dHash, near-duplicates within this Hamming distance
+DHASH_SIZE = 8
+NEAR_DUPLICATE_DISTANCE = 6
+
+# Mirrors the names loadProjectImages() in script.js probes for without a build
+MAIN_IMAGE_STEMS = ['main', 'primary', 'hero']
+GALLERY_PROBE_NAMES = ['detail-1', 'detail-2', 'detail-3', 'detail-4', 'detail-5',
+                       'process-1', 'process-2', 'installation', 'overview', 'close-up',
+                       'macro', 'environment', 'context']
+PROBE_EXTENSIONS = ['jpg', 'jpeg', 'png', 'webp', 'gif']
+MAX_PROBED_GALLERY_IMAGES = 8
+
+# Garbage collection of unreferenced images/ and admin_data/ files
+QUARANTINE_DIR = ".quarantine"
+GC_GRACE_SECONDS = 60 * 60
+ADMIN_DATA_FILES = ['projects.json', 'cv_sections.json', 'updates.json',
+                    'available_works.json', 'contact_info.json']
+
+# Several editors at once: advisory locks, change polling and watch builds
+DATA_LOCK_TIMEOUT = 10
+BUILD_LOCK_TIMEOUT = 10 * 60
+LOCK_RETRY_SECONDS = 0.05
+DATA_POLL_MS = 2000
+WATCH_INTERVAL_SECONDS = 2
+
+# Content history: admin_data/ and images/ snapshots in .history/
+HISTORY_DIR = ".history"
+HISTORY_CHECKPOINT_INTERVAL = 16
+# Linux ioctl for a copy-on-write clone (btrfs, XFS, bcachefs); history copies use it when it works
+FICLONE = 0x40049409
+
+# Local server and load test
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8000
+SERVE_BACKLOG = 256
+SERVE_CHUNK_SIZE = 64 * 1024
+SERVE_ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+SERVE_CACHE_CONTROL = {extension: 'public, max-age=86400' for extension in WEB_MEDIA_EXTENSIONS}
+LOAD_TEST_CONCURRENCY = 50
+LOAD_TEST_VISITS = 500
+LOAD_TEST_GALLERY_IMAGES = 4
+LOAD_TEST_CONNECTIONS = 6  # Per visitor, like a browser per host
+LOAD_TEST_MEDIA_BYTES = 1024 * 1024
+LOAD_TEST_TIMEOUT = 30
+LOAD_TEST_ACCEPT_ENCODING = "br, gzip"
+
+# Link checker
+REFERENCE_ATTRIBUTES = {'href', 'src', 'poster', 'data-src'}
+CSS_URL_PATTERN = re.compile(r'url\(\s*[\'"]?([^\'")]+?)[\'"]?\s*\)')
+JS_PATH_PATTERN = re.compile(r'[\'"`]([\w./-]+\.(?:html|js|css|json))[\'"`]')
+EXTERNAL_REF_PATTERN = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+CHECK_SKIP_DIRS = {'admin_data', '__pycache__', BUILD_OUTPUT_DIR, BUILD_STATE_DIR, QUARANTINE_DIR,
+                   HISTORY_DIR}
+# Size budgets from ADDING_IMAGES.md / README.md
+GRID_IMAGE_SIZE_LIMIT = 500 * 1024
+IMAGE_SIZE_LIMIT = 1024 * 1024
+TEXT_SIZE_LIMIT = 200 * 1024
+
+# Background jobs
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+JOB_WORKERS = min(4, os.cpu_count() or 1)
+JOB_HISTORY_LIMIT = 50
+JOB_LOG_LIMIT = 200
+JOB_POLL_MS = 250
+# How often idle workers look for jobs another process queued or cancelled
+JOB_SYNC_SECONDS = 2
+
+# Several site roots managed from one process
+WORKSPACE_FILE = "workspace.json"
+
+# Service worker runtime image cache budget
+IMAGE_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
 class RachaelContentManager:
-    def __init__(self, root):
+    def __init__(self, root, project_dir=None, job_queue=None, site_name=None):
         self.root = root
-        self.root.title("Rachael Juzeler Portfolio Content Manager")
+        self.site_name = site_name
+        self.root.title("Rachael Juzeler Portfolio Content Manager"
+                        + (f" - {site_name}" if site_name else ""))
         self.root.geometry("900x700")
         self.root.configure(bg="#786E00")  # Brand gold
 
         # Set up paths
-        self.project_dir = Path(__file__).parent
+        self.project_dir = Path(project_dir) if project_dir else Path(__file__).parent
 
         # Website files
         self.index_html = self.project_dir / "index.html"
@@ -46,6 +265,9 @@ class RachaelContentManager:
         self.projects_base_dir = self.project_dir / "images"
         self.projects_base_dir.mkdir(exist_ok=True)
 
+        # Versions of admin_data/ and images/ (HISTORY tab)
+        self.history = ContentHistory(self.project_dir)
+
         # Style configuration
         self.configure_styles()
 
@@ -54,12 +276,38 @@ class RachaelContentManager:
 
         # Initialize tracking variables
         self.current_project_id = None
+        self.current_work_id = None
+        self.current_update_id = None
         self.edit_image_paths = []
         self.new_image_paths = []
 
         # Load existing data
         self.load_data()
 
+        # Background jobs keep long operations off the Tk event loop
+        self.job_events = queue.Queue()
+        self.job_callbacks = {}
+        self.owns_job_queue = job_queue is None
+        if job_queue is None:
+            self.job_queue = JobQueue(self.project_dir,
+                                      on_event=lambda event, job, detail: self.job_events.put(
+                                          (event, job, detail)))
+            self.job_queue.start()
+        else:
+            # Workspace mode: one pool runs the jobs of every open site
+            self.job_queue = job_queue
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.job_poll = self.root.after(JOB_POLL_MS, self.poll_jobs)
+        self.data_poll = self.root.after(DATA_POLL_MS, self.poll_data_changes)
+
+        # Image metadata catalog (only changed files are rescanned)
+        self.image_catalog = ImageCatalog(self.project_dir)
+        self.show_catalog()
+        self.refresh_catalog()
+
+        # Record edits made outside the content manager since it last ran
+        self.record_history("Content manager opened")
+
     def configure_styles(self):
         """Configure ttk styles for Rachael's brand theme matching website header"""
         style = ttk.Style()
@@ -109,7 +357,8 @@ class RachaelContentManager:
         subtitle_label.pack()
 
         mgmt_label = tk.Label(header_frame,
-                             text="Portfolio Content Management System",
+                             text="Portfolio Content Management System"
+                                  + (f" - {self.site_name}" if self.site_name else ""),
                              font=('EB Garamond', 10, 'italic'),
                              bg='#786E00', fg='#333333')
         mgmt_label.pack(pady=(5, 0))
@@ -124,6 +373,10 @@ class RachaelContentManager:
         self.create_updates_tab(notebook)
         self.create_contact_tab(notebook)
         self.create_available_tab(notebook)
+        self.create_images_tab(notebook)
+        self.create_build_tab(notebook)
+        self.create_history_tab(notebook)
+        self.create_jobs_tab(notebook)
 
     def create_projects_tab(self, notebook):
         """Create projects management tab with scrolling"""
@@ -200,6 +453,13 @@ class RachaelContentManager:
                                                                  insertbackground='#000000')
         self.edit_project_description.pack(pady=5, padx=10)
 
+        tk.Label(existing_frame, text="Grid Focal Point (x%, y% from top left, blank = automatic):",
+                font=('EB Garamond', 10, 'bold'),
+                bg='#786E00', fg='#000000').pack(anchor='w', padx=10, pady=(10,0))
+        self.edit_project_focal_point = tk.Entry(existing_frame, width=60, font=('EB Garamond', 10),
+                                                bg='#786E00', fg='#000000', insertbackground='#000000')
+        self.edit_project_focal_point.pack(pady=5, padx=10)
+
         # Image management for existing projects
         img_frame = tk.Frame(existing_frame, bg='#786E00')
         img_frame.pack(pady=10, padx=10, fill='x')
@@ -365,22 +625,13 @@ class RachaelContentManager:
                 font=('EB Garamond', 10, 'bold'),
                 bg='#786E00', fg='#000000').pack(anchor='w', padx=10, pady=(10,0))
 
+        # Filled from the CV data in load_data(); typing a new name adds a section
         self.cv_section_select = ttk.Combobox(cv_frame, width=60,
-                                             font=('EB Garamond', 10),
-                                             values=[
-                                                 "Awards & Grants",
-                                                 "Public Works",
-                                                 "Museum Collections",
-                                                 "Selected Solo Exhibitions",
-                                                 "Selected Juried Shows & Group Exhibitions",
-                                                 "Selected Education & Training",
-                                                 "Board & Volunteer Positions",
-                                                 "Employment History"
-                                             ])
+                                             font=('EB Garamond', 10))
         self.cv_section_select.pack(pady=5, padx=10)
         self.cv_section_select.bind('<<ComboboxSelected>>', self.on_cv_section_selected)
 
-        tk.Label(cv_frame, text="Section Content (one item per line):",
+        tk.Label(cv_frame, text="Section Content (one item per line, e.g. \"2025 - Award name\"):",
                 font=('EB Garamond', 10, 'bold'),
                 bg='#786E00', fg='#000000').pack(anchor='w', padx=10, pady=(10,0))
         self.cv_content = scrolledtext.ScrolledText(cv_frame, width=60, height=6,
@@ -425,6 +676,13 @@ class RachaelContentManager:
                                          bg='#786E00', fg='#000000', insertbackground='#000000')
         self.edit_update_title.pack(pady=5, padx=10)
 
+        tk.Label(edit_frame, text="Date (YYYY-MM-DD):",
+                font=('EB Garamond', 10, 'bold'),
+                bg='#786E00', fg='#000000').pack(anchor='w', padx=10, pady=(10,0))
+        self.edit_update_date = tk.Entry(edit_frame, width=20, font=('EB Garamond', 10),
+                                        bg='#786E00', fg='#000000', insertbackground='#000000')
+        self.edit_update_date.pack(anchor='w', pady=5, padx=10)
+
         tk.Label(edit_frame, text="Content:",
                 font=('EB Garamond', 10, 'bold'),
                 bg='#786E00', fg='#000000').pack(anchor='w', padx=10, pady=(10,0))
@@ -468,6 +726,14 @@ class RachaelContentManager:
                                         bg='#786E00', fg='#000000', insertbackground='#000000')
         self.new_update_title.pack(pady=5, padx=10)
 
+        tk.Label(new_frame, text="Date (YYYY-MM-DD):",
+                font=('EB Garamond', 10, 'bold'),
+                bg='#786E00', fg='#000000').pack(anchor='w', padx=10, pady=(10,0))
+        self.new_update_date = tk.Entry(new_frame, width=20, font=('EB Garamond', 10),
+                                       bg='#786E00', fg='#000000', insertbackground='#000000')
+        self.new_update_date.insert(0, datetime.now().strftime('%Y-%m-%d'))
+        self.new_update_date.pack(anchor='w', pady=5, padx=10)
+
         tk.Label(new_frame, text="Content:",
                 font=('EB Garamond', 10, 'bold'),
                 bg='#786E00', fg='#000000').pack(anchor='w', padx=10, pady=(10,0))
@@ -617,20 +883,27 @@ class RachaelContentManager:
                                         bg='#786E00', fg='#000000', insertbackground='#000000')
         self.edit_work_medium.grid(row=1, column=1, sticky='w', padx=10)
 
-        tk.Label(work_fields_frame, text="Price:",
+        tk.Label(work_fields_frame, text="Dimensions:",
                 font=('EB Garamond', 10, 'bold'),
                 bg='#786E00', fg='#000000').grid(row=2, column=0, sticky='w', pady=2)
+        self.edit_work_dimensions = tk.Entry(work_fields_frame, width=40, font=('EB Garamond', 10),
+                                            bg='#786E00', fg='#000000', insertbackground='#000000')
+        self.edit_work_dimensions.grid(row=2, column=1, sticky='w', padx=10)
+
+        tk.Label(work_fields_frame, text="Price:",
+                font=('EB Garamond', 10, 'bold'),
+                bg='#786E00', fg='#000000').grid(row=3, column=0, sticky='w', pady=2)
         self.edit_work_price = tk.Entry(work_fields_frame, width=40, font=('EB Garamond', 10),
                                        bg='#786E00', fg='#000000', insertbackground='#000000')
-        self.edit_work_price.grid(row=2, column=1, sticky='w', padx=10)
+        self.edit_work_price.grid(row=3, column=1, sticky='w', padx=10)
 
         tk.Label(work_fields_frame, text="Status:",
                 font=('EB Garamond', 10, 'bold'),
-                bg='#786E00', fg='#000000').grid(row=3, column=0, sticky='w', pady=2)
+                bg='#786E00', fg='#000000').grid(row=4, column=0, sticky='w', pady=2)
         self.edit_work_status = ttk.Combobox(work_fields_frame, width=15,
                                             font=('EB Garamond', 10),
                                             values=["Available", "SOLD", "On Hold"])
-        self.edit_work_status.grid(row=3, column=1, sticky='w', padx=10)
+        self.edit_work_status.grid(row=4, column=1, sticky='w', padx=10)
 
         # Image upload for existing
         tk.Label(edit_frame, text="Replace Image:",
@@ -686,12 +959,19 @@ class RachaelContentManager:
                                        bg='#786E00', fg='#000000', insertbackground='#000000')
         self.new_work_medium.grid(row=1, column=1, sticky='w', padx=10)
 
-        tk.Label(new_work_fields, text="Price:",
+        tk.Label(new_work_fields, text="Dimensions:",
                 font=('EB Garamond', 10, 'bold'),
                 bg='#786E00', fg='#000000').grid(row=2, column=0, sticky='w', pady=2)
+        self.new_work_dimensions = tk.Entry(new_work_fields, width=40, font=('EB Garamond', 10),
+                                           bg='#786E00', fg='#000000', insertbackground='#000000')
+        self.new_work_dimensions.grid(row=2, column=1, sticky='w', padx=10)
+
+        tk.Label(new_work_fields, text="Price:",
+                font=('EB Garamond', 10, 'bold'),
+                bg='#786E00', fg='#000000').grid(row=3, column=0, sticky='w', pady=2)
         self.new_work_price = tk.Entry(new_work_fields, width=40, font=('EB Garamond', 10),
                                       bg='#786E00', fg='#000000', insertbackground='#000000')
-        self.new_work_price.grid(row=2, column=1, sticky='w', padx=10)
+        self.new_work_price.grid(row=3, column=1, sticky='w', padx=10)
 
         # Image upload for new
         tk.Label(new_frame, text="Image:",
@@ -714,12 +994,471 @@ class RachaelContentManager:
                  bg='#000000', fg='#786E00',
                  font=('EB Garamond', 12, 'bold')).pack(pady=15)
 
+    def create_images_tab(self, notebook):
+        """Create image catalog browser tab"""
+        frame = tk.Frame(notebook, bg='#786E00')
+        notebook.add(frame, text='IMAGES')
+
+        # Title
+        tk.Label(frame, text="Image Catalog",
+                font=('EB Garamond', 16, 'bold'),
+                bg='#786E00', fg='#000000').pack(pady=10)
+
+        filter_frame = tk.Frame(frame, bg='#786E00')
+        filter_frame.pack(fill='x', padx=20, pady=5)
+
+        tk.Label(filter_frame, text="Sort by:",
+                font=('EB Garamond', 10, 'bold'),
+                bg='#786E00', fg='#000000').grid(row=0, column=0, sticky='w', padx=(0, 5))
+        self.catalog_sort = ttk.Combobox(filter_frame, width=16, state='readonly',
+                                         font=('EB Garamond', 10),
+                                         values=["Newest first", "Oldest first", "Name", "Largest first"])
+        self.catalog_sort.set("Newest first")
+        self.catalog_sort.grid(row=0, column=1, padx=5)
+        self.catalog_sort.bind('<<ComboboxSelected>>', lambda e: self.show_catalog())
+
+        tk.Label(filter_frame, text="Colour:",
+                font=('EB Garamond', 10, 'bold'),
+                bg='#786E00', fg='#000000').grid(row=0, column=2, sticky='w', padx=(15, 5))
+        self.catalog_colour = ttk.Combobox(filter_frame, width=12, state='readonly',
+                                           font=('EB Garamond', 10),
+                                           values=["All"] + COLOUR_FAMILIES + ["neutral"])
+        self.catalog_colour.set("All")
+        self.catalog_colour.grid(row=0, column=3, padx=5)
+        self.catalog_colour.bind('<<ComboboxSelected>>', lambda e: self.show_catalog())
+
+        tk.Label(filter_frame, text="Orientation:",
+                font=('EB Garamond', 10, 'bold'),
+                bg='#786E00', fg='#000000').grid(row=0, column=4, sticky='w', padx=(15, 5))
+        self.catalog_orientation = ttk.Combobox(filter_frame, width=10, state='readonly',
+                                                font=('EB Garamond', 10),
+                                                values=["All", "landscape", "portrait", "square"])
+        self.catalog_orientation.set("All")
+        self.catalog_orientation.grid(row=0, column=5, padx=5)
+        self.catalog_orientation.bind('<<ComboboxSelected>>', lambda e: self.show_catalog())
+
+        tk.Button(filter_frame, text="Rescan Images",
+                 command=self.refresh_catalog,
+                 bg='#000000', fg='#786E00',
+                 font=('EB Garamond', 9, 'bold')).grid(row=0, column=6, padx=(15, 0))
+
+        tk.Button(filter_frame, text="Clean Up Unused",
+                 command=self.clean_up_files,
+                 bg='#000000', fg='#786E00',
+                 font=('EB Garamond', 9, 'bold')).grid(row=0, column=7, padx=(5, 0))
+
+        tk.Button(filter_frame, text="Undo Clean Up",
+                 command=self.undo_clean_up,
+                 bg='#000000', fg='#786E00',
+                 font=('EB Garamond', 9, 'bold')).grid(row=0, column=8, padx=(5, 0))
+
+        columns = ('path', 'size', 'date', 'camera', 'colour')
+        self.catalog_tree = ttk.Treeview(frame, columns=columns, show='headings', height=18)
+        for column, heading, width in (('path', 'File', 300), ('size', 'Dimensions', 100),
+                                       ('date', 'Date', 140), ('camera', 'Camera', 140),
+                                       ('colour', 'Colour', 80)):
+            self.catalog_tree.heading(column, text=heading)
+            self.catalog_tree.column(column, width=width, anchor='w')
+        self.catalog_tree.pack(fill='both', expand=True, padx=20, pady=10)
+
+    def refresh_catalog(self):
+        """Rescan changed images in the background, then refresh the catalog view"""
+        def on_done(job):
+            self.image_catalog.load()
+            self.show_catalog()
+
+        self.submit_job('catalog', priority=PRIORITY_LOW,
+                        description="Scan images", on_done=on_done)
+
+    def show_catalog(self):
+        """Fill the catalog list using the current sort and filters"""
+        sort_choice = self.catalog_sort.get()
+        sort = {'Name': 'name', 'Largest first': 'size'}.get(sort_choice, 'date')
+        colour = self.catalog_colour.get()
+        orientation = self.catalog_orientation.get()
+        entries = self.image_catalog.query(
+            colour=None if colour == 'All' else colour,
+            orientation=None if orientation == 'All' else orientation,
+            sort=sort,
+            reverse=sort_choice in ("Newest first", "Largest first"))
+
+        self.catalog_tree.delete(*self.catalog_tree.get_children())
+        for entry in entries:
+            dimensions = f"{entry['width']} x {entry['height']}" if entry.get('width') else ''
+            self.catalog_tree.insert('', tk.END, values=(
+                entry['path'][len('images/'):],
+                dimensions,
+                (entry.get('captured') or entry['modified']).replace('T', ' '),
+                entry.get('camera') or '',
+                entry.get('dominant_colour') or ''))
+
+    def clean_up_files(self):
+        """Find unused images and data files, then quarantine them after confirmation"""
+        def on_swept(job):
+            if job['status'] == 'failed':
+                messagebox.showerror("Error", f"Clean up failed: {job['error']}")
+                return
+            if job['status'] == 'done':
+                report = job['result']
+                messagebox.showinfo("Clean Up",
+                                    f"Moved {len(report['candidates'])} files "
+                                    f"({format_bytes(report['bytes'])}) to {QUARANTINE_DIR}/.\n\n"
+                                    f"Use Undo Clean Up to put them back.")
+                self.record_history(f"Cleaned up {len(report['candidates'])} unused files")
+                self.refresh_catalog()
+
+        def on_collected(job):
+            if job['status'] == 'failed':
+                messagebox.showerror("Error", f"Clean up failed: {job['error']}")
+                return
+            if job['status'] != 'done':
+                return
+            report = job['result']
+            if not report['candidates']:
+                messagebox.showinfo("Clean Up", "No unused files found.")
+                return
+            listing = "\n".join(f"{item['path']} ({format_bytes(item['size'])})"
+                                 for item in report['candidates'][:15])
+            if len(report['candidates']) > 15:
+                listing += f"\n... and {len(report['candidates']) - 15} more"
+            if messagebox.askyesno("Clean Up",
+                                   f"{len(report['candidates'])} files are not used by any page "
+                                   f"or project ({format_bytes(report['bytes'])}):\n\n{listing}\n\n"
+                                   f"Move them to the quarantine folder?"):
+                self.submit_job('gc', {'paths': [item['path'] for item in report['candidates']]},
+                                description="Clean up unused files", on_done=on_swept)
+
+        self.submit_job('gc', {'dry_run': True}, description="Find unused files",
+                        on_done=on_collected)
+
+    def undo_clean_up(self):
+        """Restore the files moved by the latest clean up"""
+        collector = GarbageCollector(self.project_dir)
+        sweep = collector.find_sweep()
+        if sweep is None:
+            messagebox.showinfo("Undo Clean Up", "Nothing to undo.")
+            return
+        if not messagebox.askyesno("Undo Clean Up",
+                                   f"Restore {len(sweep['files'])} files moved on "
+                                   f"{sweep['created'].replace('T', ' ')}?"):
+            return
+        try:
+            result = collector.undo(sweep['id'])
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to restore files: {e}")
+            return
+        if result['conflicts']:
+            messagebox.showwarning("Undo Clean Up",
+                                   "These files were not restored because a file with the "
+                                   "same name exists again:\n\n" + "\n".join(result['conflicts']))
+        self.record_history(f"Undid clean up {result['sweep_id']}")
+        self.refresh_catalog()
+
+    def create_build_tab(self, notebook):
+        """Create site build tab"""
+        frame = tk.Frame(notebook, bg='#786E00')
+        notebook.add(frame, text='BUILD')
+
+        # Title
+        tk.Label(frame, text="Build & Publish Site",
+                font=('EB Garamond', 16, 'bold'),
+                bg='#786E00', fg='#000000').pack(pady=10)
+
+        build_frame = tk.LabelFrame(frame, text=f"Site Output ({BUILD_OUTPUT_DIR}/)",
+                                   bg='#786E00', fg='#000000',
+                                   font=('EB Garamond', 12, 'bold'))
+        build_frame.pack(fill='both', expand=True, padx=20, pady=10)
+
+        self.build_btn_frame = tk.Frame(build_frame, bg='#786E00')
+        self.build_btn_frame.pack(pady=10)
+
+        tk.Button(self.build_btn_frame, text="Build Site",
+                 command=self.build_site,
+                 bg='#000000', fg='#786E00',
+                 font=('EB Garamond', 12, 'bold'),
+                 padx=20).pack(side='left', padx=5)
+
+        tk.Button(self.build_btn_frame, text="Check Links",
+                 command=self.check_site,
+                 bg='#000000', fg='#786E00',
+                 font=('EB Garamond', 12, 'bold'),
+                 padx=20).pack(side='left', padx=5)
+
+        self.build_log = scrolledtext.ScrolledText(build_frame, width=80, height=16,
+                                                   font=('Courier', 9),
+                                                   bg='#786E00', fg='#000000',
+                                                   insertbackground='#000000')
+        self.build_log.pack(fill='both', expand=True, pady=5, padx=10)
+
+    def log_build(self, message):
+        """Append a line to the build log"""
+        self.build_log.insert(tk.END, f"{message}\n")
+        self.build_log.see(tk.END)
+        self.build_log.update_idletasks()
+
+    def build_site(self):
+        """Build the publishable site in the background"""
+        def on_done(job):
+            if job['status'] == 'done':
+                report = job['result']
+                self.log_build(f"Build {report['build_hash']} finished in {report['seconds']:.2f}s")
+            elif job['status'] == 'failed':
+                self.log_build(f"Build failed: {job['error']}")
+                messagebox.showerror("Error", f"Failed to build site: {job['error']}")
+            else:
+                self.log_build("Build cancelled")
+
+        self.build_log.delete('1.0', tk.END)
+        self.submit_job('build', description="Build site",
+                        on_done=on_done, on_log=self.log_build)
+
+    def check_site(self):
+        """Check links and assets of the built site in the background"""
+        def on_done(job):
+            if job['status'] == 'failed':
+                self.log_build(f"Check failed: {job['error']}")
+
+        if not (self.project_dir / BUILD_OUTPUT_DIR).exists():
+            messagebox.showinfo("Check Links", "Build the site first.")
+            return
+        self.build_log.delete('1.0', tk.END)
+        self.submit_job('validate', description="Check links",
+                        on_done=on_done, on_log=self.log_build)
+
+    def create_history_tab(self, notebook):
+        """Create content history tab"""
+        frame = tk.Frame(notebook, bg='#786E00')
+        notebook.add(frame, text='HISTORY')
+
+        # Title
+        tk.Label(frame, text="Content History",
+                font=('EB Garamond', 16, 'bold'),
+                bg='#786E00', fg='#000000').pack(pady=10)
+
+        columns = ('version', 'date', 'changes', 'message')
+        self.history_tree = ttk.Treeview(frame, columns=columns, show='headings', height=10)
+        for column, heading, width in (('version', 'Version', 70), ('date', 'Saved', 150),
+                                       ('changes', 'Changes', 120), ('message', 'Change', 400)):
+            self.history_tree.heading(column, text=heading)
+            self.history_tree.column(column, width=width, anchor='w')
+        self.history_tree.pack(fill='both', expand=True, padx=20, pady=(10, 5))
+
+        btn_frame = tk.Frame(frame, bg='#786E00')
+        btn_frame.pack(pady=5)
+
+        tk.Button(btn_frame, text="Show Changes",
+                 command=self.show_history_diff,
+                 bg='#000000', fg='#786E00',
+                 font=('EB Garamond', 11, 'bold')).pack(side='left', padx=5)
+
+        tk.Button(btn_frame, text="Restore Version",
+                 command=self.restore_history_version,
+                 bg='#8B0000', fg='#FFFFFF',
+                 font=('EB Garamond', 11, 'bold')).pack(side='left', padx=5)
+
+        tk.Label(frame, text="Select one version to see what it changed, or two to compare them.",
+                font=('EB Garamond', 9, 'italic'),
+                bg='#786E00', fg='#333333').pack()
+
+        self.history_diff = scrolledtext.ScrolledText(frame, width=80, height=10,
+                                                      font=('Courier', 9),
+                                                      bg='#786E00', fg='#000000',
+                                                      insertbackground='#000000')
+        self.history_diff.pack(fill='both', expand=True, padx=20, pady=10)
+
+    def record_history(self, message):
+        """Save a version of admin_data/ and images/ after a change
+
+        The snapshot hashes changed media, so it runs as a background job and
+        the version list refreshes when it finishes. Also reports values
+        another editor changed at the same time, where the version saved
+        here was kept.
+        """
+        def on_done(job):
+            if job['status'] == 'failed':
+                print(f"Could not record content history: {job['error']}")
+            self.show_history()
+
+        self.submit_job('snapshot', {'message': message}, priority=PRIORITY_HIGH,
+                        description=f"History: {message}", on_done=on_done)
+
+        conflicts = []
+        for records_file in (self.projects_file, self.available_works.records_file,
+                             self.updates_data.records_file, self.cv_data.records_file):
+            conflicts += [f"{records_file.path.name}: {path}" for path in records_file.conflicts]
+            records_file.conflicts.clear()
+        if conflicts:
+            messagebox.showwarning("Edited Elsewhere",
+                                   "Someone else changed these at the same time. Your version "
+                                   "was kept:\n\n" + "\n".join(conflicts[:15]))
+
+    def show_history(self):
+        """Refresh the version list"""
+        self.history_tree.delete(*self.history_tree.get_children())
+        for version in self.history.versions():
+            self.history_tree.insert('', tk.END, iid=str(version['id']), values=(
+                version['id'],
+                version['created'].replace('T', ' '),
+                f"+{version['added']} ~{version['modified']} -{version['removed']}",
+                version['message']))
+
+    def show_history_diff(self):
+        """Show what the selected version changed, or the difference between two versions"""
+        selection = sorted(int(item) for item in self.history_tree.selection())
+        if not selection or len(selection) > 2:
+            messagebox.showerror("Error", "Please select one or two versions")
+            return
+        try:
+            diff = self.history.diff(selection[-1], selection[0] if len(selection) == 2 else None)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not compare versions: {e}")
+            return
+        self.history_diff.delete('1.0', tk.END)
+        self.history_diff.insert('1.0', "\n".join(self.history.describe(diff)))
+
+    def restore_history_version(self):
+        """Put the content back as it was in the selected version"""
+        selection = self.history_tree.selection()
+        if len(selection) != 1:
+            messagebox.showerror("Error", "Please select the version to restore")
+            return
+        version_id = int(selection[0])
+        if not messagebox.askyesno("Restore Version",
+                                   f"Put projects, CV, updates, available works and images back "
+                                   f"as they were in version {version_id}?\n\n"
+                                   f"The current state is saved as a version first, so this "
+                                   f"can be undone.", icon='warning'):
+            return
+        try:
+            result = self.history.restore(version_id)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to restore version {version_id}: {e}")
+            return
+
+        self.load_data()
+        self.refresh_catalog()
+        self.show_history()
+        if result['damaged']:
+            messagebox.showwarning("Restore Version",
+                                   "These stored files no longer match the version that "
+                                   "saved them and could not be restored:\n\n"
+                                   + "\n".join(result['damaged']))
+        else:
+            messagebox.showinfo("Success", f"Restored version {version_id} "
+                                           f"({len(result['written'])} files written, "
+                                           f"{len(result['deleted'])} removed).")
+
+    def create_jobs_tab(self, notebook):
+        """Create background job status tab"""
+        frame = tk.Frame(notebook, bg='#786E00')
+        notebook.add(frame, text='JOBS')
+
+        # Title
+        tk.Label(frame, text="Background Jobs",
+                font=('EB Garamond', 16, 'bold'),
+                bg='#786E00', fg='#000000').pack(pady=10)
+
+        columns = ('job', 'status', 'progress', 'message')
+        self.jobs_tree = ttk.Treeview(frame, columns=columns, show='headings', height=16)
+        for column, heading, width in (('job', 'Job', 200), ('status', 'Status', 90),
+                                       ('progress', 'Progress', 80), ('message', 'Details', 380)):
+            self.jobs_tree.heading(column, text=heading)
+            self.jobs_tree.column(column, width=width, anchor='w')
+        self.jobs_tree.pack(fill='both', expand=True, padx=20, pady=10)
+
+        btn_frame = tk.Frame(frame, bg='#786E00')
+        btn_frame.pack(pady=10)
+
+        tk.Button(btn_frame, text="Cancel Selected",
+                 command=self.cancel_selected_jobs,
+                 bg='#8B0000', fg='#FFFFFF',
+                 font=('EB Garamond', 11, 'bold')).pack(side='left', padx=5)
+
+        tk.Button(btn_frame, text="Clear Finished",
+                 command=self.clear_finished_jobs,
+                 bg='#000000', fg='#786E00',
+                 font=('EB Garamond', 11, 'bold')).pack(side='left', padx=5)
+
+    def submit_job(self, kind, params=None, priority=PRIORITY_NORMAL, description=None,
+                   on_done=None, on_log=None):
+        """Queue a background job; callbacks run on the Tk thread"""
+        if self.site_name:
+            description = f"{self.site_name}: {description or kind}"
+        job_id = self.job_queue.submit(kind, params, priority=priority, description=description,
+                                       project_dir=self.project_dir)
+        callbacks = self.job_callbacks.setdefault(job_id, {'done': [], 'log': []})
+        if on_done:
+            callbacks['done'].append(on_done)
+        if on_log:
+            callbacks['log'].append(on_log)
+        return job_id
+
+    def poll_jobs(self):
+        """Deliver job events from worker threads and refresh the job panel"""
+        try:
+            while True:
+                event, job, detail = self.job_events.get_nowait()
+                callbacks = self.job_callbacks.get(job['id'])
+                if not callbacks:
+                    continue
+                if event == 'log':
+                    for callback in callbacks['log']:
+                        callback(detail)
+                elif event == 'finished' or (event == 'cancelled' and job['status'] == 'cancelled'):
+                    del self.job_callbacks[job['id']]
+                    for callback in callbacks['done']:
+                        try:
+                            callback(job)
+                        except Exception as e:
+                            messagebox.showerror("Error", f"{job['description']}: {e}")
+        except queue.Empty:
+            pass
+
+        self.show_jobs()
+        self.job_poll = self.root.after(JOB_POLL_MS, self.poll_jobs)
+
+    def show_jobs(self):
+        """Refresh the job status list in place"""
+        jobs = self.job_queue.snapshot()
+        existing = set(self.jobs_tree.get_children())
+        for job in jobs:
+            details = job['error'] or job['message']
+            values = (job['description'], job['status'], f"{job['progress'] * 100:.0f}%", details)
+            if job['id'] in existing:
+                if tuple(self.jobs_tree.item(job['id'], 'values')) != values:
+                    self.jobs_tree.item(job['id'], values=values)
+            else:
+                self.jobs_tree.insert('', 0, iid=job['id'], values=values)
+        current = {job['id'] for job in jobs}
+        for item in existing - current:
+            self.jobs_tree.delete(item)
+
+    def cancel_selected_jobs(self):
+        """Cancel the jobs selected in the job panel"""
+        for job_id in self.jobs_tree.selection():
+            self.job_queue.cancel(job_id)
+
+    def clear_finished_jobs(self):
+        """Remove finished jobs from the job panel"""
+        self.job_queue.clear_finished()
+        self.show_jobs()
+
+    def on_close(self):
+        """Persist queued jobs and close the window"""
+        if self.owns_job_queue:
+            self.job_queue.shutdown()
+        else:
+            # Only this window closes; the workspace keeps running
+            self.root.after_cancel(self.job_poll)
+            self.root.after_cancel(self.data_poll)
+        self.root.destroy()
+
     def browse_image(self, path_var):
         """Browse for single image file"""
         filename = filedialog.askopenfilename(
             title="Select Image",
             filetypes=[
-                ("Image files", "*.jpg *.jpeg *.png *.gif *.bmp *.tiff"),
+                ("Image files", "*.jpg *.jpeg *.png *.gif *.webp"),
                 ("All files", "*.*")
             ]
         )
@@ -731,7 +1470,8 @@ class RachaelContentManager:
         filenames = filedialog.askopenfilenames(
             title="Select Project Images",
             filetypes=[
-                ("Image files", "*.jpg *.jpeg *.png *.gif *.bmp *.tiff"),
+                ("Image files", "*.jpg *.jpeg *.png *.gif *.webp"),
+                ("Video files", "*.mov *.mp4 *.webm"),
                 ("All files", "*.*")
             ]
         )
@@ -744,7 +1484,8 @@ class RachaelContentManager:
         filenames = filedialog.askopenfilenames(
             title="Select Project Images (First image will be the main grid image)",
             filetypes=[
-                ("Image files", "*.jpg *.jpeg *.png *.gif *.bmp *.tiff"),
+                ("Image files", "*.jpg *.jpeg *.png *.gif *.webp"),
+                ("Video files", "*.mov *.mp4 *.webm"),
                 ("All files", "*.*")
             ]
         )
@@ -769,42 +1510,64 @@ class RachaelContentManager:
 
     def sanitize_filename(self, text):
         """Convert text to safe filename"""
-        sanitized = re.sub(r'[^a-zA-Z0-9\s]', '', text)
-        sanitized = re.sub(r'\s+', '-', sanitized)
-        return sanitized.lower().strip('-')[:50]
+        return slugify(text)
 
-    def copy_image(self, source_path, dest_name):
-        """Copy image to project directory with new name"""
-        if not source_path or not os.path.exists(source_path):
-            return None
+    def on_images_copied(self, job):
+        """Record the copied images once a copy job finishes"""
+        if job['status'] == 'failed':
+            messagebox.showerror("Error", f"Failed to copy images: {job['error']}")
+            return
+        if job['status'] != 'done':
+            return
 
-        source = Path(source_path)
-        extension = source.suffix.lower()
-        dest_path = self.projects_base_dir / f"{dest_name}{extension}"
-
-        try:
-            shutil.copy2(source_path, dest_path)
-            return dest_path.name
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to copy image: {e}")
-            return None
+        result = job['result']
+        self.image_catalog.load()
+        self.show_catalog()
+        project = self.projects_data.get(result['project_id'])
+        if project is not None and result['images']:
+            # The job already wrote projects.json; keep the in-memory copy in step
+            project['images'] = result['images']
+        self.record_history(f"Added {len(result['images'])} images to {result['project_id']}")
+        if result['failures']:
+            messagebox.showwarning("Warning", "Some images could not be copied:\n\n"
+                                   + "\n".join(result['failures']))
+        self.warn_near_duplicates(result['duplicates'])
+
+    def warn_near_duplicates(self, duplicates):
+        """Tell the user which uploads look like near-duplicate shots"""
+        if duplicates:
+            messagebox.showinfo("Similar Images",
+                                "These images look almost identical to another selected image.\n"
+                                "They were kept, but placed at the end of the gallery:\n\n"
+                                + "\n".join(duplicates))
 
     def load_data(self):
         """Load existing data from script.js and JSON files"""
         # Load existing projects from script.js
         self.load_projects_from_script()
 
-        # Load JSON data if exists
-        if self.projects_data_file.exists():
-            with open(self.projects_data_file, 'r') as f:
-                stored_data = json.load(f)
-                # Merge with script.js data
-                self.projects_data.update(stored_data)
+        # Load JSON data if exists, merged with script.js data
+        self.projects_file = RecordFile(self.projects_data_file)
+        self.projects_data.update(self.projects_file.read())
 
         # Update project dropdown with real project names
         project_names = [f"{pid}: {data['title']}" for pid, data in self.projects_data.items()]
         self.project_select['values'] = project_names
 
+        # Bio and CV (read from about.html until first saved)
+        self.cv_data = CVStore(self.project_dir)
+        self.bio_text.delete('1.0', tk.END)
+        self.bio_text.insert('1.0', "\n\n".join(self.cv_data.bio))
+        self.cv_section_select['values'] = [section['title'] for section in self.cv_data.sections]
+
+        # Updates (undated titles from updates.html until first saved)
+        self.updates_data = UpdatesStore(self.project_dir)
+        self.refresh_update_select()
+
+        # Available works (typed records, see AvailableWorksStore)
+        self.available_works = AvailableWorksStore(self.project_dir)
+        self.refresh_available_select()
+
     def load_projects_from_script(self):
         """Extract project data from script.js file"""
         try:
@@ -813,46 +1576,51 @@ class RachaelContentManager:
                 return
 
             with open(self.script_js, 'r', encoding='utf-8') as f:
-                script_content = f.read()
-
-            # Extract projectData object using regex
-            pattern = r'const projectData = \{(.*?)\};'
-            match = re.search(pattern, script_content, re.DOTALL)
-
-            if not match:
-                self.projects_data = {}
-                return
-
-            # Parse the project data (simplified parsing)
-            project_section = match.group(1)
-
-            # Extract individual projects
-            project_pattern = r'(project\d+):\s*\{([^}]+)\}'
-            projects = re.findall(project_pattern, project_section, re.DOTALL)
-
-            self.projects_data = {}
-            for project_id, project_content in projects:
-                # Extract title, subtitle, description
-                title_match = re.search(r'title:\s*["\']([^"\']+)["\']', project_content)
-                subtitle_match = re.search(r'subtitle:\s*["\']([^"\']+)["\']', project_content)
-                desc_match = re.search(r'description:\s*["\']([^"\']+)["\']', project_content)
-                folder_match = re.search(r'folder:\s*["\']([^"\']+)["\']', project_content)
-
-                self.projects_data[project_id] = {
-                    'title': title_match.group(1) if title_match else '',
-                    'subtitle': subtitle_match.group(1) if subtitle_match else '',
-                    'description': desc_match.group(1) if desc_match else '',
-                    'folder': folder_match.group(1) if folder_match else project_id
-                }
+                self.projects_data = parse_script_projects(f.read())
 
         except Exception as e:
             print(f"Error loading projects from script.js: {e}")
             self.projects_data = {}
 
     def save_projects_data(self):
-        """Save projects data to JSON file"""
-        with open(self.projects_data_file, 'w') as f:
-            json.dump(self.projects_data, f, indent=2)
+        """Save projects data to JSON file, keeping projects another editor changed meanwhile"""
+        self.projects_data = self.projects_file.save(self.projects_data)
+
+    def poll_data_changes(self):
+        """Reload records another editor (or a command) saved since they were read here"""
+        try:
+            self.projects_data, changed = self.projects_file.refresh(self.projects_data)
+            if changed:
+                self.project_select['values'] = [f"{pid}: {data['title']}"
+                                                 for pid, data in self.projects_data.items()]
+                if self.current_project_id in changed and self.current_project_id in self.projects_data:
+                    self.project_select.set(f"{self.current_project_id}: "
+                                            f"{self.projects_data[self.current_project_id]['title']}")
+                    self.on_project_selected(None)
+
+            changed = self.available_works.refresh()
+            if changed:
+                self.refresh_available_select()
+                if self.current_work_id in changed and self.current_work_id in self.available_works.works:
+                    self.on_available_selected(None)
+
+            changed = self.updates_data.refresh()
+            if changed:
+                self.refresh_update_select()
+                if self.current_update_id in changed and self.current_update_id in self.updates_data.updates:
+                    self.on_update_selected(None)
+
+            changed = self.cv_data.refresh()
+            if 'bio' in changed:
+                self.bio_text.delete('1.0', tk.END)
+                self.bio_text.insert('1.0', "\n\n".join(self.cv_data.bio))
+            if 'sections' in changed:
+                self.cv_section_select['values'] = [section['title'] for section in self.cv_data.sections]
+                self.on_cv_section_selected(None)
+        except (OSError, ValueError) as e:
+            print(f"Could not reload changed data: {e}")
+
+        self.data_poll = self.root.after(DATA_POLL_MS, self.poll_data_changes)
 
     def on_project_selected(self, event):
         """Handle project selection and populate form fields with existing data"""
@@ -876,23 +1644,50 @@ class RachaelContentManager:
             self.edit_project_description.delete('1.0', tk.END)
             self.edit_project_description.insert('1.0', project.get('description', ''))
 
+            self.edit_project_focal_point.delete(0, tk.END)
+            self.edit_project_focal_point.insert(0, format_focal_point(project.get('focal_point')))
+
             # Store the current project ID for updates
             self.current_project_id = project_id
 
     def on_cv_section_selected(self, event):
-        """Handle CV section selection"""
-        # Placeholder - would load CV data
-        pass
+        """Show the entries of the selected CV section, one per line"""
+        section = self.cv_data.section(self.cv_section_select.get())
+        self.cv_content.delete('1.0', tk.END)
+        if section:
+            self.cv_content.insert('1.0', "\n".join(cv_entry_line(entry)
+                                                    for entry in section['entries']))
 
     def on_update_selected(self, event):
-        """Handle update selection"""
-        # Placeholder - would load update data
-        pass
+        """Populate the edit form with the selected update"""
+        record = self.updates_data.updates.get(self.update_select.get().split(':')[0])
+        if not record:
+            return
+        for entry, field in ((self.edit_update_title, 'title'), (self.edit_update_date, 'date'),
+                             (self.edit_update_link, 'link')):
+            entry.delete(0, tk.END)
+            entry.insert(0, record[field])
+        self.edit_update_content.delete('1.0', tk.END)
+        self.edit_update_content.insert('1.0', record['content'])
+        self.current_update_id = record['id']
 
     def on_available_selected(self, event):
-        """Handle available work selection"""
-        # Placeholder - would load available work data
-        pass
+        """Populate the edit form with the selected available work"""
+        selection = self.available_select.get()
+        work = self.available_works.works.get(selection.split(':')[0])
+        if not work:
+            return
+
+        for entry, field in ((self.edit_work_title, 'title'), (self.edit_work_medium, 'medium'),
+                             (self.edit_work_dimensions, 'dimensions')):
+            entry.delete(0, tk.END)
+            entry.insert(0, work[field])
+        self.edit_work_price.delete(0, tk.END)
+        if work['price'] is not None:
+            self.edit_work_price.insert(0, format_price(work['price']))
+        self.edit_work_status.set(AVAILABLE_STATUSES[work['status']])
+        self.edit_work_image_path.set('')
+        self.current_work_id = work['id']
 
     # Placeholder methods for CRUD operations
     def create_project(self):
@@ -914,41 +1709,26 @@ class RachaelContentManager:
         project_folder = self.projects_base_dir / project_id
         project_folder.mkdir(exist_ok=True)
 
-        # Copy images to project folder
-        image_filenames = []
-        if self.new_image_paths:
-            for i, img_path in enumerate(self.new_image_paths):
-                if os.path.exists(img_path):
-                    # Get file extension
-                    source = Path(img_path)
-                    extension = source.suffix.lower()
-
-                    # Create filename: project_id-1.jpg, project_id-2.jpg, etc.
-                    new_filename = f"{project_id}-{i+1}{extension}"
-                    dst_path = project_folder / new_filename
-
-                    try:
-                        # Copy image directly to project folder
-                        shutil.copy2(img_path, dst_path)
-                        image_filenames.append(new_filename)
-                        print(f"Copied {img_path} to {dst_path}")
-                    except Exception as e:
-                        print(f"Failed to copy image {img_path}: {e}")
-                        messagebox.showwarning("Warning", f"Failed to copy image {source.name}: {e}")
-
-        print(f"Created project folder: {project_folder}")
-        print(f"Copied {len(image_filenames)} images: {image_filenames}")
-
-        # Save project data
+        # Save project data; images are filled in when the copy job finishes
         self.projects_data[project_id] = {
             'title': title,
             'subtitle': subtitle,
             'description': description,
             'folder': project_id,
-            'images': image_filenames
+            'images': []
         }
 
         self.save_projects_data()
+        self.record_history(f"Created project {project_id}: {title}")
+
+        # Copy images to project folder in the background
+        image_count = len(self.new_image_paths)
+        self.submit_job('copy_images',
+                        {'project_id': project_id, 'folder': project_id,
+                         'sources': list(self.new_image_paths)},
+                        priority=PRIORITY_HIGH,
+                        description=f"Copy images: {title}",
+                        on_done=self.on_images_copied)
 
         # Update HTML files (placeholder)
         # Would need to update script.js projectData object and index.html work grid
@@ -956,7 +1736,7 @@ class RachaelContentManager:
         messagebox.showinfo("Success",
                             f"Project '{title}' created successfully!\n\n"
                             f"Project ID: {project_id}\n"
-                            f"Images copied: {len(image_filenames)}\n"
+                            f"Images being copied: {image_count} (see the JOBS tab)\n"
                             f"Folder created: images/{project_id}/")
 
         # Clear form
@@ -985,6 +1765,12 @@ class RachaelContentManager:
             messagebox.showerror("Error", "Please fill in title and description")
             return
 
+        try:
+            focal_point = parse_focal_point(self.edit_project_focal_point.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+
         try:
             # Update project data
             self.projects_data[self.current_project_id].update({
@@ -992,33 +1778,31 @@ class RachaelContentManager:
                 'subtitle': subtitle,
                 'description': description
             })
+            if focal_point:
+                self.projects_data[self.current_project_id]['focal_point'] = focal_point
+            else:
+                self.projects_data[self.current_project_id].pop('focal_point', None)
+
+            # Save to JSON before the copy job starts writing the same record
+            self.save_projects_data()
+            self.record_history(f"Updated project {self.current_project_id}: {title}")
 
             # Handle new images if any were selected
             if hasattr(self, 'edit_image_paths') and self.edit_image_paths:
-                project_folder = self.projects_base_dir / self.current_project_id
-                project_folder.mkdir(exist_ok=True)
-
-                # Copy new images
-                image_filenames = []
-                for i, img_path in enumerate(self.edit_image_paths):
-                    filename = self.copy_image(img_path, f"{self.current_project_id}-{i+1}")
-                    if filename:
-                        # Move to project folder
-                        src = self.projects_base_dir / filename
-                        dst = project_folder / filename
-                        if src.exists():
-                            shutil.move(src, dst)
-                        image_filenames.append(filename)
-
-                if image_filenames:
-                    self.projects_data[self.current_project_id]['images'] = image_filenames
+                folder = self.projects_data[self.current_project_id].get('folder',
+                                                                        self.current_project_id)
+
+                # Copy new images in the background
+                self.submit_job('copy_images',
+                                {'project_id': self.current_project_id, 'folder': folder,
+                                 'sources': list(self.edit_image_paths)},
+                                priority=PRIORITY_HIGH,
+                                description=f"Copy images: {title}",
+                                on_done=self.on_images_copied)
 
                 # Clear selected images
                 self.edit_image_paths = []
 
-            # Save to JSON
-            self.save_projects_data()
-
             # Update dropdown to reflect changes
             project_names = [f"{pid}: {data['title']}" for pid, data in self.projects_data.items()]
             self.project_select['values'] = project_names
@@ -1043,11 +1827,24 @@ class RachaelContentManager:
             messagebox.showerror("Error", "Project not found")
             return
 
+        # Projects defined in script.js keep their folder referenced (and
+        # published) until they are removed from script.js and index.html
+        folder = project.get('folder', self.current_project_id)
+        in_script = (self.script_js.exists() and self.current_project_id
+                     in parse_script_projects(self.script_js.read_text(encoding='utf-8')))
+        if in_script:
+            images_note = (f"Its images stay in images/{folder}/ while script.js and index.html "
+                           f"still list the project; remove it there, then use Clean Up Unused "
+                           f"on the IMAGES tab to move them to the {QUARANTINE_DIR} folder.")
+        else:
+            images_note = f"Its images are moved to the {QUARANTINE_DIR} folder."
+
         # Confirmation dialog
         result = messagebox.askyesno(
             "Delete Project",
             f"Are you sure you want to delete the project:\n\n'{project['title']}'\n\n"
-            f"This action cannot be undone and will remove all project data and images.",
+            f"This will remove the project data. {images_note} "
+            f"The HISTORY tab can restore the project.",
             icon='warning'
         )
 
@@ -1056,6 +1853,12 @@ class RachaelContentManager:
                 # Remove project data
                 del self.projects_data[self.current_project_id]
                 self.save_projects_data()
+                self.record_history(f"Deleted project {self.current_project_id}: {project['title']}")
+
+                # Quarantine the images nothing references any more
+                if not in_script:
+                    self.submit_job('gc', {'scope': f"images/{folder}/", 'grace': 0},
+                                    description=f"Clean up images/{folder}/")
 
                 # Clear the form
                 self.edit_project_title.delete(0, tk.END)
@@ -1072,48 +1875,5862 @@ class RachaelContentManager:
 
                 messagebox.showinfo("Success", f"Project '{project['title']}' has been deleted.")
 
-                # TODO: Also remove from HTML files and delete project folder/images
+                # TODO: Also remove from HTML files
 
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete project: {e}")
 
     def update_bio(self):
         """Update biography"""
-        messagebox.showinfo("Info", "Update bio functionality would be implemented here")
+        text = self.bio_text.get('1.0', 'end-1c').strip()
+        if not text:
+            messagebox.showerror("Error", "Please enter the biography text")
+            return
+        self.cv_data.set_bio(text)
+        self.record_history("Updated biography")
+        messagebox.showinfo("Success", "Biography saved. Build the site to publish it.")
 
     def update_cv_section(self):
         """Update CV section"""
-        messagebox.showinfo("Info", "Update CV section functionality would be implemented here")
+        title = self.cv_section_select.get().strip()
+        if not title:
+            messagebox.showerror("Error", "Please select or type a CV section")
+            return
+        text = self.cv_content.get('1.0', 'end-1c')
+        if not text.strip():
+            if not self.cv_data.section(title):
+                return
+            if not messagebox.askyesno("Remove Section",
+                                       f"The section '{title}' is empty. Remove it from the CV?"):
+                return
+        self.cv_data.set_section(title, text)
+        self.record_history(f"Updated CV section {title}")
+        self.cv_section_select['values'] = [section['title'] for section in self.cv_data.sections]
+        messagebox.showinfo("Success", f"CV section '{title}' saved. Build the site to publish it.")
+
+    def refresh_update_select(self):
+        """Reload the update dropdown, newest first"""
+        self.update_select['values'] = [
+            f"{record['id']}: {record['date'] or 'undated'}  {record['title']}"
+            for record in self.updates_data.newest_first()]
 
     def create_update(self):
         """Create new update"""
-        messagebox.showinfo("Info", "Create update functionality would be implemented here")
+        try:
+            update_id = self.updates_data.add(self.new_update_title.get(),
+                                              self.new_update_date.get(),
+                                              self.new_update_content.get('1.0', 'end-1c'),
+                                              self.new_update_link.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+
+        self.record_history(f"Added update {update_id}")
+        self.new_update_title.delete(0, tk.END)
+        self.new_update_content.delete('1.0', tk.END)
+        self.new_update_link.delete(0, tk.END)
+        self.refresh_update_select()
+        messagebox.showinfo("Success",
+                            f"Update '{self.updates_data.updates[update_id]['title']}' added.\n\n"
+                            f"Build the site to publish it.")
 
     def update_update(self):
         """Update existing update"""
-        messagebox.showinfo("Info", "Update update functionality would be implemented here")
+        if self.current_update_id not in self.updates_data.updates:
+            messagebox.showerror("Error", "Please select an update to edit")
+            return
+        try:
+            record = self.updates_data.update(self.current_update_id,
+                                              self.edit_update_title.get(),
+                                              self.edit_update_date.get(),
+                                              self.edit_update_content.get('1.0', 'end-1c'),
+                                              self.edit_update_link.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+
+        self.record_history(f"Updated update {record['id']}")
+        self.refresh_update_select()
+        self.update_select.set(f"{record['id']}: {record['date'] or 'undated'}  {record['title']}")
+        messagebox.showinfo("Success", f"Update '{record['title']}' saved. Build the site to publish it.")
 
     def delete_update(self):
         """Delete update"""
-        messagebox.showinfo("Info", "Delete update functionality would be implemented here")
+        record = self.updates_data.updates.get(self.current_update_id)
+        if not record:
+            messagebox.showerror("Error", "Please select an update to delete")
+            return
+        if not messagebox.askyesno("Delete Update", f"Delete the update '{record['title']}'?",
+                                   icon='warning'):
+            return
+
+        self.updates_data.delete(record['id'])
+        self.record_history(f"Deleted update {record['id']}")
+        self.current_update_id = None
+        for entry in (self.edit_update_title, self.edit_update_date, self.edit_update_link):
+            entry.delete(0, tk.END)
+        self.edit_update_content.delete('1.0', tk.END)
+        self.update_select.set('')
+        self.refresh_update_select()
 
     def update_contact(self):
         """Update contact information"""
         messagebox.showinfo("Info", "Update contact functionality would be implemented here")
 
+    def refresh_available_select(self):
+        """Reload the available work dropdown from the store"""
+        self.available_select['values'] = [
+            f"{work['id']}: {work['title']} ({AVAILABLE_STATUSES[work['status']]})"
+            for work in self.available_works.listing()]
+
+    def copy_work_image(self, work_id, source_path):
+        """Copy a work's image to images/available/ in the background
+
+        The job points the record at the image; it's recorded in history once
+        it's there.
+        """
+        def on_done(job):
+            if job['status'] == 'failed':
+                messagebox.showerror("Error", f"Failed to copy image: {job['error']}")
+                return
+            if job['status'] != 'done':
+                return
+            self.image_catalog.load()
+            self.show_catalog()
+            self.available_works.refresh()
+            self.refresh_available_select()
+            self.record_history(f"Added image to available work {work_id}")
+
+        self.submit_job('copy_work_image', {'work_id': work_id, 'source': str(source_path)},
+                        priority=PRIORITY_HIGH, description=f"Copy image: {work_id}",
+                        on_done=on_done)
+
     def create_available_work(self):
         """Create new available work"""
-        messagebox.showinfo("Info", "Create available work functionality would be implemented here")
+        image_path = self.new_work_image_path.get().strip()
+        try:
+            work_id = self.available_works.add(
+                title=self.new_work_title.get(),
+                medium=self.new_work_medium.get(),
+                dimensions=self.new_work_dimensions.get(),
+                price=self.new_work_price.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+
+        self.record_history(f"Added available work {work_id}")
+        if image_path:
+            self.copy_work_image(work_id, image_path)
+
+        for entry in (self.new_work_title, self.new_work_medium, self.new_work_dimensions,
+                      self.new_work_price):
+            entry.delete(0, tk.END)
+        self.new_work_image_path.set('')
+        self.refresh_available_select()
+        messagebox.showinfo("Success",
+                            f"Added '{self.available_works.works[work_id]['title']}'.\n\n"
+                            f"Build the site to publish the available page.")
 
     def update_available_work(self):
         """Update existing available work"""
-        messagebox.showinfo("Info", "Update available work functionality would be implemented here")
+        work_id = self.current_work_id
+        if work_id not in self.available_works.works:
+            messagebox.showerror("Error", "Please select a work to update")
+            return
+
+        fields = {
+            'title': self.edit_work_title.get(),
+            'medium': self.edit_work_medium.get(),
+            'dimensions': self.edit_work_dimensions.get(),
+            'price': self.edit_work_price.get(),
+            'status': self.edit_work_status.get()
+        }
+        image_path = self.edit_work_image_path.get().strip()
+        try:
+            work = self.available_works.update(work_id, **fields)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+
+        self.record_history(f"Updated available work {work_id}")
+        if image_path:
+            # Saved first, so the copy job updates the record just written
+            self.copy_work_image(work_id, image_path)
+        self.edit_work_image_path.set('')
+        self.refresh_available_select()
+        self.available_select.set(f"{work_id}: {work['title']} ({AVAILABLE_STATUSES[work['status']]})")
+        messagebox.showinfo("Success", f"'{work['title']}' updated. Build the site to publish it.")
 
     def delete_available_work(self):
         """Delete available work"""
-        messagebox.showinfo("Info", "Delete available work functionality would be implemented here")
+        work_id = self.current_work_id
+        work = self.available_works.works.get(work_id)
+        if not work:
+            messagebox.showerror("Error", "Please select a work to delete")
+            return
+        if not messagebox.askyesno("Delete Work",
+                                   f"Remove '{work['title']}' from the available page?",
+                                   icon='warning'):
+            return
+
+        self.available_works.delete(work_id)
+        self.record_history(f"Deleted available work {work_id}")
+        self.current_work_id = None
+        for entry in (self.edit_work_title, self.edit_work_medium, self.edit_work_dimensions,
+                      self.edit_work_price):
+            entry.delete(0, tk.END)
+        self.edit_work_status.set('')
+        self.available_select.set('')
+        self.refresh_available_select()
+        messagebox.showinfo("Success", f"'{work['title']}' removed. Its image stays until "
+                                       f"Clean Up Unused on the IMAGES tab.")
+
+
+class WorkspaceWindow:
+    """Workspace mode: a list of sites, each opened in its own editor window
+
+    Every editor and the Build buttons here share the workspace's job pool
+    and build cache.
+    """
+
+    def __init__(self, root, workspace):
+        self.root = root
+        self.workspace = workspace
+        self.root.title("Rachael Juzeler Portfolio Workspace")
+        self.root.geometry("700x420")
+        self.root.configure(bg="#786E00")
+        self.editors = {}
+        self.build_status = {}
+        self.job_events = queue.Queue()
+        self.job_queue = workspace.job_queue(on_event=self.dispatch_job_event)
+        self.job_queue.start()
+        self.create_widgets()
+        self.show_sites()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(JOB_POLL_MS, self.poll_jobs)
+
+    def create_widgets(self):
+        """Create the site list and its buttons"""
+        tk.Label(self.root, text="RACHAEL JUZELER",
+                font=('EB Garamond', 20, 'bold'),
+                bg='#786E00', fg='#000000').pack(pady=(10, 2))
+        tk.Label(self.root, text=f"Workspace: {self.workspace.root.resolve()}",
+                font=('EB Garamond', 10, 'italic'),
+                bg='#786E00', fg='#333333').pack()
+
+        columns = ('site', 'folder', 'build')
+        self.sites_tree = ttk.Treeview(self.root, columns=columns, show='headings', height=10)
+        for column, heading, width in (('site', 'Site', 140), ('folder', 'Folder', 320),
+                                       ('build', 'Last Build', 180)):
+            self.sites_tree.heading(column, text=heading)
+            self.sites_tree.column(column, width=width, anchor='w')
+        self.sites_tree.pack(fill='both', expand=True, padx=20, pady=10)
+        self.sites_tree.bind('<Double-1>', lambda event: self.open_selected())
+
+        btn_frame = tk.Frame(self.root, bg='#786E00')
+        btn_frame.pack(pady=(0, 10))
+        for text, command in (("Open", self.open_selected), ("Add Site...", self.add_site),
+                              ("Remove", self.remove_selected), ("Build Selected", self.build_selected),
+                              ("Build All", self.build_all)):
+            tk.Button(btn_frame, text=text, command=command,
+                     bg='#000000', fg='#786E00',
+                     font=('EB Garamond', 11, 'bold')).pack(side='left', padx=5)
+
+    def show_sites(self):
+        """Refresh the site list in place"""
+        sites = self.workspace.site_dirs()
+        for name in set(self.sites_tree.get_children()) - set(sites):
+            self.sites_tree.delete(name)
+        for name, site_dir in sites.items():
+            status = self.build_status.get(name) or self.workspace.last_built(name) or "never built"
+            if self.sites_tree.exists(name):
+                self.sites_tree.item(name, values=(name, site_dir, status))
+            else:
+                self.sites_tree.insert('', 'end', iid=name, values=(name, site_dir, status))
+
+    def dispatch_job_event(self, event, job, detail):
+        """Worker threads: pass job events on to this window and every open editor"""
+        self.job_events.put((event, job, detail))
+        for editor in list(self.editors.values()):
+            editor.job_events.put((event, job, detail))
+
+    def poll_jobs(self):
+        """Show the progress of builds started here or from an editor"""
+        sites = {str(site_dir): name for name, site_dir in self.workspace.site_dirs().items()}
+        changed = False
+        try:
+            while True:
+                event, job, detail = self.job_events.get_nowait()
+                name = sites.get(job.get('project_dir') or '')
+                if job['kind'] != 'build' or name is None:
+                    continue
+                if event == 'finished':
+                    self.build_status[name] = (job['finished'] if job['status'] == 'done'
+                                               else f"{job['status']}: {job['error'] or ''}")
+                else:
+                    self.build_status[name] = f"building {job['progress'] * 100:.0f}%"
+                changed = True
+        except queue.Empty:
+            pass
+        if changed:
+            self.show_sites()
+        self.root.after(JOB_POLL_MS, self.poll_jobs)
+
+    def open_selected(self):
+        for name in self.sites_tree.selection():
+            self.open_site(name)
+
+    def open_site(self, name):
+        """Open a site's editor, or bring it to the front"""
+        editor = self.editors.get(name)
+        if editor is not None and editor.root.winfo_exists():
+            editor.root.lift()
+            return
+        window = tk.Toplevel(self.root)
+        self.editors[name] = RachaelContentManager(window, self.workspace.site_dir(name),
+                                                   job_queue=self.job_queue, site_name=name)
+        window.bind('<Destroy>', lambda event: (event.widget is window
+                                                and self.editors.pop(name, None)))
+
+    def add_site(self):
+        folder = filedialog.askdirectory(title="Select Site Folder")
+        if not folder:
+            return
+        try:
+            self.workspace.add(folder)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.show_sites()
+
+    def remove_selected(self):
+        names = [name for name in self.sites_tree.selection() if name not in self.editors]
+        if not names:
+            return
+        if not messagebox.askyesno("Remove Sites", f"Remove {', '.join(names)} from the workspace? "
+                                                   f"Their files are not deleted."):
+            return
+        for name in names:
+            self.workspace.remove(name)
+        self.show_sites()
+
+    def build_selected(self):
+        self.build(self.sites_tree.selection())
+
+    def build_all(self):
+        self.build(sorted(self.workspace.sites))
+
+    def build(self, names):
+        """Queue builds on the shared pool"""
+        for name in names:
+            self.job_queue.submit('build', project_dir=self.workspace.site_dir(name),
+                                  description=f"{name}: Build site")
+            self.build_status[name] = "queued"
+        self.show_sites()
+
+    def on_close(self):
+        """Persist queued jobs and close every window"""
+        self.job_queue.shutdown()
+        self.root.destroy()
+
+CV_PRINT_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>CV | RACHAEL JUZELER</title>
+    <!-- Generated by rachael_content_manager.py build - do not edit by hand -->
+    <style>
+        @page { size: letter; margin: 0.75in; }
+        body { font-family: 'EB Garamond', Garamond, Georgia, serif; font-size: 11pt;
+               line-height: 1.35; color: #000; max-width: 7in; margin: 0 auto; }
+        a { color: inherit; text-decoration: none; }
+        .cv-contact-info { text-align: center; margin-bottom: 18pt; }
+        .cv-contact-info p { margin: 0 0 4pt; }
+        .tagline { letter-spacing: 0.15em; }
+        .cv-section { margin-top: 14pt; }
+        .cv-section h2 { font-size: 12pt; letter-spacing: 0.1em; text-transform: uppercase;
+                         border-bottom: 1px solid #000; padding-bottom: 2pt; margin: 0 0 6pt;
+                         break-after: avoid; }
+        .cv-list { list-style: none; margin: 0; padding: 0; }
+        .cv-list li { margin-bottom: 3pt; break-inside: avoid; }
+    </style>
+</head>
+<body>
+    __CONTACT__
+__SECTIONS__</body>
+</html>
+"""
+
+
+def slugify(text):
+    """Lower-case, dash-separated, filename-safe version of text"""
+    sanitized = re.sub(r'[^a-zA-Z0-9\s]', '', text)
+    sanitized = re.sub(r'\s+', '-', sanitized)
+    return sanitized.lower().strip('-')[:50]
+
+
+def parse_price(value):
+    """Price as a number from user input like '1200', '$1,200.00'; None when blank"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    cleaned = str(value).strip().replace('$', '').replace(',', '')
+    if not cleaned:
+        return None
+    try:
+        price = float(cleaned)
+    except ValueError:
+        raise ValueError(f"'{value}' is not a price")
+    if price < 0:
+        raise ValueError("Price can't be negative")
+    return int(price) if price.is_integer() else round(price, 2)
+
+
+def format_price(price):
+    if price is None:
+        return "Price on request"
+    return f"${price:,}" if isinstance(price, int) else f"${price:,.2f}"
+
+
+def parse_focal_point(text):
+    """'30, 60' (percent across, percent down) -> [0.3, 0.6]; blank -> None"""
+    parts = [part for part in re.split(r'[\s,%]+', text.strip()) if part]
+    if not parts:
+        return None
+    try:
+        point = [float(part) for part in parts]
+    except ValueError:
+        point = []
+    if len(point) != 2 or not all(0 <= value <= 100 for value in point):
+        raise ValueError(f"Focal point must be two percentages, e.g. 30, 60 (got {text!r})")
+    return [round(value / 100, 3) for value in point]
+
+
+def format_focal_point(point):
+    return f"{point[0] * 100:g}, {point[1] * 100:g}" if point else ''
+
+
+def normalize_available_work(fields, existing=None):
+    """Validate and coerce fields into a complete available-work record"""
+    record = dict(existing or {})
+    for name, value in fields.items():
+        if name not in AVAILABLE_WORK_FIELDS:
+            raise ValueError(f"Unknown field '{name}'")
+        record[name] = value
+
+    for name, kind in AVAILABLE_WORK_FIELDS.items():
+        value = record.get(name)
+        if kind is str:
+            record[name] = (value or '').strip()
+        elif kind is list:
+            record[name] = list(value or [])
+    record['price'] = parse_price(record.get('price'))
+    status = (record.get('status') or 'available').strip().lower()
+    if status not in AVAILABLE_STATUSES:
+        raise ValueError(f"Status must be one of: {', '.join(AVAILABLE_STATUSES)}")
+    record['status'] = status
+    if not record['title']:
+        raise ValueError("Please enter a title")
+    return record
+
+
+class AvailableWorksStore:
+    """Typed available-work records in admin_data/available_works.json
+
+    Records are indexed by status and by price, so listings and price
+    filters don't rescan every record.
+    """
+
+    def __init__(self, project_dir):
+        self.data_file = Path(project_dir) / "admin_data" / "available_works.json"
+        self.records_file = RecordFile(self.data_file)
+        self.works = {}
+        self.by_status = {}
+        self.by_price = []
+        self.prices = []
+        self.load()
+
+    def load(self):
+        """Load the records from disk"""
+        self.works = self.records_file.read()
+        self.rebuild_index()
+
+    def save(self):
+        self.works = self.records_file.save(self.works)
+        self.rebuild_index()
+
+    def refresh(self):
+        """Pick up works saved by another editor; returns the ids that changed"""
+        self.works, changed = self.records_file.refresh(self.works)
+        if changed:
+            self.rebuild_index()
+        return changed
+
+    def rebuild_index(self):
+        """Status -> ids in display order, and (price, id) pairs sorted by price"""
+        self.by_status = {status: [] for status in AVAILABLE_STATUSES}
+        for work_id in sorted(self.works, key=lambda work_id: self.works[work_id]['created']):
+            self.by_status[self.works[work_id]['status']].append(work_id)
+        self.by_price = sorted((work['price'], work_id) for work_id, work in self.works.items()
+                               if work['price'] is not None)
+        self.prices = [price for price, _ in self.by_price]
+
+    def add(self, **fields):
+        """Create a record; returns its id (a slug of the title)"""
+        record = normalize_available_work(fields)
+        base = slugify(record['title']) or 'work'
+        work_id = base
+        suffix = 1
+        while work_id in self.works:
+            suffix += 1
+            work_id = f"{base}-{suffix}"
+        now = datetime.now().isoformat(timespec='seconds')
+        record.update({'id': work_id, 'created': now, 'updated': now})
+        self.works[work_id] = record
+        self.rebuild_index()
+        self.save()
+        return work_id
+
+    def update(self, work_id, **fields):
+        if work_id not in self.works:
+            raise ValueError(f"No available work '{work_id}'")
+        record = normalize_available_work(fields, self.works[work_id])
+        if record != self.works[work_id]:
+            record['updated'] = datetime.now().isoformat(timespec='seconds')
+            self.works[work_id] = record
+            self.rebuild_index()
+            self.save()
+        return record
+
+    def delete(self, work_id):
+        record = self.works.pop(work_id)
+        self.rebuild_index()
+        self.save()
+        return record
+
+    def listing(self, statuses=None):
+        """Records in display order: available first, sold last, oldest first within each"""
+        statuses = statuses or AVAILABLE_STATUSES
+        return [self.works[work_id] for status in AVAILABLE_STATUSES if status in statuses
+                for work_id in self.by_status[status]]
+
+    def in_price_range(self, low=None, high=None):
+        """Records priced between low and high (inclusive), cheapest first"""
+        start = 0 if low is None else bisect.bisect_left(self.prices, low)
+        end = len(self.prices) if high is None else bisect.bisect_right(self.prices, high)
+        return [self.works[work_id] for _, work_id in self.by_price[start:end]]
+
+
+def parse_cv_years(label):
+    """(start, end) years of a CV label like '2012-present'; end None means ongoing"""
+    years = [int(year) for year in re.findall(r'\d{4}', label)]
+    if not years:
+        return None, None
+    ongoing = 'present' in label.lower() or 'ongoing' in label.lower()
+    return years[0], None if ongoing else years[-1]
+
+
+def parse_cv_entry(line):
+    """CV entry from a line like '2025 - ARTSWA Public Artist Roster'"""
+    match = CV_ENTRY_PATTERN.match(line.strip())
+    years, text = (match.group(1), match.group(2)) if match else ('', line.strip())
+    start, end = parse_cv_years(years)
+    return {'years': years, 'start': start, 'end': end, 'text': text.strip()}
+
+
+def cv_entry_line(entry):
+    return f"{entry['years']} - {entry['text']}" if entry['years'] else entry['text']
+
+
+class CVStore:
+    """Biography and CV sections in admin_data/cv_sections.json
+
+    Every entry keeps its years label ('2012-present') parsed into start/end
+    years; by_year indexes entries of all sections by the years they cover.
+    Until something is saved the data is read from the hand-written about.html.
+    """
+
+    def __init__(self, project_dir):
+        self.project_dir = Path(project_dir)
+        self.data_file = self.project_dir / "admin_data" / "cv_sections.json"
+        self.records_file = RecordFile(self.data_file)
+        self.stored = False
+        self.bio = []
+        self.sections = []
+        self.by_year = {}
+        self.load()
+
+    def load(self):
+        data = self.records_file.read()
+        self.stored = self.data_file.exists()
+        if self.stored:
+            self.bio = data.get('bio', [])
+            self.sections = data.get('sections', [])
+        elif (self.project_dir / "about.html").exists():
+            self.import_html((self.project_dir / "about.html").read_text(encoding='utf-8'))
+        self.rebuild_index()
+
+    def import_html(self, page):
+        """Read the bio paragraphs and CV sections out of about.html markup"""
+        bio = re.search(r'<div class="bio-text">(.*?)</div>', page, re.S)
+        self.bio = [unescape(re.sub(r'\s+', ' ', paragraph)).strip()
+                    for paragraph in re.findall(r'<p>(.*?)</p>', bio.group(1), re.S)] if bio else []
+        self.sections = []
+        for title, items in CV_SECTION_PATTERN.findall(page):
+            entries = []
+            for years, text in re.findall(r'<li>(?:<strong>(.*?)</strong>\s*-\s*)?(.*?)</li>', items, re.S):
+                start, end = parse_cv_years(years)
+                entries.append({'years': unescape(years).strip(), 'start': start, 'end': end,
+                                'text': unescape(re.sub(r'\s+', ' ', text)).strip()})
+            title = unescape(title).strip()
+            self.sections.append({'id': slugify(title), 'title': title, 'entries': entries})
+
+    def save(self):
+        data = self.records_file.save({'bio': self.bio, 'sections': self.sections})
+        self.bio, self.sections = data['bio'], data['sections']
+        self.stored = True
+        self.rebuild_index()
+
+    def refresh(self):
+        """Pick up a bio or sections saved by another editor; returns 'bio'/'sections' if changed"""
+        if not self.stored:
+            return []
+        data, changed = self.records_file.refresh({'bio': self.bio, 'sections': self.sections})
+        if changed:
+            self.bio, self.sections = data.get('bio', []), data.get('sections', [])
+            self.rebuild_index()
+        return changed
+
+    def rebuild_index(self):
+        """Year -> [(section id, entry)] for every year an entry covers"""
+        self.by_year = {}
+        this_year = datetime.now().year
+        for section in self.sections:
+            for entry in section['entries']:
+                if entry['start'] is None:
+                    continue
+                for year in range(entry['start'], (entry['end'] or this_year) + 1):
+                    self.by_year.setdefault(year, []).append((section['id'], entry))
+
+    def section(self, title):
+        return next((section for section in self.sections
+                     if section['title'].lower() == title.strip().lower()), None)
+
+    def set_section(self, title, text):
+        """Replace a section's entries with one entry per non-empty line
+
+        An unknown title adds a new section; empty text removes the section.
+        """
+        entries = [parse_cv_entry(line) for line in text.splitlines() if line.strip()]
+        section = self.section(title)
+        if not entries:
+            if section:
+                self.sections.remove(section)
+        elif section:
+            section['entries'] = entries
+        else:
+            self.sections.append({'id': slugify(title), 'title': title.strip(), 'entries': entries})
+        self.save()
+
+    def set_bio(self, text):
+        """Bio paragraphs are separated by blank lines"""
+        self.bio = [re.sub(r'\s+', ' ', paragraph).strip()
+                    for paragraph in re.split(r'\n\s*\n', text) if paragraph.strip()]
+        self.save()
+
+
+def render_cv_section(section, indent='                '):
+    """The .cv-section markup for one section"""
+    items = []
+    for entry in section['entries']:
+        years = f"<strong>{escape(entry['years'], False)}</strong> - " if entry['years'] else ''
+        items.append(f"{indent}        <li>{years}{escape(entry['text'], False)}</li>\n")
+    return (f'\n{indent}<div class="cv-section">\n'
+            f'{indent}    <h2>{escape(section["title"], False)}</h2>\n'
+            f'{indent}    <ul class="cv-list">\n'
+            + ''.join(items)
+            + f'{indent}    </ul>\n'
+            f'{indent}</div>\n')
+
+
+def render_bio(paragraphs, indent='                            '):
+    return '\n' + '\n\n'.join(f"{indent}<p>{escape(paragraph, False)}</p>" for paragraph in paragraphs)
+
+
+def render_cv_print(template, fragments):
+    """Standalone print-ready CV from the about.html contact block and section fragments"""
+    contact = re.search(r'<div class="cv-contact-info">.*?</div>', template, re.S)
+    return (CV_PRINT_TEMPLATE
+            .replace('__CONTACT__', contact.group(0) if contact else '')
+            .replace('__SECTIONS__', ''.join(fragments)))
+
+
+def parse_update_date(value):
+    """ISO date (YYYY-MM-DD) from user input; '' when blank"""
+    value = (value or '').strip()
+    if not value:
+        return ''
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        raise ValueError(f"'{value}' is not a date like {datetime.now():%Y-%m-%d}")
+
+
+class UpdatesStore:
+    """Dated update records in admin_data/updates.json
+
+    Until the first save the titles of the hand-written updates.html items
+    are picked up (undated), so switching to generated pages loses nothing.
+    """
+
+    def __init__(self, project_dir):
+        self.project_dir = Path(project_dir)
+        self.data_file = self.project_dir / "admin_data" / "updates.json"
+        self.records_file = RecordFile(self.data_file)
+        self.stored = False
+        self.updates = {}
+        self.load()
+
+    def load(self):
+        self.updates = self.records_file.read()
+        self.stored = self.data_file.exists()
+        if not self.stored and (self.project_dir / "updates.html").exists():
+            page = (self.project_dir / "updates.html").read_text(encoding='utf-8')
+            for i, title in enumerate(re.findall(r'<div class="update-item">\s*<h3>(.*?)</h3>', page, re.S)):
+                record = self.new_record(unescape(title).strip(), '', '', '')
+                # Keep the page order: earlier on the page means newer
+                record['created'] = (datetime.now() - timedelta(seconds=i)).isoformat(timespec='seconds')
+                self.updates[record['id']] = record
+
+    def save(self):
+        self.updates = self.records_file.save(self.updates)
+        self.stored = True
+
+    def refresh(self):
+        """Pick up updates saved by another editor; returns the ids that changed"""
+        if not self.stored:
+            return []
+        self.updates, changed = self.records_file.refresh(self.updates)
+        return changed
+
+    def new_record(self, title, date, content, link):
+        title = title.strip()
+        if not title:
+            raise ValueError("Please enter a title")
+        base = slugify(title) or 'update'
+        update_id = base
+        suffix = 1
+        while update_id in self.updates:
+            suffix += 1
+            update_id = f"{base}-{suffix}"
+        now = datetime.now().isoformat(timespec='seconds')
+        return {'id': update_id, 'title': title, 'date': parse_update_date(date),
+                'content': content.strip(), 'link': link.strip(), 'created': now, 'updated': now}
+
+    def add(self, title, date, content, link=''):
+        record = self.new_record(title, date, content, link)
+        self.updates[record['id']] = record
+        self.save()
+        return record['id']
+
+    def update(self, update_id, title, date, content, link=''):
+        record = dict(self.updates[update_id])
+        if not title.strip():
+            raise ValueError("Please enter a title")
+        record.update({'title': title.strip(), 'date': parse_update_date(date),
+                       'content': content.strip(), 'link': link.strip()})
+        if record != self.updates[update_id]:
+            record['updated'] = datetime.now().isoformat(timespec='seconds')
+            self.updates[update_id] = record
+            self.save()
+        return record
+
+    def delete(self, update_id):
+        record = self.updates.pop(update_id)
+        self.save()
+        return record
+
+    def oldest_first(self):
+        return sorted(self.updates.values(), key=lambda record: (record['date'], record['created']))
+
+    def newest_first(self):
+        return self.oldest_first()[::-1]
+
+    def pages(self, per_page=UPDATES_PER_PAGE):
+        """Pagination windows numbered from the oldest update
+
+        Counting from the oldest keeps every full page stable: a new update
+        only changes the newest (partly filled) page, which is also the
+        front page.
+        """
+        records = self.oldest_first()
+        windows = [records[start:start + per_page] for start in range(0, len(records), per_page)]
+        return windows or [[]]
+
+
+def update_page_name(number, count):
+    return 'updates.html' if number == count else f"updates-page-{number}.html"
+
+
+def render_update_item(record, indent='                        ', permalink=True):
+    """The .update-item markup for one update"""
+    title = escape(record['title'], False)
+    if permalink:
+        title = f'<a href="update-{record["id"]}.html">{title}</a>'
+    lines = [f"<h3>{title}</h3>"]
+    if record['date']:
+        date = datetime.strptime(record['date'], '%Y-%m-%d')
+        lines.append(f'<p class="update-date">{date:%B} {date.day}, {date.year}</p>')
+    for paragraph in re.split(r'\n\s*\n', record['content']):
+        if paragraph.strip():
+            lines.append(f"<p>{escape(paragraph.strip(), False)}</p>")
+    if record['link']:
+        lines.append(f'<p><a href="{escape(record["link"])}" target="_blank">'
+                     f'{escape(record["link"], False)}</a></p>')
+    return (f'{indent}<div class="update-item">\n'
+            + ''.join(f'{indent}    {line}\n' for line in lines)
+            + f'{indent}</div>\n')
+
+
+def render_update_listing(records, number, count, indent='                        '):
+    """Items of one listing page (newest first) plus older/newer links"""
+    items = [render_update_item(record, indent) for record in reversed(records)]
+    links = []
+    if number < count:
+        links.append(f'<a href="{update_page_name(number + 1, count)}">&larr; Newer</a>')
+    if number > 1:
+        links.append(f'<a href="{update_page_name(number - 1, count)}">Older &rarr;</a>')
+    navigation = (f'{indent}<div class="updates-pagination">{" ".join(links)}</div>\n'
+                  if links else '')
+    return ('\n' + '\n'.join(items) + navigation).rstrip('\n')
+
+
+def render_update_permalink(record, indent='                        '):
+    return ('\n' + render_update_item(record, indent, permalink=False)
+            + f'{indent}<div class="updates-pagination">'
+              f'<a href="updates.html">&larr; All updates</a></div>')
+
+
+def update_timestamp(record):
+    """When an update was published, as an aware datetime for the feeds"""
+    if record['date']:
+        return datetime.strptime(record['date'], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(record['updated']).astimezone(timezone.utc)
+
+
+def render_rss_feed(records, site_url):
+    items = []
+    for record in records:
+        url = f"{site_url}update-{record['id']}.html"
+        items.append(
+            f"    <item>\n"
+            f"      <title>{escape(record['title'], False)}</title>\n"
+            f"      <link>{url}</link>\n"
+            f"      <guid isPermaLink=\"true\">{url}</guid>\n"
+            f"      <pubDate>{format_datetime(update_timestamp(record))}</pubDate>\n"
+            f"      <description>{escape(record['content'], False)}</description>\n"
+            f"    </item>\n")
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n'
+            '  <channel>\n'
+            f'    <title>{FEED_TITLE}</title>\n'
+            f'    <link>{site_url}updates.html</link>\n'
+            f'    <description>{FEED_DESCRIPTION}</description>\n'
+            f'    <atom:link href="{site_url}feed.xml" rel="self" type="application/rss+xml"/>\n'
+            + ''.join(items)
+            + '  </channel>\n'
+            '</rss>\n')
+
+
+def render_atom_feed(records, site_url):
+    entries = []
+    for record in records:
+        url = f"{site_url}update-{record['id']}.html"
+        entries.append(
+            f"  <entry>\n"
+            f"    <title>{escape(record['title'], False)}</title>\n"
+            f"    <link href=\"{url}\"/>\n"
+            f"    <id>{url}</id>\n"
+            f"    <updated>{update_timestamp(record).strftime('%Y-%m-%dT%H:%M:%SZ')}</updated>\n"
+            f"    <summary>{escape(record['content'], False)}</summary>\n"
+            f"  </entry>\n")
+    updated = max((update_timestamp(record) for record in records),
+                  default=datetime(2000, 1, 1, tzinfo=timezone.utc))
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+            f'  <title>{FEED_TITLE}</title>\n'
+            f'  <link href="{site_url}updates.html"/>\n'
+            f'  <link href="{site_url}atom.xml" rel="self"/>\n'
+            f'  <id>{site_url}updates.html</id>\n'
+            f'  <updated>{updated.strftime("%Y-%m-%dT%H:%M:%SZ")}</updated>\n'
+            f'  <author><name>Rachael Juzeler</name></author>\n'
+            + ''.join(entries)
+            + '</feed>\n')
+
+
+def render_json_feed(records, site_url):
+    return json.dumps({
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': FEED_TITLE,
+        'home_page_url': f"{site_url}updates.html",
+        'feed_url': f"{site_url}feed.json",
+        'description': FEED_DESCRIPTION,
+        'items': [{
+            'id': f"{site_url}update-{record['id']}.html",
+            'url': f"{site_url}update-{record['id']}.html",
+            'title': record['title'],
+            'content_text': record['content'],
+            'date_published': update_timestamp(record).isoformat(),
+            **({'external_url': record['link']} if record['link'] else {})
+        } for record in records]
+    }, indent=2)
+
+
+def splice_marked_section(page, name, content):
+    """Replace what sits between <!-- NAME START --> and <!-- NAME END --> in a page"""
+    pattern = re.compile(rf'(<!-- {name} START -->)(.*?)(\n[ \t]*<!-- {name} END -->)', re.S)
+    if not pattern.search(page):
+        raise ValueError(f"Page has no {name} START/END markers")
+    return pattern.sub(lambda match: match.group(1) + content + match.group(3), page, count=1)
+
+
+def render_image_tag(src, alt, dimensions, css_class=None, lazy=True, priority=False,
+                     srcset=None, sizes=None):
+    attributes = [f'src="{escape(src)}"']
+    if srcset:
+        attributes.append(f'srcset="{escape(", ".join(f"{url} {width}w" for url, width in srcset))}"')
+        attributes.append(f'sizes="{escape(sizes)}"')
+    attributes.append(f'alt="{escape(alt)}"')
+    if dimensions:
+        attributes.append(f'width="{dimensions[0]}" height="{dimensions[1]}"')
+    if lazy:
+        attributes.append('loading="lazy" decoding="async"')
+    if priority:
+        attributes.append('fetchpriority="high"')
+    if css_class:
+        attributes.append(f'class="{css_class}"')
+    return f"<img {' '.join(attributes)}>"
+
+
+def render_available_listing(works, dimensions, indent='                '):
+    """The .available-grid markup for the available page"""
+    items = []
+    for work in works:
+        image = work['images'][0] if work['images'] else None
+        thumbnail = (render_image_tag(image, work['title'], dimensions.get(image))
+                     if image else f"<p>{escape(work['title'])}</p>")
+        details = [f'<p class="available-title">{escape(work["title"])}</p>']
+        for field in ('medium', 'dimensions'):
+            if work[field]:
+                details.append(f'<p>{escape(work[field])}</p>')
+        price = ("SOLD" if work['status'] == 'sold'
+                 else format_price(work['price'])
+                 + (" | ON HOLD" if work['status'] == 'on hold' else ''))
+        details.append(f'<p class="available-price">{escape(price)}</p>')
+        items.append(
+            f'{indent}    <div class="available-item {work["status"].replace(" ", "-")}">\n'
+            f'{indent}        <a href="available-{work["id"]}.html">\n'
+            f'{indent}            <div class="available-image">{thumbnail}</div>\n'
+            f'{indent}            <div class="available-details">\n'
+            + ''.join(f'{indent}                {line}\n' for line in details)
+            + f'{indent}            </div>\n'
+            f'{indent}        </a>\n'
+            f'{indent}    </div>\n')
+    return (f'\n{indent}<div class="available-grid">\n' + '\n'.join(items)
+            + f'{indent}</div>')
+
+
+def render_available_work(work, dimensions, indent='                '):
+    """Detail markup for one work's page"""
+    lines = ['<a class="available-back" href="available.html">&larr; All available work</a>']
+    for i, image in enumerate(work['images']):
+        lines.append(render_image_tag(image, work['title'], dimensions.get(image), lazy=i > 0))
+    lines.append(f'<h2 class="available-title">{escape(work["title"])}</h2>')
+    for field in ('medium', 'dimensions'):
+        if work[field]:
+            lines.append(f'<p>{escape(work[field])}</p>')
+    lines.append(f'<p class="available-price">{escape(format_price(work["price"]))}</p>')
+    lines.append(f'<p class="available-status">{AVAILABLE_STATUSES[work["status"]]}</p>')
+    return (f'\n{indent}<div class="available-work {work["status"].replace(" ", "-")}">\n'
+            + ''.join(f'{indent}    {line}\n' for line in lines)
+            + f'{indent}</div>')
+
+
+def render_project_page(template, project_id, folder, title, main, gallery, dimensions, hero=None):
+    """project-<id>.html: the hero preloaded at high priority, the gallery lazy-loaded
+
+    hero lists the scaled copies of the main image as [[path, width], ...],
+    smallest first; when there are any the page and its preload use them
+    through srcset instead of the original.
+    """
+    page = template.replace('<body>', f'<body data-project="{escape(project_id)}">', 1)
+    page = page.replace('</head>', f'    <link rel="preload" as="fetch" href="projects/{escape(project_id)}.json" '
+                                   f'crossorigin>\n</head>', 1)
+    if main:
+        src = hero[-1][0] if hero else f"images/{folder}/{main}"
+        preload = f'<link rel="preload" as="image" href="{escape(src)}"'
+        if hero:
+            srcset = ", ".join(f"{url} {width}w" for url, width in hero)
+            preload += f' imagesrcset="{escape(srcset)}" imagesizes="{escape(HERO_SIZES_ATTRIBUTE)}"'
+        page = page.replace('</head>', f'    {preload} fetchpriority="high">\n</head>', 1)
+        page = splice_marked_section(page, 'PROJECT IMAGE', '\n                            ' + render_image_tag(
+            src, f"{title} - Main Image", dimensions.get(main), lazy=False, priority=True,
+            srcset=hero, sizes=HERO_SIZES_ATTRIBUTE))
+    images = ''.join(
+        '\n                    ' + render_image_tag(f"images/{folder}/{name}",
+                                                   f"{title} - {Path(name).stem}",
+                                                   dimensions.get(name), 'project-image')
+        for name in gallery)
+    return splice_marked_section(page, 'PROJECT GALLERY', images)
+
+
+def render_grid_index(page, grid_tiles):
+    """index.html with each work item's square tile in place of the script-loaded background
+
+    grid_tiles maps project ids to {'title': ..., 'tiles': [[path, width], ...]},
+    smallest first. The first row loads eagerly, the rest lazily.
+    """
+    position = [0]
+
+    def add_tile(match):
+        project = grid_tiles.get(match.group(2))
+        eager = position[0] < GRID_EAGER_TILES
+        position[0] += 1
+        if not project:
+            return match.group(0)
+        src, width = project['tiles'][0]
+        return match.group(1) + render_image_tag(
+            src, project['title'], (width, width), lazy=not eager,
+            srcset=project['tiles'], sizes=GRID_TILE_SIZES_ATTRIBUTE) + match.group(3)
+
+    return re.sub(r'(<div class="work-item" data-project="([^"]+)">\s*<div class="work-item-image">)(</div>)',
+                  add_tile, page)
+
+
+def image_loading_estimate(hero, gallery, lazy):
+    """Image bytes requested with the hero on first load, and the hero's share of them
+
+    Eagerly loaded gallery images download alongside the hero and slow it
+    down; lazy ones wait until they near the viewport.
+    """
+    eager = hero + (0 if lazy else sum(gallery))
+    return {
+        'eager_images': (1 if hero else 0) + (0 if lazy else len(gallery)),
+        'eager_bytes': eager,
+        'hero_share': round(hero / eager, 3) if eager else None
+    }
+
+
+SERVICE_WORKER_TEMPLATE = """// Generated by rachael_content_manager.py build - do not edit by hand
+const BUILD_HASH = '__BUILD_HASH__';
+const SHELL_CACHE = `rj-shell-${BUILD_HASH}`;
+const IMAGE_CACHE = `rj-images-${BUILD_HASH}`;
+const IMAGE_CACHE_MAX_BYTES = __IMAGE_CACHE_MAX_BYTES__;
+const PRECACHE_URLS = __PRECACHE_URLS__;
+const GRID_TILE_DIR = '__GRID_TILE_DIR__';
+const FONT_HOSTS = ['fonts.googleapis.com', 'fonts.gstatic.com'];
+const IMAGE_PATTERN = /\\/images\\/.+\\.(jpe?g|png|webp|gif)$/i;
+const PROJECT_IMAGE_PATTERN = /^(.*\\/images\\/[^/]+\\/)[^/]+$/;
+
+// Precache the page shell, project pages and grid images for this build
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(SHELL_CACHE)
+            .then(cache => cache.addAll(PRECACHE_URLS.map(url => new Request(url, { cache: 'reload' }))))
+            .then(() => self.skipWaiting())
+    );
+});
+
+// Drop caches left behind by previous builds
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(keys
+                .filter(key => key.startsWith('rj-') && key !== SHELL_CACHE && key !== IMAGE_CACHE)
+                .map(key => caches.delete(key))))
+            .then(() => self.clients.claim())
+    );
+});
+
+// Evict the oldest full-size images until the cache fits its byte budget
+function trimImageCache() {
+    return caches.open(IMAGE_CACHE).then(cache => cache.keys().then(requests =>
+        Promise.all(requests.map(request => cache.match(request).then(response => {
+            const length = parseInt(response.headers.get('content-length'), 10);
+            return isNaN(length) ? response.blob().then(blob => blob.size) : length;
+        }))).then(sizes => {
+            let total = sizes.reduce((sum, size) => sum + size, 0);
+            const deletions = [];
+            for (let i = 0; i < requests.length && total > IMAGE_CACHE_MAX_BYTES; i++) {
+                deletions.push(cache.delete(requests[i]));
+                total -= sizes[i];
+            }
+            return Promise.all(deletions);
+        })
+    ));
+}
+
+// Offline with a full-size project image never seen: show the project's precached grid tile
+function tileFallback(request) {
+    const match = new URL(request.url).pathname.match(PROJECT_IMAGE_PATTERN);
+    if (!match) {
+        return Response.error();
+    }
+    const prefix = new URL(`${match[1]}${GRID_TILE_DIR}/`, request.url).href;
+    return caches.open(SHELL_CACHE).then(cache => cache.keys().then(requests => {
+        const tile = requests.find(cached => cached.url.startsWith(prefix));
+        return tile ? cache.match(tile) : Response.error();
+    }));
+}
+
+function staleWhileRevalidate(event) {
+    return caches.open(IMAGE_CACHE).then(cache => cache.match(event.request).then(cached => {
+        const network = fetch(event.request).then(response => {
+            if (response.ok) {
+                event.waitUntil(cache.put(event.request, response.clone()).then(trimImageCache));
+            }
+            return response;
+        });
+
+        if (cached) {
+            event.waitUntil(network.catch(() => undefined));
+            return cached;
+        }
+        return network.catch(() => tileFallback(event.request));
+    }));
+}
+
+function cacheFirst(event, options) {
+    return caches.open(SHELL_CACHE).then(cache => cache.match(event.request, options).then(cached => {
+        if (cached) {
+            return cached;
+        }
+        return fetch(event.request).then(response => {
+            if (response.ok || response.type === 'opaque') {
+                event.waitUntil(cache.put(event.request, response.clone()));
+            }
+            return response;
+        }).catch(() => event.request.mode === 'navigate'
+            ? cache.match('index.html')
+            : Response.error());
+    }));
+}
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') {
+        return;
+    }
+
+    const url = new URL(request.url);
+    if (FONT_HOSTS.includes(url.hostname)) {
+        event.respondWith(cacheFirst(event));
+        return;
+    }
+    if (url.origin !== self.location.origin) {
+        return;
+    }
+
+    if (request.mode === 'navigate') {
+        // Projects have their own project-<id>.html; ignoreSearch still lets old
+        // project.html?id=... links (and ?utm_ tracking links) hit the cached page
+        event.respondWith(cacheFirst(event, { ignoreSearch: true }));
+    } else if (IMAGE_PATTERN.test(url.pathname)) {
+        event.respondWith(caches.match(request, { cacheName: SHELL_CACHE })
+            .then(cached => cached || staleWhileRevalidate(event)));
+    } else {
+        event.respondWith(cacheFirst(event));
+    }
+});
+"""
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Return the hex SHA-256 digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_if_changed(path, content):
+    """Write text content only when it differs from what is on disk"""
+    path = Path(path)
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique so that concurrent writers never rename each other's temp file
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+MERGE_MISSING = object()
+
+
+def file_signature(path):
+    """(inode, mtime, size) of a file, or None when it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class DataFileLock:
+    """Advisory exclusive lock on a file, held on a .<name>.lock file beside it
+
+    Every writer of the file takes it, so the GUI, command line runs and
+    watch builds never interleave their read-merge-write cycles.
+    """
+
+    def __init__(self, path, timeout=DATA_LOCK_TIMEOUT):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(f".{self.path.name}.lock")
+        self.timeout = timeout
+        self.handle = None
+
+    def try_lock(self):
+        if fcntl:
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            self.handle.seek(0)
+            msvcrt.locking(self.handle.fileno(), msvcrt.LK_NBLCK, 1)
+
+    def __enter__(self):
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        self.handle = open(self.lock_path, 'a+')
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self.try_lock()
+                return self
+            except OSError:
+                if time.monotonic() >= deadline:
+                    self.handle.close()
+                    raise TimeoutError(f"{self.path.name} is locked by another editor")
+                time.sleep(LOCK_RETRY_SECONDS)
+
+    def __exit__(self, *exc_info):
+        if fcntl:
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+        else:
+            self.handle.seek(0)
+            msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+        self.handle.close()
+        return False
+
+
+def record_list_ids(value):
+    """Ids of a list of records that all have an 'id', else None"""
+    if isinstance(value, list) and all(isinstance(item, dict) and 'id' in item for item in value):
+        return [item['id'] for item in value]
+    return None
+
+
+def merge_json(base, ours, theirs, path='', conflicts=None):
+    """Three-way merge of JSON values; returns (merged, conflicting paths)
+
+    A value only one side changed is taken from that side. Dicts, and lists
+    of records with an 'id', are merged member by member; where both sides
+    changed the same value differently, ours wins.
+    """
+    conflicts = [] if conflicts is None else conflicts
+    if ours == base or ours == theirs:
+        return theirs, conflicts
+    if theirs == base:
+        return ours, conflicts
+    if base is MERGE_MISSING and isinstance(ours, dict) and isinstance(theirs, dict):
+        base = {}  # Both sides added the same record
+
+    if all(isinstance(value, dict) for value in (base, ours, theirs)):
+        merged = {}
+        for key in list(ours) + [key for key in theirs if key not in ours]:
+            value, _ = merge_json(base.get(key, MERGE_MISSING), ours.get(key, MERGE_MISSING),
+                                  theirs.get(key, MERGE_MISSING),
+                                  f"{path}.{key}" if path else str(key), conflicts)
+            if value is not MERGE_MISSING:
+                merged[key] = value
+        return merged, conflicts
+
+    if None not in [record_list_ids(value) for value in (base, ours, theirs)]:
+        merged, _ = merge_json(*[{item['id']: item for item in value}
+                                 for value in (base, ours, theirs)], path, conflicts)
+        return list(merged.values()), conflicts
+
+    conflicts.append(path or '(whole file)')
+    return ours, conflicts
+
+
+class RecordFile:
+    """A JSON data file that several editors may save at the same time
+
+    Saves happen under a DataFileLock and three-way merge this editor's
+    changes with whatever was saved since it last read the file, so edits
+    to different records (or fields) all survive. The file's inode, mtime
+    and size tell cheaply whether someone else changed it.
+    """
+
+    def __init__(self, path, log=print):
+        self.path = Path(path)
+        self.log = log
+        self.base = {}
+        self.signature = None
+        self.conflicts = []
+
+    def read(self):
+        """Load the file (empty when missing) and remember it as the merge base"""
+        signature = file_signature(self.path)
+        data = {}
+        if signature is not None:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        self.base, self.signature = data, signature
+        return copy.deepcopy(data)
+
+    def changed(self):
+        """Whether the file on disk is no longer the one last read or written"""
+        return file_signature(self.path) != self.signature
+
+    def save(self, data):
+        """Write data merged with concurrent changes; returns the merged data"""
+        with DataFileLock(self.path):
+            base = self.base
+            theirs = self.read() if self.changed() else copy.deepcopy(base)
+            merged, conflicts = merge_json(base, data, theirs)
+            write_if_changed(self.path, json.dumps(merged, indent=2))
+            self.base, self.signature = copy.deepcopy(merged), file_signature(self.path)
+        if conflicts:
+            self.log(f"{self.path.name}: another editor also changed {', '.join(conflicts)}; "
+                     f"kept the version saved here")
+            self.conflicts.extend(conflicts)
+        return merged
+
+    def refresh(self, data):
+        """Bring in changes saved elsewhere; returns (data, top-level keys that changed)
+
+        Unsaved changes in data are kept.
+        """
+        if not self.changed():
+            return data, []
+        base = self.base
+        merged, _ = merge_json(base, data, self.read())
+        return merged, sorted(key for key in set(merged) | set(data)
+                              if merged.get(key) != data.get(key))
+
+
+class ChangeDetector:
+    """Notices added, removed and modified files from stat() alone"""
+
+    def __init__(self, list_files):
+        self.list_files = list_files
+        self.signatures = self.scan()
+
+    def scan(self):
+        return {path: file_signature(path) for path in self.list_files()}
+
+    def poll(self):
+        """Paths that changed since the previous poll"""
+        current = self.scan()
+        changed = sorted(path for path in set(current) | set(self.signatures)
+                         if current.get(path) != self.signatures.get(path))
+        self.signatures = current
+        return changed
+
+
+def format_bytes(size):
+    """Human readable byte count"""
+    for unit in ['B', 'KB', 'MB']:
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def compress_file(path, cache=None):
+    """Write maximum-level .gz (and .br when available) siblings; return sizes
+
+    With a BuildCache, content compressed before is not compressed again.
+    """
+    data = path.read_bytes()
+    sizes = {'raw': len(data)}
+    digest = hashlib.sha256(data).hexdigest()
+
+    gz_data = cache.get('gzip', digest, 9) if cache else None
+    if gz_data is None:
+        gz_data = gzip.compress(data, compresslevel=9, mtime=0)
+        if cache:
+            cache.put('gzip', digest, gz_data, 9)
+    write_if_changed(path.with_name(path.name + '.gz'), gz_data)
+    sizes['gzip'] = len(gz_data)
+
+    br_path = path.with_name(path.name + '.br')
+    if brotli is not None:
+        br_data = cache.get('brotli', digest, 11) if cache else None
+        if br_data is None:
+            br_data = brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+            if cache:
+                cache.put('brotli', digest, br_data, 11)
+        write_if_changed(br_path, br_data)
+        sizes['br'] = len(br_data)
+    elif br_path.exists():
+        # A stale .br would be served for content that has since changed
+        br_path.unlink()
+    return sizes
+
+
+JS_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+                     'void', 'throw', 'instanceof', 'yield', 'await'}
+JS_TIGHT_PUNCTUATION = set('{}()[];,:=<>!?&|*%^~')
+JS_RESTRICTED_WORDS = {'return', 'break', 'continue', 'throw', 'yield', 'async'}
+HTML_PRESERVED_PATTERN = re.compile(r'<(pre|textarea|script|style)\b.*?</\1\s*>|<!--.*?-->', re.S | re.I)
+CSS_TOKEN_PATTERN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/)', re.S)
+
+
+def js_string_end(source, i):
+    """Index just past the quoted string starting at i"""
+    quote = source[i]
+    j = i + 1
+    while j < len(source):
+        if source[j] == '\\':
+            j += 2
+            continue
+        if source[j] == quote:
+            return j + 1
+        if source[j] == '\n':
+            return j
+        j += 1
+    return len(source)
+
+
+def js_template_end(source, i):
+    """Index just past the template literal starting at i, ${} expressions included"""
+    j = i + 1
+    while j < len(source):
+        if source[j] == '\\':
+            j += 2
+        elif source[j] == '`':
+            return j + 1
+        elif source.startswith('${', j):
+            depth = 1
+            j += 2
+            while j < len(source) and depth:
+                if source[j] in '\'"':
+                    j = js_string_end(source, j)
+                    continue
+                if source[j] == '`':
+                    j = js_template_end(source, j)
+                    continue
+                depth += {'{': 1, '}': -1}.get(source[j], 0)
+                j += 1
+        else:
+            j += 1
+    return len(source)
+
+
+def js_regex_end(source, i):
+    """Index just past the regex literal (flags included) starting at i"""
+    j = i + 1
+    in_class = False
+    while j < len(source) and source[j] != '\n':
+        if source[j] == '\\':
+            j += 2
+            continue
+        if source[j] == '[':
+            in_class = True
+        elif source[j] == ']':
+            in_class = False
+        elif source[j] == '/' and not in_class:
+            j += 1
+            break
+        j += 1
+    while j < len(source) and source[j].isalpha():
+        j += 1
+    return j
+
+
+def js_tokens(source):
+    """Split JavaScript into (kind, text) tokens: space, comment, string, regex, word or punct
+
+    Only as much of the grammar as minify_js() needs: strings, template
+    literals and regex literals come back whole so nothing inside them is
+    touched.
+    """
+    tokens = []
+    previous = None  # Last token that is not space or a comment
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char.isspace():
+            j = i
+            while j < len(source) and source[j].isspace():
+                j += 1
+            kind = 'space'
+        elif source.startswith('//', i):
+            j = source.find('\n', i)
+            j = len(source) if j < 0 else j
+            kind = 'comment'
+        elif source.startswith('/*', i):
+            j = source.find('*/', i + 2)
+            j = len(source) if j < 0 else j + 2
+            kind = 'comment'
+        elif char in '\'"':
+            j = js_string_end(source, i)
+            kind = 'string'
+        elif char == '`':
+            j = js_template_end(source, i)
+            kind = 'string'
+        elif char == '/' and (previous is None
+                              or (previous[0] == 'punct' and previous[1] in JS_REGEX_PRECEDERS)
+                              or (previous[0] == 'word' and previous[1] in JS_REGEX_KEYWORDS)):
+            j = js_regex_end(source, i)
+            kind = 'regex'
+        elif char.isalnum() or char in '_$':
+            j = i
+            while j < len(source) and (source[j].isalnum() or source[j] in '_$'):
+                j += 1
+            kind = 'word'
+        else:
+            j = i + 1
+            kind = 'punct'
+        tokens.append((kind, source[i:j]))
+        if kind not in ('space', 'comment'):
+            previous = tokens[-1]
+        i = j
+    return tokens
+
+
+def minify_js(source):
+    """Drop comments, indentation and blank lines from JavaScript
+
+    Line breaks only go where the next token continues the statement anyway
+    (and never after return and the like), so automatic semicolon insertion
+    reads the code the same way; spaces only go next to punctuation that
+    separates the tokens anyway (never + - / or .).
+    """
+    tokens = []
+    for kind, text in js_tokens(source):
+        if kind == 'comment':
+            kind, text = 'space', ' '
+        if kind == 'space' and tokens and tokens[-1][0] == 'space':
+            tokens[-1] = ('space', tokens[-1][1] + text)
+        else:
+            tokens.append((kind, text))
+
+    output = []
+    for index, (kind, text) in enumerate(tokens):
+        if kind != 'space':
+            output.append(text)
+            continue
+        after = tokens[index + 1][1] if index + 1 < len(tokens) else ''
+        if not output or not after:
+            continue
+        before = output[-1][-1]
+        if '\n' in text:
+            continues = before in '{([,;' or (after[0] in '})].?:,;=&|(['
+                                               and output[-1] not in JS_RESTRICTED_WORDS)
+            if not continues:
+                output.append('\n')
+        elif before not in JS_TIGHT_PUNCTUATION and after[0] not in JS_TIGHT_PUNCTUATION:
+            output.append(' ')
+    return ''.join(output) + '\n'
+
+
+def minify_css(source):
+    """Drop comments and the whitespace CSS does not need"""
+    parts = CSS_TOKEN_PATTERN.split(source)
+    text = ''.join(' ' if index % 2 and part.startswith('/*') else part
+                   for index, part in enumerate(parts))
+    output = []
+    for index, part in enumerate(CSS_TOKEN_PATTERN.split(text)):
+        if index % 2 == 0:
+            part = re.sub(r'\s+', ' ', part)
+            part = re.sub(r' ?([{};,>]) ?', r'\1', part)
+            part = part.replace(': ', ':').replace(';}', '}')
+        output.append(part)
+    return ''.join(output).strip() + '\n'
+
+
+def minify_html(source):
+    """Drop comments and collapse whitespace outside pre, textarea, script and style
+
+    A run of whitespace renders as one space, so each run becomes a single
+    newline or space; nothing between inline elements disappears.
+    """
+    def collapse(text):
+        return re.sub(r'\s+', lambda match: '\n' if '\n' in match.group(0) else ' ', text)
+
+    output = []
+    text = ''
+    position = 0
+    for match in HTML_PRESERVED_PATTERN.finditer(source):
+        text += source[position:match.start()]
+        position = match.end()
+        if match.group(0).startswith('<!--') and not match.group(0).startswith('<!--['):
+            continue  # Dropped; the text on both sides collapses as one run
+        output.append(collapse(text) + match.group(0))
+        text = ''
+    output.append(collapse(text + source[position:]))
+    return ''.join(output).strip() + '\n'
+
+
+MINIFIERS = {'.html': minify_html, '.css': minify_css, '.js': minify_js}
+
+
+def script_chunk_name(chunk):
+    return f"script-{chunk}.js" if chunk else 'script.js'
+
+
+def split_script(source, chunks=SCRIPT_CHUNKS):
+    """Split script.js into shared code and per-page chunks, leaving out projectData
+
+    Each top-level block (a declaration or statement with the comments
+    above it) goes to the chunk listing the function it declares. Other
+    statements follow the chunk functions they mention when those all sit
+    in one chunk, and are shared otherwise. Returns {chunk or None: source}.
+    """
+    owner = {name: chunk for chunk, names in chunks.items() for name in names}
+    parts = {None: []}
+    for block in re.split(r'\n[ \t]*\n(?=[^\s})\]])', source.strip()):
+        if PROJECT_DATA_PATTERN.match(block):
+            continue
+        declared = re.search(r'^function (\w+)', block, re.M)
+        if declared:
+            chunk = owner.get(declared.group(1))
+        else:
+            used = {owner[name] for name in re.findall(r'\b\w+\b', block) if name in owner}
+            chunk = used.pop() if len(used) == 1 else None
+        parts.setdefault(chunk, []).append(block)
+    return {chunk: '\n\n'.join(blocks) + '\n' for chunk, blocks in parts.items()}
+
+
+def add_script_chunks(page, chunks):
+    """Load the page-specific script chunks a page needs right after script.js"""
+    tags = ''.join(f'\n    <script src="{script_chunk_name(chunk)}"></script>'
+                   for chunk, marker in SCRIPT_CHUNK_PAGES.items() if chunk in chunks and marker in page)
+    tag = '<script src="script.js"></script>'
+    return page.replace(tag, tag + tags, 1) if tags else page
+
+
+def parse_script_projects(script_content):
+    """Extract the projectData entries from script.js source"""
+    # Extract projectData object using regex
+    match = re.search(r'const projectData = \{(.*?)\};', script_content, re.DOTALL)
+    if not match:
+        return {}
+
+    projects = {}
+    for project_id, project_content in re.findall(r'(project\d+):\s*\{([^}]+)\}',
+                                                  match.group(1), re.DOTALL):
+        record = {}
+        for field in PROJECT_DATA_FIELDS:
+            # Whole string literals, so apostrophes and \n escapes in descriptions survive
+            field_match = re.search(rf'{field}:\s*("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')',
+                                    project_content)
+            record[field] = js_string_value(field_match.group(1)) if field_match else ''
+        record['folder'] = record['folder'] or project_id
+        projects[project_id] = record
+    return projects
+
+
+def js_string_value(literal):
+    """The value of a quoted JavaScript string literal"""
+    body = literal[1:-1]
+    if literal[0] == "'":
+        body = re.sub(r'\\(.)|"', lambda match: ('\\"' if match.group(0) == '"'
+                                                 else "'" if match.group(1) == "'"
+                                                 else match.group(0)), body)
+    try:
+        return json.loads(f'"{body}"')
+    except ValueError:
+        return body
+
+
+def load_project_records(project_dir):
+    """Projects from script.js merged with the content manager's projects.json"""
+    project_dir = Path(project_dir)
+    projects = {}
+    script_js = project_dir / "script.js"
+    if script_js.exists():
+        with open(script_js, 'r', encoding='utf-8') as f:
+            projects = parse_script_projects(f.read())
+
+    projects_data_file = project_dir / "admin_data" / "projects.json"
+    if projects_data_file.exists():
+        with open(projects_data_file, 'r') as f:
+            projects.update(json.load(f))
+    return projects
+
+
+def tool_versions():
+    """Versions of everything that shapes cached build outputs"""
+    versions = {'cache': BUILD_CACHE_VERSION, 'zlib': zlib.ZLIB_VERSION}
+    if brotli is not None:
+        versions['brotli'] = getattr(brotli, '__version__', 'unknown')
+    if Image is not None:
+        versions['pillow'] = getattr(Image, '__version__', 'unknown')
+    return versions
+
+
+class BuildCache:
+    """Persistent, size-bounded key/value store shared by every build stage
+
+    Keys hash the stage name, the input's content hash, the tool versions and
+    the stage options, so a hit is always safe to reuse. Values are files
+    under .build_cache/cache/; once they outgrow the size limit the least
+    recently used are evicted. Hit/miss counts and bytes saved are kept per
+    stage for this run and in total.
+
+    Builders of different sites may share one cache_dir (see Workspace):
+    lookups also find objects the others stored, and making() lets only one
+    of them produce a given output at a time.
+    """
+
+    # Shared by every instance in the process, whatever cache_dir it uses
+    stripes = [threading.Lock() for _ in range(BUILD_CACHE_LOCK_STRIPES)]
+
+    def __init__(self, project_dir, log=print, cache_dir=None):
+        self.cache_dir = Path(cache_dir) if cache_dir else Path(project_dir) / BUILD_STATE_DIR / "cache"
+        self.index_file = self.cache_dir / "index.json"
+        self.log = log
+        self.versions = tool_versions()
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.totals = {}
+        self.max_bytes = BUILD_CACHE_MAX_BYTES
+        self.stats = {}
+        self.load()
+
+    def load(self):
+        if not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, 'r') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            self.log(f"Ignoring unreadable build cache index: {e}")
+            return
+        self.entries = stored.get('entries', {})
+        self.totals = stored.get('totals', {})
+        self.max_bytes = stored.get('max_bytes', BUILD_CACHE_MAX_BYTES)
+
+    def key(self, stage, content_hash, options=None):
+        return hashlib.sha256(json.dumps([stage, content_hash, self.versions, options],
+                                         sort_keys=True).encode('utf-8')).hexdigest()
+
+    def object_path(self, key):
+        return self.cache_dir / key[:2] / key
+
+    def count(self, stage, outcome, size=0):
+        stats = self.stats.setdefault(stage, {'hits': 0, 'misses': 0, 'bytes_saved': 0})
+        stats[outcome] += 1
+        stats['bytes_saved'] += size
+
+    def get(self, stage, content_hash, options=None):
+        """Cached bytes for an input, or None"""
+        key = self.key(stage, content_hash, options)
+        try:
+            data = self.object_path(key).read_bytes()
+        except OSError:
+            data = None
+        with self.lock:
+            if data is None:
+                self.entries.pop(key, None)
+                self.count(stage, 'misses')
+            else:
+                # Another builder sharing the cache may have stored it since load()
+                entry = self.entries.setdefault(key, {'stage': stage, 'size': len(data)})
+                entry['used'] = time.time()
+                self.count(stage, 'hits', len(data))
+        return data
+
+    def making(self, stage, content_hash, options=None):
+        """Lock to hold while looking up and producing an output
+
+        Concurrent builders then make each output once; the others wait and
+        get a hit.
+        """
+        key = self.key(stage, content_hash, options)
+        return self.stripes[int(key[:8], 16) % len(self.stripes)]
+
+    def put(self, stage, content_hash, data, options=None):
+        """Store the output made from an input"""
+        key = self.key(stage, content_hash, options)
+        path = self.object_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{key}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        with self.lock:
+            self.entries[key] = {'stage': stage, 'size': len(data), 'used': time.time()}
+
+    def get_json(self, stage, content_hash, options=None):
+        data = self.get(stage, content_hash, options)
+        return json.loads(data) if data is not None else None
+
+    def put_json(self, stage, content_hash, value, options=None):
+        self.put(stage, content_hash, json.dumps(value, sort_keys=True).encode('utf-8'), options)
+
+    def size(self):
+        return sum(entry['size'] for entry in self.entries.values())
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits its size limit"""
+        total = self.size()
+        evicted = 0
+        for key in sorted(self.entries, key=lambda key: self.entries[key]['used']):
+            if total <= self.max_bytes:
+                break
+            total -= self.entries.pop(key)['size']
+            try:
+                self.object_path(key).unlink()
+            except OSError:
+                pass
+            evicted += 1
+        return evicted
+
+    def save(self):
+        """Merge with entries other processes added, evict, and persist the index"""
+        with DataFileLock(self.index_file), self.lock:
+            stats, self.stats = self.stats, {}
+            known = self.entries
+            self.load()
+            for key, entry in known.items():
+                if key not in self.entries or self.entries[key]['used'] < entry['used']:
+                    self.entries[key] = entry
+            for stage, counts in stats.items():
+                total = self.totals.setdefault(stage, {'hits': 0, 'misses': 0, 'bytes_saved': 0})
+                for name, value in counts.items():
+                    total[name] += value
+            evicted = self.evict()
+            self.write_index()
+        return {'stages': stats, 'evicted': evicted, 'bytes': self.size()}
+
+    def write_index(self):
+        write_if_changed(self.index_file, json.dumps({
+            'max_bytes': self.max_bytes,
+            'entries': self.entries,
+            'totals': self.totals
+        }, sort_keys=True))
+
+    def set_limit(self, max_bytes):
+        """Change the size limit for every editor; returns the number of entries evicted"""
+        with DataFileLock(self.index_file), self.lock:
+            self.load()
+            self.max_bytes = max_bytes
+            evicted = self.evict()
+            self.write_index()
+        return evicted
+
+    def clear(self):
+        """Delete every cached output; returns bytes freed"""
+        with DataFileLock(self.index_file), self.lock:
+            self.load()
+            freed = self.size()
+            for path in self.cache_dir.iterdir():
+                if path.is_dir():
+                    shutil.rmtree(path)
+            self.entries = {}
+            self.write_index()
+        return freed
+
+    def summary(self, stages):
+        """One line of hit rate and savings for {stage: counts}"""
+        hits = sum(counts['hits'] for counts in stages.values())
+        lookups = hits + sum(counts['misses'] for counts in stages.values())
+        saved = sum(counts['bytes_saved'] for counts in stages.values())
+        rate = f"{hits / lookups:.0%}" if lookups else "-"
+        return (f"{hits} of {lookups} lookups hit ({rate}), {format_bytes(saved)} reused; "
+                f"{format_bytes(self.size())} of {format_bytes(self.max_bytes)} used")
+
+
+class SiteBuilder:
+    """Incremental build of the publishable site into _site/"""
+
+    def __init__(self, project_dir, output_dir=None, log=print, progress=None, minify=True,
+                 cache_dir=None):
+        self.project_dir = Path(project_dir)
+        self.output_dir = Path(output_dir) if output_dir else self.project_dir / BUILD_OUTPUT_DIR
+        self.minify = minify
+        self.images_dir = self.project_dir / "images"
+        self.data_dir = self.project_dir / "admin_data"
+        self.state_dir = self.project_dir / BUILD_STATE_DIR
+        self.manifest_file = self.state_dir / "build_manifest.json"
+        self.log = log
+        self.progress = progress
+        self.cache = BuildCache(self.project_dir, log=log, cache_dir=cache_dir)
+        self.catalog = ImageCatalog(self.project_dir, log=log, cache=self.cache)
+        self.available = AvailableWorksStore(self.project_dir)
+        self.cv = CVStore(self.project_dir)
+        self.updates = UpdatesStore(self.project_dir)
+        self.galleries = {}
+        self.grid_tiles = {}
+        self.hero_images = {}
+        self.script_chunks = []
+        self.text_sizes = {}
+        self.generated = {}
+        self.previous_pages = {}
+        self.pages = {}
+
+    def stage(self, fraction, message):
+        """Report build progress to a job runner, if any"""
+        if self.progress:
+            self.progress(fraction, message)
+
+    def output_transform(self, rel_path):
+        """What finish_text() does to an output, as a JSON value; None for files published as-is"""
+        suffix = Path(rel_path).suffix.lower()
+        if suffix not in MINIFIED_EXTENSIONS:
+            return None
+        return [self.minify, self.script_chunks if suffix == '.html' else []]
+
+    def finish_text(self, rel_path, data):
+        """Add page script chunks to HTML and minify HTML, CSS and JS outputs"""
+        suffix = Path(rel_path).suffix.lower()
+        if suffix not in MINIFIED_EXTENSIONS:
+            return data
+        text = data.decode('utf-8')
+        if suffix == '.html':
+            text = add_script_chunks(text, self.script_chunks)
+        finished = text.encode('utf-8')
+        if self.minify:
+            digest = hashlib.sha256(finished).hexdigest()
+            minified = self.cache.get('minify', digest, suffix)
+            if minified is None:
+                minified = MINIFIERS[suffix](text).encode('utf-8')
+                self.cache.put('minify', digest, minified, suffix)
+            finished = minified
+        self.text_sizes[rel_path] = [len(data), len(finished)]
+        return finished
+
+    def write_output(self, rel_path, content):
+        """Write a generated output file, remembering it for hashing and stale-output cleanup"""
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        data = self.finish_text(rel_path, data)
+        self.generated[rel_path] = hashlib.sha256(data).hexdigest()
+        return write_if_changed(self.output_dir / rel_path, data)
+
+    def render_page(self, rel_path, dependencies, render):
+        """Generate a page only when something it is rendered from changed
+
+        dependencies is any JSON-serializable value covering every input of
+        render(); returns True when the page was rendered again.
+        """
+        key = hashlib.sha256(json.dumps([dependencies, self.output_transform(rel_path)],
+                                        sort_keys=True).encode('utf-8')).hexdigest()
+        previous = self.previous_pages.get(rel_path)
+        if previous and previous['key'] == key and (self.output_dir / rel_path).exists():
+            self.generated[rel_path] = previous['sha256']
+            self.pages[rel_path] = previous
+            return False
+        data = self.cache.get('page', key, rel_path)
+        if data is None:
+            content = render()
+            data = content.encode('utf-8') if isinstance(content, str) else content
+            self.cache.put('page', key, data, rel_path)
+        self.write_output(rel_path, data)
+        self.pages[rel_path] = {'key': key, 'sha256': self.generated[rel_path]}
+        return True
+
+    def remove_output(self, rel_path):
+        """Delete an output file and its pre-compressed siblings"""
+        path = self.output_dir / rel_path
+        existed = path.exists()
+        for candidate in [path] + [path.with_name(path.name + suffix) for suffix in COMPRESSED_SUFFIXES]:
+            if candidate.exists():
+                candidate.unlink()
+        return existed
+
+    def load_manifest(self):
+        """Load the manifest of the previous build"""
+        if self.manifest_file.exists():
+            try:
+                with open(self.manifest_file, 'r') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                self.log(f"Ignoring unreadable build manifest: {e}")
+        return {'files': {}}
+
+    def save_manifest(self, manifest):
+        """Save the build manifest"""
+        write_if_changed(self.manifest_file, json.dumps(manifest, indent=2, sort_keys=True))
+
+    def collect_site_files(self):
+        """List every source file that is published, relative to the project dir"""
+        files = []
+        for name in SITE_PAGES + SITE_SHELL_ASSETS + SITE_EXTRA_FILES:
+            if name == 'index.html' and (self.project_dir / 'project.html').exists():
+                continue  # Generated by write_project_pages()
+            if name == 'available.html' and self.available.works:
+                continue  # Generated by write_available_pages()
+            if name == 'about.html' and self.cv.stored:
+                continue  # Generated by write_about_page()
+            if name == 'updates.html' and self.updates.stored:
+                continue  # Generated by write_update_pages()
+            if name == 'script.js':
+                continue  # Split up by write_script_bundles()
+            if (self.project_dir / name).exists():
+                files.append(name)
+
+        if self.images_dir.exists():
+            for path in sorted(self.images_dir.rglob('*')):
+                if path.is_file() and path.suffix.lower() in WEB_MEDIA_EXTENSIONS:
+                    files.append(path.relative_to(self.project_dir).as_posix())
+        return files
+
+    def sync_file(self, rel_path, previous):
+        """Copy a source file into the output if it changed; return (entry, copied)
+
+        HTML and CSS go through finish_text() instead of being copied as-is.
+        """
+        source = self.project_dir / rel_path
+        dest = self.output_dir / rel_path
+        stat = source.stat()
+        transform = self.output_transform(rel_path)
+
+        unchanged = (previous is not None
+                     and previous.get('size') == stat.st_size
+                     and previous.get('mtime_ns') == stat.st_mtime_ns
+                     and previous.get('transform') == transform
+                     and dest.exists()
+                     and dest.stat().st_size == previous.get('output_size', stat.st_size))
+        if unchanged:
+            return previous, False
+
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_sha256(source)
+        }
+        if transform is None:
+            shutil.copy2(source, dest)
+        else:
+            data = self.finish_text(rel_path, source.read_bytes())
+            write_if_changed(dest, data)
+            entry.update(transform=transform, output_size=len(data),
+                         output_sha256=hashlib.sha256(data).hexdigest())
+        return entry, True
+
+    def remove_stale_outputs(self, previous_files, current_files):
+        """Delete outputs whose sources no longer exist"""
+        removed = 0
+        for rel_path in previous_files:
+            if (rel_path not in current_files and rel_path not in self.generated
+                    and self.remove_output(rel_path)):
+                removed += 1
+        return removed
+
+    def grid_image_paths(self, files):
+        """Resolve the grid image for every work item in index.html, its smallest tile if any"""
+        index_file = self.project_dir / "index.html"
+        if not index_file.exists():
+            return []
+
+        with open(index_file, 'r', encoding='utf-8') as f:
+            project_ids = re.findall(r'data-project="([^"]+)"', f.read())
+
+        grid_images = []
+        for project_id in project_ids:
+            if project_id in self.grid_tiles:
+                grid_images.append(self.grid_tiles[project_id]['tiles'][0][0])
+                continue
+            for name in GRID_IMAGE_NAMES:
+                rel_path = f"images/{project_id}/{name}"
+                if rel_path in files:
+                    grid_images.append(rel_path)
+                    break
+        return grid_images
+
+    def compute_build_hash(self, files):
+        """Hash every published and generated file into a short build version"""
+        digest = hashlib.sha256()
+        for rel_path in sorted(files):
+            output_sha = files[rel_path].get('output_sha256', files[rel_path]['sha256'])
+            digest.update(f"{rel_path}\0{output_sha}\n".encode('utf-8'))
+        for rel_path in sorted(self.generated):
+            digest.update(f"{rel_path}\0{self.generated[rel_path]}\n".encode('utf-8'))
+        return digest.hexdigest()[:12]
+
+    def precache_urls(self, files):
+        """URLs the service worker stores on install: page shell, project pages and grid images
+
+        A QR code at an installation opens a project page directly, so every
+        pre-rendered project page and the projects/<id>.json it fetches its
+        text from are stored up front; its full-size images are not (they are
+        megabytes each), and offline the service worker shows the precached
+        grid tile in their place.
+        """
+        shell = [name for name in SITE_PAGES + SITE_SHELL_ASSETS
+                 + [script_chunk_name(chunk) for chunk in self.script_chunks]
+                 if name in files or name in self.generated]
+        project_pages = sorted((name for name in self.pages if re.fullmatch(r'project-[^/]+\.html', name)),
+                               key=natural_key)
+        project_data = sorted((name for name in self.generated if re.fullmatch(r'projects/[^/]+\.json', name)),
+                              key=natural_key)
+        return ['./'] + shell + project_pages + project_data + self.grid_image_paths(files)
+
+    def write_service_worker(self, files, build_hash):
+        """Generate sw.js and precache-manifest.json for this build"""
+        urls = self.precache_urls(files)
+        manifest = {
+            'build_hash': build_hash,
+            'precache': [
+                {'url': url, 'revision': (files[url].get('output_sha256', files[url]['sha256'])
+                                          if url in files else self.generated.get(url, build_hash))[:12]}
+                for url in urls
+            ]
+        }
+        sw_source = (SERVICE_WORKER_TEMPLATE
+                     .replace('__BUILD_HASH__', build_hash)
+                     .replace('__IMAGE_CACHE_MAX_BYTES__', str(IMAGE_CACHE_MAX_BYTES))
+                     .replace('__GRID_TILE_DIR__', GRID_TILE_DIR)
+                     .replace('__PRECACHE_URLS__', json.dumps(urls, indent=4)))
+
+        changed = self.write_output("precache-manifest.json", json.dumps(manifest, indent=2))
+        changed = self.write_output("sw.js", sw_source) or changed
+        return changed, len(urls)
+
+    def write_gallery_manifests(self, files):
+        """Write images/<folder>/gallery.json with every image in display order"""
+        projects = load_project_records(self.project_dir)
+        managed = {record.get('folder', pid): record.get('images')
+                   for pid, record in projects.items() if record.get('images')}
+
+        folders = {}
+        for rel_path in files:
+            parts = rel_path.split('/')
+            if len(parts) == 3 and Path(parts[2]).suffix.lower() in WEB_IMAGE_EXTENSIONS:
+                folders.setdefault(parts[1], []).append(parts[2])
+
+        similarity = SimilarityIndex(self.catalog)
+        duplicate_count = 0
+        for folder, names in sorted(folders.items()):
+            if folder in managed:
+                # Files chosen in the content manager, first one is the main image
+                names = [name for name in managed[folder] if name in names]
+                main = names[0] if names else None
+            else:
+                main = next((name for name in GRID_IMAGE_NAMES if name in names), None)
+            if not names:
+                continue
+
+            ordered, duplicates = similarity.gallery_order(folder, names, main=main)
+            duplicate_count += len(duplicates)
+            gallery = ordered[1:] if main else ordered
+            dimensions = {name: self.catalog.dimensions(f"images/{folder}/{name}") for name in ordered}
+            self.galleries[folder] = (main, gallery,
+                                      {name: size for name, size in dimensions.items() if size})
+            self.write_output(f"images/{folder}/gallery.json", json.dumps({
+                'main': main,
+                'gallery': gallery,
+                'near_duplicates': duplicates,
+                'dimensions': self.galleries[folder][2]
+            }, indent=2))
+
+        groups = similarity.near_duplicate_groups()
+        self.log(f"Gallery manifests: {len(folders)} projects, {duplicate_count} near-duplicate "
+                 f"shots moved to the end, {len(groups)} near-duplicate groups site-wide")
+        return len(folders)
+
+    def write_script_bundles(self):
+        """Split script.js into shared and per-page chunks, and projectData into projects/<id>.json
+
+        Returns the raw size of script.js, which every page used to load whole.
+        """
+        script_file = self.project_dir / 'script.js'
+        if not script_file.exists():
+            return 0
+        source = script_file.read_text(encoding='utf-8')
+        parts = split_script(source)
+        self.script_chunks = sorted(chunk for chunk in parts if chunk)
+        for chunk, code in parts.items():
+            self.write_output(script_chunk_name(chunk), code)
+
+        for project_id, record in sorted(load_project_records(self.project_dir).items()):
+            data = {field: record.get(field) or '' for field in PROJECT_DATA_FIELDS}
+            data['folder'] = data['folder'] or project_id
+            self.write_output(f"projects/{project_id}.json",
+                              json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+        return len(source.encode('utf-8'))
+
+    def write_script_report(self, script_bytes, compressed):
+        """Save .build_cache/script_report.json: JS each page loads now vs all of script.js before
+
+        Parse time is an estimate from JS_PARSE_MS_PER_KB, not a measurement.
+        """
+        script_source = self.project_dir / 'script.js'
+        before_gzip = len(gzip.compress(script_source.read_bytes(), 9, mtime=0)) if script_bytes else 0
+        pages = {}
+        for rel_path in sorted(set(self.generated) | set(self.text_sizes)):
+            path = self.output_dir / rel_path
+            if Path(rel_path).suffix.lower() != '.html' or not path.exists():
+                continue
+            scripts = [src for src in re.findall(r'<script src="([^"]+\.js)"', path.read_text(encoding='utf-8'))
+                       if (self.output_dir / src).exists()]
+            if not scripts:
+                continue
+            after = sum((self.output_dir / src).stat().st_size for src in scripts)
+            pages[rel_path] = {
+                'scripts': scripts,
+                'before_bytes': script_bytes,
+                'after_bytes': after,
+                'before_gzip': before_gzip,
+                'after_gzip': sum(compressed.get(src, {}).get('gzip', 0) for src in scripts),
+                'parse_ms_saved': round((script_bytes - after) / 1024 * JS_PARSE_MS_PER_KB, 1)
+            }
+
+        minified = {}
+        for rel_path, (raw, finished) in self.text_sizes.items():
+            kind = minified.setdefault(Path(rel_path).suffix.lower().lstrip('.'),
+                                       {'files': 0, 'raw': 0, 'minified': 0})
+            kind['files'] += 1
+            kind['raw'] += raw
+            kind['minified'] += finished
+
+        self.state_dir.mkdir(exist_ok=True)
+        write_if_changed(self.state_dir / "script_report.json", json.dumps({
+            'minify': self.minify,
+            'chunks': {script_chunk_name(chunk): self.generated_size(script_chunk_name(chunk))
+                       for chunk in [None] + self.script_chunks},
+            'minified': minified,
+            'pages': pages
+        }, indent=2, sort_keys=True))
+        if pages:
+            average = sum(page['after_bytes'] for page in pages.values()) / len(pages)
+            saved = sum(page['parse_ms_saved'] for page in pages.values()) / len(pages)
+            self.log(f"Scripts: {format_bytes(script_bytes)} on every page -> {format_bytes(average)} "
+                     f"per page on average, about {saved:.0f} ms less parsing on a mid-range phone")
+        if minified and self.minify:
+            self.log("Minified " + ', '.join(
+                f"{kind.upper()} {format_bytes(totals['raw'])} -> {format_bytes(totals['minified'])}"
+                for kind, totals in sorted(minified.items())))
+        return pages
+
+    def generated_size(self, rel_path):
+        path = self.output_dir / rel_path
+        return path.stat().st_size if path.exists() else 0
+
+    def write_grid_tiles(self, files):
+        """Cut square tiles at every GRID_TILE_SIZES width from each grid project's main image
+
+        Tiles go to images/<folder>/tiles/<width>.jpg in the output and are
+        cached by source content, crop settings and focal point.
+        """
+        index_file = self.project_dir / 'index.html'
+        if not index_file.exists():
+            return 0
+        if Image is None:
+            self.log("Grid tiles skipped: install Pillow to generate them")
+            return 0
+        project_ids = re.findall(r'data-project="([^"]+)"', index_file.read_text(encoding='utf-8'))
+        records = load_project_records(self.project_dir)
+
+        cropped = 0
+        report = {}
+        for project_id in project_ids:
+            record = records.get(project_id, {})
+            folder = record.get('folder', project_id)
+            main = self.galleries.get(folder, (None,))[0]
+            rel_path = f"images/{folder}/{main}"
+            if not main or rel_path not in files:
+                continue
+            focal_point = record.get('focal_point')
+            digest = files[rel_path]['sha256']
+            options = [GRID_TILE_SIZES, GRID_TILE_QUALITY, GRID_TILE_BACKGROUND, focal_point]
+
+            with self.cache.making('grid-crop', digest, options):
+                crop = self.cache.get_json('grid-crop', digest, options)
+                tiles = {}
+                if crop is not None:
+                    tiles = {width: self.cache.get('grid-tile', digest, options + [width])
+                             for width in crop['widths']}
+                if crop is None or None in tiles.values():
+                    try:
+                        box, tiles = render_grid_tiles(self.project_dir / rel_path, focal_point)
+                    except (OSError, ValueError) as e:
+                        self.log(f"Could not cut grid tiles from {rel_path}: {e}")
+                        continue
+                    crop = {'box': box, 'widths': sorted(tiles)}
+                    for width, data in tiles.items():
+                        self.cache.put('grid-tile', digest, data, options + [width])
+                    self.cache.put_json('grid-crop', digest, crop, options)
+                    cropped += 1
+
+            paths = []
+            for width in crop['widths']:
+                tile_path = f"images/{folder}/{GRID_TILE_DIR}/{width}.jpg"
+                self.write_output(tile_path, tiles[width])
+                paths.append([tile_path, width])
+            self.grid_tiles[project_id] = {'title': record.get('title') or project_id, 'tiles': paths}
+            report[project_id] = {
+                'source': rel_path,
+                'source_bytes': files[rel_path]['size'],
+                'crop': crop['box'],
+                'focal_point': focal_point,
+                'tile_bytes': {str(width): len(tiles[width]) for width in crop['widths']}
+            }
+
+        self.log(f"Grid tiles: {len(report)} projects ({cropped} cut, {len(report) - cropped} from cache)")
+        self.write_grid_tile_report(report)
+        return cropped
+
+    def write_grid_tile_report(self, projects):
+        """Save .build_cache/grid_tile_report.json comparing grid originals with the tiles"""
+        totals = {
+            'source_bytes': sum(project['source_bytes'] for project in projects.values()),
+            'smallest_tile_bytes': sum(min(project['tile_bytes'].values(), default=0)
+                                       for project in projects.values()),
+            'largest_tile_bytes': sum(max(project['tile_bytes'].values(), default=0)
+                                      for project in projects.values())
+        }
+        # Sources narrower than the largest tile can't fill high-density screens
+        low_resolution = sorted(project_id for project_id, project in projects.items()
+                                if max(map(int, project['tile_bytes']), default=0) < GRID_TILE_SIZES[-1])
+        self.state_dir.mkdir(exist_ok=True)
+        write_if_changed(self.state_dir / "grid_tile_report.json", json.dumps({
+            'totals': totals,
+            'low_resolution': low_resolution,
+            'projects': projects
+        }, indent=2, sort_keys=True))
+        if projects:
+            self.log(f"Grid image bytes: {format_bytes(totals['source_bytes'])} of originals -> "
+                     f"{format_bytes(totals['smallest_tile_bytes'])} in tiles "
+                     f"({format_bytes(totals['largest_tile_bytes'])} on high-density screens)")
+        if low_resolution:
+            self.log(f"No {GRID_TILE_SIZES[-1]}px grid tile (main image too small for high-density "
+                     f"screens): {', '.join(low_resolution)}")
+        return totals
+
+    def write_hero_images(self, files):
+        """Scale each project's main image to HERO_IMAGE_SIZES for its project page
+
+        Copies go to images/<folder>/hero/<width>.jpg in the output and are
+        cached by source content. Videos, GIFs and sources Pillow can't read
+        keep the original as the hero, and the original replaces any copy
+        that came out no smaller than it.
+        """
+        if Image is None:
+            return 0
+        scaled = 0
+        for folder, (main, _, dimensions) in sorted(self.galleries.items()):
+            rel_path = f"images/{folder}/{main}"
+            if not main or rel_path not in files or Path(main).suffix.lower() not in HERO_IMAGE_EXTENSIONS:
+                continue
+            digest = files[rel_path]['sha256']
+            options = [HERO_IMAGE_SIZES, HERO_IMAGE_QUALITY, GRID_TILE_BACKGROUND]
+
+            with self.cache.making('hero', digest, options):
+                widths = self.cache.get_json('hero', digest, options)
+                images = {}
+                if widths is not None:
+                    images = {width: self.cache.get('hero-image', digest, options + [width])
+                              for width in widths}
+                if widths is None or None in images.values():
+                    try:
+                        images = render_hero_images(self.project_dir / rel_path)
+                    except (OSError, ValueError) as e:
+                        self.log(f"Could not scale hero image {rel_path}: {e}")
+                        continue
+                    for width, data in images.items():
+                        self.cache.put('hero-image', digest, data, options + [width])
+                    self.cache.put_json('hero', digest, sorted(images), options)
+                    scaled += 1
+
+            paths = []
+            source_width = (dimensions.get(main) or (None,))[0]
+            for width in sorted(images):
+                if source_width and len(images[width]) >= files[rel_path]['size']:
+                    paths.append([rel_path, source_width])  # The original is no bigger from here on
+                    break
+                hero_path = f"images/{folder}/{HERO_IMAGE_DIR}/{width}.jpg"
+                self.write_output(hero_path, images[width])
+                paths.append([hero_path, width])
+            self.hero_images[folder] = paths
+
+        self.log(f"Hero images: {len(self.hero_images)} projects ({scaled} scaled, "
+                 f"{len(self.hero_images) - scaled} from cache)")
+        return scaled
+
+    def write_project_pages(self):
+        """Pre-render project-<id>.html for every project with images, plus index.html
+
+        The generated index.html marks the body with data-project-pages so
+        work items link to these pages instead of project.html?id=, which
+        has to fetch script.js and gallery.json before it finds the hero,
+        and carries the grid tiles from write_grid_tiles() as <img> tags.
+        """
+        template_file = self.project_dir / 'project.html'
+        index_file = self.project_dir / 'index.html'
+        if not template_file.exists():
+            return 0
+        template = template_file.read_text(encoding='utf-8')
+        template_hash = hashlib.sha256(template.encode('utf-8')).hexdigest()
+
+        rendered = 0
+        report = {}
+        for project_id, record in sorted(load_project_records(self.project_dir).items()):
+            folder = record.get('folder', project_id)
+            if folder not in self.galleries:
+                continue
+            main, gallery, dimensions = self.galleries[folder]
+            title = record.get('title') or project_id
+            hero = self.hero_images.get(folder)
+
+            def render(project_id=project_id, folder=folder, title=title, main=main,
+                       gallery=gallery, dimensions=dimensions, hero=hero):
+                return render_project_page(template, project_id, folder, title, main,
+                                           gallery, dimensions, hero)
+
+            rendered += self.render_page(f"project-{project_id}.html",
+                                         [template_hash, folder, title, main, gallery, dimensions,
+                                          hero],
+                                         render)
+            sizes = [(self.catalog.get(f"images/{folder}/{name}") or {}).get('size', 0)
+                     for name in gallery]
+            if hero:
+                hero_bytes = self.generated_size(hero[-1][0])
+            else:
+                hero_bytes = (self.catalog.get(f"images/{folder}/{main}") or {}).get('size', 0) if main else 0
+            report[project_id] = {
+                'hero': main,
+                'hero_scaled': bool(hero),
+                'hero_bytes': hero_bytes,
+                'gallery_images': len(gallery),
+                'gallery_bytes': sum(sizes),
+                'dimensions': sum(1 for name in [main] + gallery if name in dimensions),
+                'before': image_loading_estimate(hero_bytes, sizes, lazy=False),
+                'after': image_loading_estimate(hero_bytes, sizes, lazy=True)
+            }
+
+        if index_file.exists():
+            index = index_file.read_text(encoding='utf-8')
+            rendered += self.render_page('index.html',
+                                         [hashlib.sha256(index.encode('utf-8')).hexdigest(), self.grid_tiles],
+                                         lambda: render_grid_index(
+                                             index.replace('<body>', '<body data-project-pages>', 1),
+                                             self.grid_tiles))
+        self.write_loading_report(report)
+        self.log(f"Project pages: {len(report)} projects, {rendered} pages regenerated")
+        return rendered
+
+    def write_loading_report(self, projects):
+        """Save .build_cache/image_loading_report.json comparing eager and lazy gallery loading"""
+        totals = {}
+        for key in ('before', 'after'):
+            eager = sum(project[key]['eager_bytes'] for project in projects.values())
+            hero = sum(project['hero_bytes'] for project in projects.values())
+            totals[key] = {
+                'eager_images': sum(project[key]['eager_images'] for project in projects.values()),
+                'eager_bytes': eager,
+                'hero_share': round(hero / eager, 3) if eager else None
+            }
+        self.state_dir.mkdir(exist_ok=True)
+        write_if_changed(self.state_dir / "image_loading_report.json", json.dumps({
+            'totals': totals,
+            'projects': projects
+        }, indent=2, sort_keys=True))
+        if projects:
+            self.log(f"Image bytes loaded with the hero: {format_bytes(totals['before']['eager_bytes'])} "
+                     f"eager -> {format_bytes(totals['after']['eager_bytes'])} with lazy galleries")
+        return totals
+
+    def write_available_pages(self):
+        """Generate available.html and one available-<id>.html per work from the store"""
+        if not self.available.works:
+            return 0
+        template = (self.project_dir / 'available.html').read_text(encoding='utf-8')
+        template_hash = hashlib.sha256(template.encode('utf-8')).hexdigest()
+        listing = self.available.listing()
+        dimensions = {image: self.catalog.dimensions(image)
+                      for work in listing for image in work['images']}
+
+        rendered = self.render_page(
+            'available.html', [template_hash, listing, dimensions],
+            lambda: splice_marked_section(template, 'AVAILABLE WORKS',
+                                          render_available_listing(listing, dimensions)))
+        for work in listing:
+            work_dimensions = {image: dimensions[image] for image in work['images']}
+
+            def render(work=work, work_dimensions=work_dimensions):
+                page = splice_marked_section(template, 'AVAILABLE WORKS',
+                                             render_available_work(work, work_dimensions))
+                return page.replace('<title>', f"<title>{escape(work['title'])} | ", 1)
+
+            rendered += self.render_page(f"available-{work['id']}.html",
+                                         [template_hash, work, work_dimensions], render)
+        self.log(f"Available works: {len(listing)} works, {rendered} pages regenerated")
+        return rendered
+
+    def write_about_page(self):
+        """Splice the stored bio and CV into about.html and write the printable cv-print.html
+
+        Each CV section is rendered once and only when its entries changed;
+        both pages are assembled from the same section fragments.
+        """
+        if not self.cv.stored:
+            return 0
+        template = (self.project_dir / 'about.html').read_text(encoding='utf-8')
+        template_hash = hashlib.sha256(template.encode('utf-8')).hexdigest()
+
+        fragments = []
+        keys = []
+        rendered = 0
+        for section in self.cv.sections:
+            key = hashlib.sha256(json.dumps(section, sort_keys=True).encode('utf-8')).hexdigest()
+            html = self.cache.get('cv-section', key)
+            if html is None:
+                html = render_cv_section(section).encode('utf-8')
+                self.cache.put('cv-section', key, html)
+                rendered += 1
+            keys.append(key)
+            fragments.append(html.decode('utf-8'))
+
+        dependencies = [template_hash, self.cv.bio, keys]
+        print_link = ('                <p class="cv-print-link">'
+                      '<a href="cv-print.html">Printable CV</a></p>')
+        self.render_page('about.html', dependencies, lambda: splice_marked_section(
+            splice_marked_section(template, 'BIO', render_bio(self.cv.bio)),
+            'CV SECTIONS', ''.join(fragments) + print_link))
+        self.render_page('cv-print.html', dependencies,
+                         lambda: render_cv_print(template, fragments))
+        self.log(f"CV: {len(self.cv.sections)} sections, {rendered} re-rendered")
+        return rendered
+
+    def site_url(self):
+        """Absolute site URL for feeds, from the CNAME file"""
+        cname = self.project_dir / 'CNAME'
+        if cname.exists() and cname.read_text().strip():
+            return f"https://{cname.read_text().strip()}/"
+        return './'
+
+    def write_update_pages(self):
+        """Generate paginated updates pages, a permalink page per update and the feeds
+
+        Pages are rendered only when their window of updates (or their
+        older/newer links) changed, so a new update usually re-renders just
+        the front page, its permalink and the feeds.
+        """
+        if not self.updates.stored:
+            return 0
+        template = (self.project_dir / 'updates.html').read_text(encoding='utf-8')
+        template = template.replace('</head>', FEED_LINKS + '</head>', 1)
+        template_hash = hashlib.sha256(template.encode('utf-8')).hexdigest()
+
+        windows = self.updates.pages()
+        count = len(windows)
+        rendered = 0
+        for number, records in enumerate(windows, 1):
+            links = [update_page_name(number + 1, count) if number < count else None,
+                     update_page_name(number - 1, count) if number > 1 else None]
+
+            def render(records=records, number=number):
+                page = splice_marked_section(template, 'UPDATES',
+                                             render_update_listing(records, number, count))
+                if number == count:
+                    return page
+                return page.replace('<title>', f"<title>Page {number} | ", 1)
+
+            rendered += self.render_page(update_page_name(number, count),
+                                         [template_hash, records, number, links], render)
+
+        for record in self.updates.updates.values():
+            def render(record=record):
+                page = splice_marked_section(template, 'UPDATES', render_update_permalink(record))
+                return page.replace('<title>', f"<title>{escape(record['title'], False)} | ", 1)
+
+            rendered += self.render_page(f"update-{record['id']}.html",
+                                         [template_hash, record], render)
+
+        site_url = self.site_url()
+        latest = self.updates.newest_first()[:FEED_LIMIT]
+        for rel_path, render_feed in (('feed.xml', render_rss_feed), ('atom.xml', render_atom_feed),
+                                      ('feed.json', render_json_feed)):
+            rendered += self.render_page(rel_path, [site_url, latest],
+                                         lambda render_feed=render_feed: render_feed(latest, site_url))
+        self.log(f"Updates: {len(self.updates.updates)} updates on {count} pages, "
+                 f"{rendered} pages and feeds regenerated")
+        return rendered
+
+    def compress_text_assets(self, previous):
+        """Pre-compress text outputs whose content hash changed, in parallel"""
+        records = {}
+        pending = []
+        for path in sorted(self.output_dir.rglob('*')):
+            if not path.is_file() or path.suffix.lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            rel_path = path.relative_to(self.output_dir).as_posix()
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            record = previous.get(rel_path)
+            siblings_present = path.with_name(path.name + '.gz').exists() and (
+                brotli is None or path.with_name(path.name + '.br').exists())
+            if (record and record.get('sha256') == digest and siblings_present
+                    and ('br' in record) == (brotli is not None)):
+                records[rel_path] = record
+            else:
+                pending.append((rel_path, path, digest))
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+                results = pool.map(lambda item: compress_file(item[1], self.cache), pending)
+                for (rel_path, _, digest), sizes in zip(pending, results):
+                    records[rel_path] = dict(sizes, sha256=digest)
+
+        totals = {'raw': 0, 'gzip': 0, 'br': 0}
+        for record in records.values():
+            for key in totals:
+                totals[key] += record.get(key, 0)
+
+        # No timestamp: an unchanged build leaves the report untouched
+        report = {
+            'brotli_available': brotli is not None,
+            'totals': totals,
+            'files': records
+        }
+        self.state_dir.mkdir(exist_ok=True)
+        write_if_changed(self.state_dir / "compression_report.json",
+                         json.dumps(report, indent=2, sort_keys=True))
+
+        summary = (f"Compressed {len(pending)} of {len(records)} text files: "
+                   f"{format_bytes(totals['raw'])} raw, {format_bytes(totals['gzip'])} gzip")
+        if brotli is not None:
+            summary += f", {format_bytes(totals['br'])} brotli"
+        else:
+            summary += " (install 'brotli' for .br files)"
+        self.log(summary)
+        return records, len(pending)
+
+    def build(self):
+        """Run the build and return a report dictionary
+
+        Builds started elsewhere (the GUI, a command, watch mode) wait for
+        each other rather than writing the same outputs at once.
+        """
+        with DataFileLock(self.manifest_file, timeout=BUILD_LOCK_TIMEOUT):
+            return self.run_build()
+
+    def run_build(self):
+        """Every build stage, in order; see build()"""
+        started = time.perf_counter()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.stage(0.0, "Scanning images")
+        self.catalog.refresh()
+
+        manifest = self.load_manifest()
+        previous = manifest.get('files', {})
+        self.previous_pages = manifest.get('pages', {})
+        self.text_sizes = manifest.get('text_sizes', {})
+
+        self.stage(0.15, "Splitting scripts")
+        script_bytes = self.write_script_bundles()
+
+        self.stage(0.2, "Copying changed files")
+        files = {}
+        copied = 0
+        for rel_path in self.collect_site_files():
+            files[rel_path], was_copied = self.sync_file(rel_path, previous.get(rel_path))
+            copied += was_copied
+        removed = self.remove_stale_outputs(previous, files)
+        self.log(f"Synced {len(files)} files ({copied} copied, {removed} removed)")
+
+        self.stage(0.5, "Writing gallery manifests")
+        self.write_gallery_manifests(files)
+
+        self.stage(0.52, "Cutting grid tiles")
+        self.write_grid_tiles(files)
+        self.write_hero_images(files)
+
+        self.stage(0.55, "Generating pages")
+        self.write_project_pages()
+        self.write_available_pages()
+        self.write_about_page()
+        self.write_update_pages()
+
+        self.stage(0.6, "Generating service worker")
+        build_hash = self.compute_build_hash(files)
+        sw_changed, precached = self.write_service_worker(files, build_hash)
+        self.log(f"Service worker {'written' if sw_changed else 'unchanged'}: "
+                 f"{precached} precached URLs, caches versioned {build_hash}")
+
+        for rel_path in set(manifest.get('generated', [])) - set(self.generated) - set(files):
+            self.remove_output(rel_path)
+
+        self.stage(0.8, "Compressing text files")
+        compressed, recompressed = self.compress_text_assets(manifest.get('compressed', {}))
+        self.text_sizes = {rel_path: sizes for rel_path, sizes in self.text_sizes.items()
+                           if rel_path in files or rel_path in self.generated}
+        self.write_script_report(script_bytes, compressed)
+
+        self.save_manifest({
+            'build_hash': build_hash,
+            'files': files,
+            'generated': sorted(self.generated),
+            'pages': self.pages,
+            'compressed': compressed,
+            'text_sizes': self.text_sizes
+        })
+        cache = self.cache.save()
+        self.log(f"Build cache: {self.cache.summary(cache['stages'])}"
+                 + (f", {cache['evicted']} old entries evicted" if cache['evicted'] else ''))
+        return {
+            'build_hash': build_hash,
+            'files': len(files),
+            'copied': copied,
+            'removed': removed,
+            'precached': precached,
+            'compressed': recompressed,
+            'cache': cache['stages'],
+            'seconds': time.perf_counter() - started
+        }
+
+
+EXIF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+EXIF_TAGS = {
+    0x010F: 'make',
+    0x0110: 'model',
+    0x0112: 'orientation',
+    0x0132: 'datetime',
+    0x9003: 'datetime_original'
+}
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def parse_exif(data):
+    """Read orientation, camera and capture date from a TIFF-structured EXIF block"""
+    if len(data) < 8 or data[:4] not in (b'II*\x00', b'MM\x00*'):
+        return {}
+    endian = '<' if data[:2] == b'II' else '>'
+
+    def read_ifd(offset):
+        values = {}
+        if offset <= 0 or offset + 2 > len(data):
+            return values
+        count = struct.unpack_from(endian + 'H', data, offset)[0]
+        for i in range(count):
+            pos = offset + 2 + i * 12
+            if pos + 12 > len(data):
+                break
+            tag, value_type, value_count = struct.unpack_from(endian + 'HHI', data, pos)
+            size = EXIF_TYPE_SIZES.get(value_type, 1) * value_count
+            value_pos = pos + 8
+            if size > 4:
+                value_pos = struct.unpack_from(endian + 'I', data, pos + 8)[0]
+            raw = data[value_pos:value_pos + size]
+            if value_type == 2:
+                values[tag] = raw.split(b'\0')[0].decode('ascii', 'replace').strip()
+            elif value_type == 3 and len(raw) >= 2:
+                values[tag] = struct.unpack_from(endian + 'H', raw)[0]
+            elif value_type == 4 and len(raw) >= 4:
+                values[tag] = struct.unpack_from(endian + 'I', raw)[0]
+        return values
+
+    ifd0 = read_ifd(struct.unpack_from(endian + 'I', data, 4)[0])
+    if 0x8769 in ifd0:
+        ifd0.update(read_ifd(ifd0[0x8769]))
+    return {EXIF_TAGS[tag]: value for tag, value in ifd0.items() if tag in EXIF_TAGS}
+
+
+def read_jpeg_header(f):
+    """Walk JPEG segments up to the frame header, skipping the entropy-coded data"""
+    info = {}
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        if not byte:
+            break
+        if byte != b'\xff':
+            continue
+        marker = f.read(1)
+        while marker == b'\xff':
+            marker = f.read(1)
+        if not marker:
+            break
+        marker = marker[0]
+        if marker == 0xD8 or marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            continue
+        if marker in (0xD9, 0xDA):
+            break
+
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            break
+        length = struct.unpack('>H', length_bytes)[0] - 2
+        if marker == 0xE1 and 'exif' not in info:
+            segment = f.read(length)
+            if segment.startswith(b'Exif\0\0'):
+                info['exif'] = parse_exif(segment[6:])
+        elif marker in JPEG_SOF_MARKERS:
+            segment = f.read(length)
+            info['height'], info['width'] = struct.unpack('>HH', segment[1:5])
+            break
+        else:
+            f.seek(length, 1)
+    return info
+
+
+def read_png_header(f):
+    """Read PNG chunks up to the first image data chunk"""
+    info = {}
+    f.seek(8)
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        length, chunk_type = struct.unpack('>I4s', header)
+        if chunk_type == b'IDAT':
+            break
+        if chunk_type == b'IHDR':
+            info['width'], info['height'] = struct.unpack('>II', f.read(8))
+            f.seek(length - 8 + 4, 1)
+        elif chunk_type == b'eXIf':
+            info['exif'] = parse_exif(f.read(length))
+            f.seek(4, 1)
+        elif chunk_type == b'tIME':
+            year, month, day, hour, minute, second = struct.unpack('>HBBBBB', f.read(7))
+            info.setdefault('exif', {})['datetime'] = (
+                f"{year:04d}:{month:02d}:{day:02d} {hour:02d}:{minute:02d}:{second:02d}")
+            f.seek(4, 1)
+        else:
+            f.seek(length + 4, 1)
+    return info
+
+
+def read_gif_header(f):
+    """Read GIF logical screen size"""
+    f.seek(6)
+    width, height = struct.unpack('<HH', f.read(4))
+    return {'width': width, 'height': height}
+
+
+def read_webp_header(f):
+    """Read WebP canvas size from the first VP8/VP8L/VP8X chunk"""
+    f.seek(12)
+    chunk_type = f.read(4)
+    f.seek(4, 1)
+    data = f.read(10)
+    if chunk_type == b'VP8X' and len(data) >= 10:
+        width = 1 + int.from_bytes(data[4:7], 'little')
+        height = 1 + int.from_bytes(data[7:10], 'little')
+    elif chunk_type == b'VP8 ' and len(data) >= 10:
+        width, height = struct.unpack('<HH', data[6:10])
+        width, height = width & 0x3FFF, height & 0x3FFF
+    elif chunk_type == b'VP8L' and len(data) >= 5:
+        bits = int.from_bytes(data[1:5], 'little')
+        width, height = (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    else:
+        return {}
+    return {'width': width, 'height': height}
+
+
+def read_image_header(f):
+    """Sniff the format from magic bytes and read its header"""
+    magic = f.read(12)
+    if magic.startswith(b'\xff\xd8'):
+        return 'jpeg', read_jpeg_header(f)
+    if magic.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png', read_png_header(f)
+    if magic[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif', read_gif_header(f)
+    if magic[:4] == b'RIFF' and magic[8:12] == b'WEBP':
+        return 'webp', read_webp_header(f)
+    if magic[4:8] in (b'ftyp', b'moov', b'mdat', b'wide', b'free'):
+        return 'video', {}
+    if magic.startswith(b'\x1a\x45\xdf\xa3'):
+        # EBML header: WebM (or Matroska)
+        return 'video', {}
+    return 'unknown', {}
+
+
+def colour_family(red, green, blue):
+    """Name the hue family of an RGB colour, or 'neutral' for greys"""
+    hue, saturation, value = colorsys.rgb_to_hsv(red / 255, green / 255, blue / 255)
+    if saturation < 0.2 or value < 0.15:
+        return 'neutral'
+    return COLOUR_FAMILIES[int(hue * len(COLOUR_FAMILIES) + 0.5) % len(COLOUR_FAMILIES)]
+
+
+def compute_dhash(img):
+    """64-bit difference hash of an already opened image, as hex"""
+    small = img.convert('L').resize((DHASH_SIZE + 1, DHASH_SIZE), Image.BILINEAR)
+    data = small.tobytes()
+    value = 0
+    for row in range(DHASH_SIZE):
+        offset = row * (DHASH_SIZE + 1)
+        for col in range(DHASH_SIZE):
+            value = (value << 1) | (data[offset + col] < data[offset + col + 1])
+    return f"{value:016x}"
+
+
+def file_dhash(path):
+    """dHash of an image file, or None without Pillow or for unreadable files"""
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as img:
+            img.draft('RGB', (PALETTE_SAMPLE_SIZE, PALETTE_SAMPLE_SIZE))
+            img = img.convert('RGB')
+            img.thumbnail((PALETTE_SAMPLE_SIZE, PALETTE_SAMPLE_SIZE))
+            return compute_dhash(img)
+    except (OSError, ValueError):
+        return None
+
+
+def extract_pixel_features(f):
+    """One downscaled decode for the colour histogram, palette and dHash (needs Pillow)"""
+    f.seek(0)
+    with Image.open(f) as img:
+        # JPEG decodes straight at 1/2..1/8 scale instead of full resolution
+        img.draft('RGB', (PALETTE_SAMPLE_SIZE, PALETTE_SAMPLE_SIZE))
+        img = img.convert('RGB')
+        img.thumbnail((PALETTE_SAMPLE_SIZE, PALETTE_SAMPLE_SIZE))
+        dhash = compute_dhash(img)
+        data = img.tobytes()
+    pixels = list(zip(data[0::3], data[1::3], data[2::3]))
+    histogram = dict.fromkeys(COLOUR_FAMILIES + ['neutral'], 0)
+    buckets = {}
+    for red, green, blue in pixels:
+        histogram[colour_family(red, green, blue)] += 1
+        key = (red >> 5, green >> 5, blue >> 5)
+        bucket = buckets.setdefault(key, [0, 0, 0, 0])
+        bucket[0] += 1
+        bucket[1] += red
+        bucket[2] += green
+        bucket[3] += blue
+
+    total = len(pixels) or 1
+    palette = []
+    for count, red, green, blue in sorted(buckets.values(), reverse=True)[:PALETTE_COLOURS]:
+        palette.append({
+            'colour': f"#{red // count:02x}{green // count:02x}{blue // count:02x}",
+            'weight': round(count / total, 3)
+        })
+
+    chromatic = {family: count for family, count in histogram.items() if family != 'neutral'}
+    dominant = max(chromatic, key=chromatic.get)
+    if chromatic[dominant] < total * 0.1:
+        dominant = 'neutral'
+    return {
+        'histogram': {family: round(count / total, 3) for family, count in histogram.items()},
+        'palette': palette,
+        'dominant_colour': dominant,
+        'dhash': dhash
+    }
+
+
+def grid_crop_box(img, focal_point=None):
+    """The square (left, top, right, bottom) a grid tile is cut from
+
+    With a focal point ([x, y] as fractions) the square is centred on it as
+    far as the edges allow. Otherwise strips are trimmed from whichever end
+    of the long side has less detail (lower luminance entropy) until the
+    rest is square, so the crop settles on the busiest part of the artwork
+    instead of always the middle.
+    """
+    width, height = img.size
+    side = min(width, height)
+    if focal_point:
+        left = min(max(round(focal_point[0] * width - side / 2), 0), width - side)
+        top = min(max(round(focal_point[1] * height - side / 2), 0), height - side)
+        return (left, top, left + side, top + side)
+    if width == height:
+        return (0, 0, width, height)
+
+    sample = img.convert('L')
+    sample.thumbnail((GRID_CROP_SAMPLE_SIZE, GRID_CROP_SAMPLE_SIZE))
+    horizontal = width > height
+    if not horizontal:
+        sample = sample.transpose(Image.Transpose.TRANSPOSE)  # Long side across, top at the left
+    sample_length, sample_side = sample.size
+    start, end = 0, sample_length
+    while end - start > sample_side:
+        step = min(GRID_CROP_STEP, end - start - sample_side)
+        first = sample.crop((start, 0, start + step, sample_side)).entropy()
+        last = sample.crop((end - step, 0, end, sample_side)).entropy()
+        if first < last:
+            start += step
+        else:
+            end -= step
+
+    length = max(width, height)
+    offset = min(round(start * length / sample_length), length - side)
+    if horizontal:
+        return (offset, 0, offset + side, side)
+    return (0, offset, side, offset + side)
+
+
+def open_flattened(path):
+    """An image upright and in RGB, transparency over the gold page colour"""
+    with Image.open(path) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+            img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, GRID_TILE_BACKGROUND)
+            background.paste(img, mask=img.getchannel('A'))
+            return background
+        return img.convert('RGB')
+
+
+def encode_widths(img, sizes, quality):
+    """Progressive JPEGs of img at each width in sizes; {width: bytes}
+
+    Images narrower than a size are not scaled up, so small originals
+    produce fewer widths than sizes.
+    """
+    encoded = {}
+    for size in sizes:
+        width = min(size, img.width)
+        if encoded and width < max(encoded) * 1.25:
+            continue  # Barely sharper than the last one, not worth the download
+        height = max(1, round(img.height * width / img.width))
+        scaled = img.resize((width, height), Image.LANCZOS) if width < img.width else img
+        buffer = io.BytesIO()
+        scaled.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+        encoded[width] = buffer.getvalue()
+    return encoded
+
+
+def render_grid_tiles(path, focal_point=None):
+    """Square JPEG tiles for the index grid; returns (crop box, {width: bytes})
+
+    Sources smaller than a tile size are not scaled up, so small originals
+    produce fewer tiles than GRID_TILE_SIZES.
+    """
+    img = open_flattened(path)
+    box = grid_crop_box(img, focal_point)
+    return list(box), encode_widths(img.crop(box), GRID_TILE_SIZES, GRID_TILE_QUALITY)
+
+
+def render_hero_images(path):
+    """Scaled JPEG copies of a project page's main image; {width: bytes}"""
+    return encode_widths(open_flattened(path), HERO_IMAGE_SIZES, HERO_IMAGE_QUALITY)
+
+
+def catalog_image_stat(rel_path, stat):
+    """The catalog fields that describe the file rather than its content"""
+    return {
+        'path': rel_path,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(timespec='seconds')
+    }
+
+
+def catalog_image(path, rel_path, stat, source=None):
+    """Build the catalog entry for one file in a single open
+
+    source can be an already open (or memory-mapped) copy of the file's bytes.
+    """
+    entry = dict(catalog_image_stat(rel_path, stat), **{
+        'format': 'unknown',
+        'width': None,
+        'height': None,
+        'orientation': None,
+        'exif_orientation': 1,
+        'captured': None,
+        'camera': None,
+        'histogram': None,
+        'palette': None,
+        'dominant_colour': None,
+        'dhash': None
+    })
+    try:
+        with nullcontext(source) if source is not None else open(path, 'rb') as f:
+            entry['format'], header = read_image_header(f)
+            exif = header.get('exif', {})
+            width, height = header.get('width'), header.get('height')
+
+            exif_orientation = exif.get('orientation', 1)
+            if exif_orientation in (5, 6, 7, 8) and width and height:
+                # Rotated 90 degrees when displayed
+                width, height = height, width
+            entry['exif_orientation'] = exif_orientation
+
+            if width and height:
+                entry['width'], entry['height'] = width, height
+                if width == height:
+                    entry['orientation'] = 'square'
+                else:
+                    entry['orientation'] = 'landscape' if width > height else 'portrait'
+
+            captured = exif.get('datetime_original') or exif.get('datetime')
+            if captured:
+                try:
+                    entry['captured'] = datetime.strptime(
+                        captured, '%Y:%m:%d %H:%M:%S').isoformat(timespec='seconds')
+                except ValueError:
+                    pass
+
+            camera = ' '.join(part for part in (exif.get('make'), exif.get('model')) if part)
+            entry['camera'] = camera or None
+
+            if Image is not None and entry['format'] not in ('video', 'unknown'):
+                entry.update(extract_pixel_features(f))
+    except (OSError, struct.error, ValueError) as e:
+        entry['error'] = str(e)
+    return entry
+
+
+class ImageCatalog:
+    """Persistent, indexed metadata catalog of everything under images/"""
+
+    def __init__(self, project_dir, log=print, cache=None, cache_dir=None):
+        self.project_dir = Path(project_dir)
+        self.images_dir = self.project_dir / "images"
+        self.catalog_file = self.project_dir / BUILD_STATE_DIR / "image_catalog.json"
+        self.log = log
+        self.cache = cache
+        self.cache_dir = cache_dir
+        self.entries = {}
+        self.index = {}
+        self.load()
+
+    def load(self):
+        """Load the persisted catalog"""
+        if not self.catalog_file.exists():
+            return
+        try:
+            with open(self.catalog_file, 'r') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            self.log(f"Ignoring unreadable image catalog: {e}")
+            return
+        if stored.get('version') == CATALOG_VERSION:
+            self.entries = stored.get('entries', {})
+            self.index = stored.get('index', {})
+
+    def save(self):
+        """Persist entries together with their sort/filter indexes"""
+        write_if_changed(self.catalog_file, json.dumps({
+            'version': CATALOG_VERSION,
+            'entries': self.entries,
+            'index': self.index
+        }, indent=1, sort_keys=True))
+
+    def add(self, entries):
+        """Merge entries made elsewhere (e.g. during an import) and persist"""
+        with DataFileLock(self.catalog_file, timeout=BUILD_LOCK_TIMEOUT):
+            self.load()
+            for entry in entries:
+                self.entries[entry['path']] = entry
+            self.rebuild_index()
+            self.save()
+
+    def is_current(self, entry, stat):
+        """Whether a stored entry still describes the file on disk"""
+        return (entry is not None
+                and entry.get('size') == stat.st_size
+                and entry.get('mtime_ns') == stat.st_mtime_ns
+                and (Image is None or entry.get('format') in ('video', 'unknown')
+                     or entry.get('palette') is not None))
+
+    def refresh(self):
+        """Re-extract metadata for new or modified files only, in parallel
+
+        Refreshes are serialised on the catalog file, so a build and a
+        catalog job running at once scan each file once: the second starts
+        from what the first saved.
+        """
+        with DataFileLock(self.catalog_file, timeout=BUILD_LOCK_TIMEOUT):
+            self.load()
+            return self.refresh_locked()
+
+    def refresh_locked(self):
+        started = time.perf_counter()
+        entries = {}
+        pending = []
+        if self.images_dir.exists():
+            for path in sorted(self.images_dir.rglob('*')):
+                if not path.is_file() or path.suffix.lower() not in CATALOG_EXTENSIONS:
+                    continue
+                rel_path = path.relative_to(self.project_dir).as_posix()
+                stat = path.stat()
+                if self.is_current(self.entries.get(rel_path), stat):
+                    entries[rel_path] = self.entries[rel_path]
+                else:
+                    pending.append((path, rel_path, stat))
+
+        cache = self.cache or BuildCache(self.project_dir, log=self.log, cache_dir=self.cache_dir)
+        if pending:
+            with ThreadPoolExecutor(max_workers=(os.cpu_count() or 4) * 2) as pool:
+                for entry in pool.map(lambda item: self.scan_file(cache, *item), pending):
+                    entries[entry['path']] = entry
+            if self.cache is None:
+                cache.save()
+
+        removed = len(set(self.entries) - set(entries))
+        self.entries = entries
+        self.rebuild_index()
+        self.save()
+
+        summary = (f"Image catalog: {len(entries)} files, {len(pending)} scanned, "
+                   f"{removed} removed in {time.perf_counter() - started:.2f}s")
+        if Image is None:
+            summary += " (install 'Pillow' for colour palettes)"
+        self.log(summary)
+        return {'files': len(entries), 'scanned': len(pending), 'removed': removed}
+
+    def scan_file(self, cache, path, rel_path, stat):
+        """Catalog entry for a new or touched file; decoding is skipped for content seen before"""
+        digest = file_sha256(path)
+        # CATALOG_VERSION is part of the key: a new entry format never reuses old features
+        with cache.making('catalog', digest, CATALOG_VERSION):
+            features = cache.get_json('catalog', digest, CATALOG_VERSION)
+            if features is None:
+                entry = catalog_image(path, rel_path, stat)
+                if 'error' not in entry:
+                    cache.put_json('catalog', digest, {field: value for field, value in entry.items()
+                                                       if field not in CATALOG_STAT_FIELDS},
+                                   CATALOG_VERSION)
+                return entry
+        return dict(catalog_image_stat(rel_path, stat), **features)
+
+    def sort_date(self, entry):
+        """Capture date, falling back to file modification time"""
+        return entry.get('captured') or entry['modified']
+
+    def rebuild_index(self):
+        """Precompute the orderings and groupings the GUI and build query"""
+        by_colour = {}
+        by_orientation = {}
+        by_project = {}
+        for rel_path, entry in self.entries.items():
+            if entry.get('dominant_colour'):
+                by_colour.setdefault(entry['dominant_colour'], []).append(rel_path)
+            if entry.get('orientation'):
+                by_orientation.setdefault(entry['orientation'], []).append(rel_path)
+            parts = rel_path.split('/')
+            if len(parts) > 2:
+                by_project.setdefault(parts[1], []).append(rel_path)
+
+        self.index = {
+            'by_date': sorted(self.entries, key=lambda rel: self.sort_date(self.entries[rel])),
+            'by_size': sorted(self.entries, key=lambda rel: self.entries[rel]['size']),
+            'by_colour': by_colour,
+            'by_orientation': by_orientation,
+            'by_project': by_project
+        }
+
+    def get(self, rel_path):
+        """Catalog entry for a path relative to the site root"""
+        return self.entries.get(rel_path)
+
+    def dimensions(self, rel_path):
+        """Displayed (width, height) of an image, or None"""
+        entry = self.entries.get(rel_path)
+        if entry and entry.get('width') and entry.get('height'):
+            return entry['width'], entry['height']
+        return None
+
+    def query(self, colour=None, orientation=None, project=None, sort='date', reverse=False):
+        """Filter and sort entries using the stored indexes"""
+        if sort == 'size':
+            ordered = self.index.get('by_size', [])
+        elif sort == 'name':
+            ordered = sorted(self.entries)
+        else:
+            ordered = self.index.get('by_date', [])
+
+        allowed = None
+        for key, value in (('by_colour', colour), ('by_orientation', orientation),
+                           ('by_project', project)):
+            if value:
+                matches = set(self.index.get(key, {}).get(value, []))
+                allowed = matches if allowed is None else allowed & matches
+
+        results = [self.entries[rel] for rel in ordered
+                   if rel in self.entries and (allowed is None or rel in allowed)]
+        return list(reversed(results)) if reverse else results
+
+
+def hamming_distance(a, b):
+    """Number of differing bits between two integer hashes"""
+    return bin(a ^ b).count('1')
+
+
+def natural_key(name):
+    """Sort key that puts detail-2 before detail-10"""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', name)]
+
+
+class BKTree:
+    """Burkhard-Keller tree over Hamming distance for near-neighbour hash lookups"""
+
+    def __init__(self):
+        # Nodes are [hash, items, {distance: child}]
+        self.root = None
+        self.size = 0
+
+    def add(self, value, item):
+        """Insert an item under its integer hash"""
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value, radius):
+        """All (distance, item) pairs within radius, nearest first"""
+        results = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node[0])
+            if distance <= radius:
+                results.extend((distance, item) for item in node[1])
+            # Triangle inequality: only subtrees in [d - r, d + r] can match
+            for child_distance, child in node[2].items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        return sorted(results, key=lambda result: (result[0], natural_key(str(result[1]))))
+
+
+def diverse_order(items, hashes, first=None):
+    """Order items so each next one differs most from those already shown
+
+    items are names, hashes maps name -> hex dHash (or None). Near-duplicates of
+    an earlier item go last instead of being dropped. Returns (ordered, duplicates).
+    """
+    items = sorted(items, key=natural_key)
+    if first in items:
+        items.remove(first)
+        items.insert(0, first)
+    if not items:
+        return [], []
+
+    values = {item: int(hashes[item], 16) for item in items if hashes.get(item)}
+    ordered = [items[0]]
+    remaining = [item for item in items[1:] if item in values]
+    unhashed = [item for item in items[1:] if item not in values]
+    if items[0] not in values and remaining:
+        ordered.append(remaining.pop(0))
+
+    # Greedy farthest-point traversal in hash space
+    anchors = [values[item] for item in ordered if item in values]
+    nearest = {item: min(hamming_distance(values[item], anchor) for anchor in anchors)
+               for item in remaining}
+    duplicates = []
+    while remaining:
+        best = max(remaining, key=lambda item: nearest[item])
+        if nearest[best] <= NEAR_DUPLICATE_DISTANCE:
+            duplicates = remaining
+            break
+        remaining.remove(best)
+        ordered.append(best)
+        for item in remaining:
+            nearest[item] = min(nearest[item], hamming_distance(values[item], values[best]))
+
+    return ordered + unhashed + duplicates, duplicates
+
+
+class SimilarityIndex:
+    """BK-tree over the catalog's perceptual hashes"""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.tree = BKTree()
+        for rel_path, entry in sorted(catalog.entries.items()):
+            if entry.get('dhash'):
+                self.tree.add(int(entry['dhash'], 16), rel_path)
+
+    def similar(self, rel_path, radius=NEAR_DUPLICATE_DISTANCE):
+        """Other images within radius of the given one"""
+        entry = self.catalog.get(rel_path)
+        if not entry or not entry.get('dhash'):
+            return []
+        return [(distance, other)
+                for distance, other in self.tree.search(int(entry['dhash'], 16), radius)
+                if other != rel_path]
+
+    def near_duplicate_groups(self, radius=NEAR_DUPLICATE_DISTANCE):
+        """Connected groups of images that are near-duplicates of each other"""
+        groups = []
+        seen = set()
+        for rel_path in sorted(self.catalog.entries, key=natural_key):
+            if rel_path in seen:
+                continue
+            group = []
+            stack = [rel_path]
+            while stack:
+                current = stack.pop()
+                if current in seen:
+                    continue
+                seen.add(current)
+                group.append(current)
+                stack.extend(other for _, other in self.similar(current, radius))
+            if len(group) > 1:
+                groups.append(sorted(group, key=natural_key))
+        return groups
+
+    def gallery_order(self, folder, names, main=None):
+        """Diverse display order for images in one project folder"""
+        hashes = {}
+        for name in names:
+            entry = self.catalog.get(f"images/{folder}/{name}")
+            hashes[name] = entry.get('dhash') if entry else None
+        return diverse_order(names, hashes, first=main)
+
+
+def import_file(source, dest, rel_path=None):
+    """Copy source to dest reading it once; hash, sniff and catalog on the way
+
+    The source is memory-mapped and written out in IMPORT_CHUNK_SIZE slices
+    while SHA-256 is updated from the same pages; the header parser and the
+    catalog entry then read the mapping instead of the disk. Files that can't
+    be mapped (empty, some network shares) are streamed in chunks instead.
+
+    The copy is written under a temporary name and renamed over dest, so an
+    existing dest is replaced rather than rewritten in place; history blobs
+    hard-linked to the old file keep their bytes.
+    """
+    started = time.perf_counter()
+    digest = hashlib.sha256()
+    dest = Path(dest)
+    temp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.tmp")
+    with open(source, 'rb') as src:
+        try:
+            mapped = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            mapped = None
+        try:
+            with open(temp, 'wb') as dst:
+                if mapped is not None:
+                    with memoryview(mapped) as view:
+                        for offset in range(0, len(mapped), IMPORT_CHUNK_SIZE):
+                            with view[offset:offset + IMPORT_CHUNK_SIZE] as chunk:
+                                digest.update(chunk)
+                                dst.write(chunk)
+                else:
+                    for chunk in iter(lambda: src.read(IMPORT_CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                        dst.write(chunk)
+            shutil.copystat(source, temp)
+            stat = os.stat(temp)
+            reader = mapped if mapped is not None else src
+            reader.seek(0)
+            entry = catalog_image(temp, rel_path or dest.name, stat, source=reader)
+            os.replace(temp, dest)
+        except BaseException:
+            temp.unlink(missing_ok=True)
+            raise
+        finally:
+            if mapped is not None:
+                mapped.close()
+    return {
+        'size': stat.st_size,
+        'sha256': digest.hexdigest(),
+        'format': entry['format'],
+        'entry': entry,
+        'seconds': time.perf_counter() - started
+    }
+
+
+def import_project_images(project_folder, image_paths, progress=None):
+    """Import uploads using the names project pages look for
+
+    Every source is read once (see import_file) into a temporary name. The
+    first image becomes main.<ext> (the grid image); the rest become detail-1,
+    detail-2, ... in an order that puts the most different shots first, and
+    the main/detail files of an earlier upload are removed so an old main.png
+    can't shadow a new main.jpg. Returns the filenames, near-duplicate and failure notes, catalog entries
+    and the bytes/seconds it took.
+    """
+    started = time.perf_counter()
+    project_folder = Path(project_folder)
+    sources = [Path(path) for path in image_paths if os.path.exists(path)]
+    failures = [f"{Path(path).name}: file not found" for path in image_paths
+                if not os.path.exists(path)]
+
+    staged = {}
+    seen = {}
+    total_bytes = 0
+    temp_path = None
+    try:
+        for i, source in enumerate(sources):
+            if progress:
+                progress(i / len(sources), f"Importing {source.name}")
+            temp_path = project_folder / f".{uuid.uuid4().hex}.importing"
+            try:
+                result = import_file(source, temp_path)
+            except OSError as e:
+                failures.append(f"{source.name}: {e}")
+                if temp_path.exists():
+                    temp_path.unlink()
+                continue
+            total_bytes += result['size']
+            if result['format'] == 'unknown':
+                temp_path.unlink()
+                failures.append(f"{source.name}: not a JPEG, PNG, GIF, WebP or video file")
+            elif result['sha256'] in seen:
+                temp_path.unlink()
+                failures.append(f"{source.name}: identical to {seen[result['sha256']]}, skipped")
+            else:
+                seen[result['sha256']] = source.name
+                staged[str(source)] = (source, temp_path, result)
+    except BaseException:
+        # Cancelled part way: GC never looks at .importing files, so remove them here
+        for path in [temp_path] + [item[1] for item in staged.values()]:
+            if path is not None and path.exists():
+                path.unlink()
+        raise
+
+    image_filenames = []
+    duplicate_names = []
+    entries = []
+    if staged:
+        keys = list(staged)
+        hashes = {key: staged[key][2]['entry'].get('dhash') for key in keys[1:]}
+        ordered, duplicates = diverse_order(list(hashes), hashes)
+        for i, key in enumerate([keys[0]] + ordered):
+            source, temp_path, result = staged[key]
+            extension = source.suffix.lower()
+            accepted = SNIFFED_EXTENSIONS.get(result['format'])
+            if accepted and extension not in accepted:
+                extension = accepted[0]
+            new_filename = f"main{extension}" if i == 0 else f"detail-{i}{extension}"
+            dst_path = project_folder / new_filename
+            os.replace(temp_path, dst_path)
+
+            result['entry']['path'] = f"images/{project_folder.name}/{new_filename}"
+            entries.append(result['entry'])
+            image_filenames.append(new_filename)
+            if key in duplicates:
+                duplicate_names.append(f"{source.name} -> {new_filename}")
+
+        for path in project_folder.iterdir():
+            if path.is_file() and PROJECT_IMAGE_NAME.match(path.name) \
+                    and path.name not in image_filenames:
+                path.unlink()
+
+    return {
+        'images': image_filenames,
+        'duplicates': duplicate_names,
+        'failures': failures,
+        'catalog': entries,
+        'bytes': total_bytes,
+        'seconds': time.perf_counter() - started
+    }
+
+
+def update_project_record(project_dir, project_id, **fields):
+    """Update fields of one record in admin_data/projects.json"""
+    records_file = RecordFile(Path(project_dir) / "admin_data" / "projects.json")
+    records = records_file.read()
+    records.setdefault(project_id, {}).update(fields)
+    records_file.save(records)
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once cancellation was requested"""
+
+
+class JobContext:
+    """What a job handler uses to report progress and notice cancellation"""
+
+    def __init__(self, job_queue, job_id):
+        self.job_queue = job_queue
+        self.job_id = job_id
+        self.cache_dir = job_queue.cache_dir
+
+    def cancelled(self):
+        return self.job_queue.cancel_requested(self.job_id)
+
+    def progress(self, fraction, message=None):
+        """Report progress (0..1); raises JobCancelled when the job was cancelled"""
+        self.job_queue.update_job(self.job_id, fraction, message)
+        if self.cancelled():
+            raise JobCancelled()
+
+    def log(self, message):
+        """Record a log line; raises JobCancelled when the job was cancelled"""
+        self.job_queue.update_job(self.job_id, None, message, log=True)
+        if self.cancelled():
+            raise JobCancelled()
+
+
+def run_copy_images_job(context, project_dir, project_id, folder, sources):
+    """Job: import uploaded images into a project folder"""
+    project_folder = Path(project_dir) / "images" / folder
+    project_folder.mkdir(parents=True, exist_ok=True)
+    summary = import_project_images(project_folder, sources, progress=context.progress)
+    if summary['images']:
+        update_project_record(project_dir, project_id, images=summary['images'])
+    if summary['catalog']:
+        ImageCatalog(project_dir, log=context.log).add(summary['catalog'])
+    seconds = summary['seconds'] or 1e-9
+    context.log(f"Imported {len(summary['images'])} files, {format_bytes(summary['bytes'])} "
+                f"in {seconds:.2f}s ({format_bytes(summary['bytes'] / seconds)}/s)")
+    return {'project_id': project_id, 'images': summary['images'],
+            'duplicates': summary['duplicates'], 'failures': summary['failures'],
+            'bytes': summary['bytes'], 'seconds': summary['seconds']}
+
+
+def run_copy_work_image_job(context, project_dir, work_id, source):
+    """Job: import an available work's image and point its record at it"""
+    dest = Path(project_dir) / "images" / "available" / f"{work_id}{Path(source).suffix.lower()}"
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    result = import_file(source, dest, rel_path=dest.relative_to(project_dir).as_posix())
+    ImageCatalog(project_dir, log=context.log).add([result['entry']])
+    image = f"images/available/{dest.name}"
+    store = AvailableWorksStore(project_dir)
+    if work_id in store.works:
+        store.update(work_id, images=[image])
+    context.log(f"Imported {image} ({format_bytes(result['size'])})")
+    return {'work_id': work_id, 'image': image}
+
+
+def run_build_job(context, project_dir):
+    """Job: incremental site build"""
+    return SiteBuilder(project_dir, log=context.log, progress=context.progress,
+                       cache_dir=context.cache_dir).build()
+
+
+def run_catalog_job(context, project_dir):
+    """Job: rescan changed images into the catalog"""
+    return ImageCatalog(project_dir, log=context.log, cache_dir=context.cache_dir).refresh()
+
+
+def run_validate_job(context, project_dir, site_dir=None):
+    """Job: link and asset integrity check of the built site"""
+    site_dir = Path(site_dir) if site_dir else Path(project_dir) / BUILD_OUTPUT_DIR
+    checker = SiteChecker(site_dir, project_dir, log=context.log)
+    report = checker.check()
+    checker.log_report(report)
+    return {key: report[key] for key in ('missing', 'problems', 'oversized', 'orphans', 'seconds')}
+
+
+def run_gc_job(context, project_dir, dry_run=False, scope=None, grace=GC_GRACE_SECONDS,
+               paths=None):
+    """Job: find unreferenced files and (unless dry_run) move them (or just paths) to quarantine"""
+    collector = GarbageCollector(project_dir, log=context.log, progress=context.progress)
+    if dry_run:
+        report = collector.collect(scope=scope, grace=grace)
+        collector.log_report(report)
+        return report
+    return collector.sweep(scope=scope, grace=grace, paths=paths)
+
+
+def run_snapshot_job(context, project_dir, message="Snapshot"):
+    """Job: record a content history version"""
+    return {'version_id': ContentHistory(project_dir, log=context.log).snapshot(message)}
+
+
+JOB_HANDLERS = {
+    'copy_images': run_copy_images_job,
+    'copy_work_image': run_copy_work_image_job,
+    'build': run_build_job,
+    'catalog': run_catalog_job,
+    'validate': run_validate_job,
+    'gc': run_gc_job,
+    'snapshot': run_snapshot_job
+}
+
+
+class JobQueue:
+    """Persistent priority queue of background jobs run on a worker pool
+
+    Jobs run against project_dir unless submitted for another site root,
+    which lets one pool serve a whole Workspace.
+
+    The GUI and command line runs may share job_queue.json. Every change is
+    merged into the file under its DataFileLock (the newer copy of each job
+    wins), and a worker claims a job in the file before running it, so each
+    job runs in exactly one process.
+    """
+
+    def __init__(self, project_dir, workers=None, on_event=None, cache_dir=None):
+        self.project_dir = Path(project_dir)
+        self.queue_file = self.project_dir / BUILD_STATE_DIR / "job_queue.json"
+        self.worker_count = workers or JOB_WORKERS
+        # BuildCache directory for build and catalog jobs; None keeps each site's own
+        self.cache_dir = cache_dir
+        # Called from worker threads with (event, job snapshot, detail)
+        self.on_event = on_event
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.jobs = {}
+        self.created = set()
+        self.signature = None
+        self.heap = []
+        self.sequence = 0
+        self.condition = threading.Condition()
+        self.threads = []
+        self.stopping = False
+        self.load()
+
+    def load(self):
+        """Restore the persisted queue; jobs interrupted by a crash are queued again"""
+        with self.condition, DataFileLock(self.queue_file):
+            self.sync()
+            resumed = False
+            for job in self.jobs.values():
+                if job['status'] == 'running' and not self.owner_alive(job.get('owner')):
+                    job.update(status='queued', progress=0.0, resumed=True, cancel_requested=False,
+                               owner=None, updated=time.time())
+                    self.push(job)
+                    resumed = True
+            if resumed:
+                self.write()
+
+    def owner_alive(self, owner):
+        """Whether the process that claimed a job may still be running it"""
+        if not owner:
+            return False
+        host, pid, _ = owner.rsplit(':', 2)
+        if host != socket.gethostname():
+            return True
+        if int(pid) == os.getpid():
+            return True
+        if os.name == 'nt':
+            # os.kill() would terminate it; assume a crash as before
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            pass
+        return True
+
+    def sync(self):
+        """Merge the queue file into memory (caller holds the condition and the file lock)
+
+        Each job's newer copy wins. Jobs missing from the file were cleared
+        elsewhere and are dropped, except those created here and not yet written.
+        """
+        self.signature = file_signature(self.queue_file)
+        stored = []
+        if self.signature is not None:
+            try:
+                with open(self.queue_file, 'r') as f:
+                    stored = json.load(f).get('jobs', [])
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable job queue: {e}")
+
+        jobs = {}
+        for job in stored:
+            ours = self.jobs.get(job['id'])
+            if ours is not None and ours.get('updated', 0) >= job.get('updated', 0):
+                jobs[job['id']] = ours
+                continue
+            if ours is not None:
+                # Keep the same dict: a worker may be holding it
+                ours.update(job)
+                job = ours
+            jobs[job['id']] = job
+            if job['status'] == 'queued':
+                self.push(job)
+        for job_id in self.created:
+            if job_id in self.jobs:
+                jobs[job_id] = self.jobs[job_id]
+        self.jobs = jobs
+
+    def write(self):
+        """Save pending jobs and recent history (caller holds the condition and the file lock)"""
+        active = [job for job in self.jobs.values() if job['status'] in ('queued', 'running')]
+        finished = sorted((job for job in self.jobs.values()
+                           if job['status'] not in ('queued', 'running')),
+                          key=lambda job: job.get('finished') or '')[-JOB_HISTORY_LIMIT:]
+        self.jobs = {job['id']: job for job in active + finished}
+        write_if_changed(self.queue_file, json.dumps({'jobs': active + finished}, indent=1))
+        self.created = set()
+        self.signature = file_signature(self.queue_file)
+
+    def persist(self):
+        """Merge with changes from other processes and save (caller holds the condition)"""
+        with DataFileLock(self.queue_file):
+            self.sync()
+            self.write()
+
+    def refresh(self):
+        """Pick up what other processes changed, when they changed anything (caller holds the condition)"""
+        if file_signature(self.queue_file) != self.signature:
+            with DataFileLock(self.queue_file):
+                self.sync()
+
+    def push(self, job):
+        """Add a queued job to the priority heap (caller holds the condition)"""
+        self.sequence += 1
+        heapq.heappush(self.heap, (job['priority'], self.sequence, job['id']))
+
+    def emit(self, event, job, detail=None):
+        if self.on_event:
+            self.on_event(event, dict(job), detail)
+
+    def start(self):
+        """Start the worker threads"""
+        for i in range(self.worker_count):
+            thread = threading.Thread(target=self.worker, name=f"job-worker-{i + 1}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def shutdown(self, wait=False):
+        """Stop taking new work; queued jobs stay persisted for the next start"""
+        with self.condition:
+            self.stopping = True
+            self.persist()
+            self.condition.notify_all()
+        if wait:
+            for thread in self.threads:
+                thread.join()
+
+    def submit(self, kind, params=None, priority=PRIORITY_NORMAL, description=None,
+               project_dir=None):
+        """Queue a job, or return the identical job that is already waiting"""
+        params = params or {}
+        key = f"{kind}:{json.dumps(params, sort_keys=True)}"
+        site = None
+        if project_dir is not None and Path(project_dir) != self.project_dir:
+            site = str(Path(project_dir))
+            key = f"{site}:{key}"
+        with self.condition:
+            self.refresh()
+            for job in self.jobs.values():
+                if job['key'] == key and job['status'] == 'queued':
+                    if priority < job['priority']:
+                        job.update(priority=priority, updated=time.time())
+                        self.push(job)
+                        self.persist()
+                    return job['id']
+
+            job = {
+                'id': uuid.uuid4().hex[:8],
+                'kind': kind,
+                'params': params,
+                'project_dir': site,
+                'key': key,
+                'priority': priority,
+                'description': description or kind,
+                'status': 'queued',
+                'progress': 0.0,
+                'message': '',
+                'log': [],
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'started': None,
+                'finished': None,
+                'result': None,
+                'error': None,
+                'cancel_requested': False,
+                'owner': None,
+                'updated': time.time()
+            }
+            self.jobs[job['id']] = job
+            self.created.add(job['id'])
+            self.push(job)
+            self.persist()
+            self.condition.notify()
+        self.emit('queued', job)
+        return job['id']
+
+    def cancel(self, job_id):
+        """Cancel a queued job now, or ask a running one to stop"""
+        with self.condition, DataFileLock(self.queue_file):
+            self.sync()
+            job = self.jobs.get(job_id)
+            if not job or job['status'] not in ('queued', 'running'):
+                return False
+            if job['status'] == 'queued':
+                job.update(status='cancelled', finished=datetime.now().isoformat(timespec='seconds'))
+            else:
+                # The process running it notices on its next progress report
+                job['cancel_requested'] = True
+            job['updated'] = time.time()
+            self.write()
+            self.condition.notify_all()
+        self.emit('cancelled', job)
+        return True
+
+    def cancel_requested(self, job_id):
+        with self.condition:
+            self.refresh()
+            job = self.jobs.get(job_id)
+            return bool(job and job.get('cancel_requested'))
+
+    def update_job(self, job_id, fraction=None, message=None, log=False):
+        """Progress/log updates from a running handler"""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if not job:
+                return
+            if fraction is not None:
+                job['progress'] = max(0.0, min(1.0, fraction))
+            if message:
+                job['message'] = message
+                if log:
+                    job['log'] = (job['log'] + [message])[-JOB_LOG_LIMIT:]
+        self.emit('log' if log else 'progress', job, message)
+
+    def clear_finished(self):
+        """Forget finished, failed and cancelled jobs"""
+        with self.condition, DataFileLock(self.queue_file):
+            self.sync()
+            self.jobs = {job_id: job for job_id, job in self.jobs.items()
+                         if job['status'] in ('queued', 'running')}
+            self.write()
+
+    def snapshot(self):
+        """Copies of all known jobs, newest first"""
+        with self.condition:
+            self.refresh()
+            jobs = [dict(job) for job in self.jobs.values()]
+        return sorted(jobs, key=lambda job: job['created'], reverse=True)
+
+    def wait_idle(self, timeout=None):
+        """Block until nothing is queued, or running in this process"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            while True:
+                self.refresh()
+                if not any(job['status'] == 'queued'
+                           or (job['status'] == 'running' and job.get('owner') == self.owner)
+                           for job in self.jobs.values()):
+                    return True
+                remaining = JOB_SYNC_SECONDS if deadline is None else deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.condition.wait(min(remaining, JOB_SYNC_SECONDS))
+
+    def worker(self):
+        """Worker thread: run the most urgent queued job, repeat"""
+        while True:
+            with self.condition:
+                while not self.heap and not self.stopping:
+                    self.condition.wait(JOB_SYNC_SECONDS)
+                    self.refresh()
+                if self.stopping:
+                    return
+                _, _, job_id = heapq.heappop(self.heap)
+                # Claim the job in the file; another process may have taken or cancelled it
+                with DataFileLock(self.queue_file):
+                    self.sync()
+                    job = self.jobs.get(job_id)
+                    if not job or job['status'] != 'queued':
+                        continue
+                    job.update(status='running', owner=self.owner, updated=time.time(),
+                               started=datetime.now().isoformat(timespec='seconds'))
+                    self.write()
+            self.emit('started', job)
+
+            result, error = None, None
+            try:
+                handler = JOB_HANDLERS.get(job['kind'])
+                if handler is None:
+                    raise ValueError(f"Unknown job type: {job['kind']}")
+                project_dir = Path(job.get('project_dir') or self.project_dir)
+                result = handler(JobContext(self, job_id), project_dir, **job['params'])
+                status = 'done'
+            except JobCancelled:
+                status = 'cancelled'
+            except Exception as e:
+                status, error = 'failed', str(e)
+                traceback.print_exc()
+
+            with self.condition:
+                job.update(status=status, result=result, error=error, updated=time.time(),
+                           finished=datetime.now().isoformat(timespec='seconds'))
+                if status == 'done':
+                    job['progress'] = 1.0
+                self.persist()
+                self.condition.notify_all()
+            self.emit('finished', job)
+
+
+class Workspace:
+    """Several portfolio sites managed from one process
+
+    workspace.json names the site roots (relative to the workspace folder
+    where possible). Their jobs run on one shared JobQueue and their builds
+    share one BuildCache under the workspace's .build_cache/, so an image
+    used by several sites is scanned and cut into grid tiles once.
+    """
+
+    def __init__(self, path, log=print):
+        self.path = Path(path)
+        self.root = self.path.parent
+        self.cache_dir = self.root / BUILD_STATE_DIR / "cache"
+        self.log = log
+        self.record = RecordFile(self.path, log=log)
+        self.sites = {}
+        self.load()
+
+    def load(self):
+        """Read the site list (empty when the workspace is new)"""
+        try:
+            self.sites = self.record.read().get('sites', {})
+        except (OSError, ValueError) as e:
+            self.log(f"Ignoring unreadable workspace file: {e}")
+
+    def save(self):
+        self.sites = self.record.save({'sites': self.sites}).get('sites', {})
+
+    def site_dir(self, name):
+        return (self.root / self.sites[name]).resolve()
+
+    def site_dirs(self, names=None):
+        """{name: site root} for the named sites, or all of them"""
+        unknown = [name for name in names or [] if name not in self.sites]
+        if unknown:
+            raise ValueError(f"Not in the workspace: {', '.join(unknown)}")
+        return {name: self.site_dir(name) for name in names or sorted(self.sites)}
+
+    def last_built(self, name):
+        """When the site was last built (to the minute), or None"""
+        manifest = self.site_dir(name) / BUILD_STATE_DIR / "build_manifest.json"
+        if not manifest.exists():
+            return None
+        return datetime.fromtimestamp(manifest.stat().st_mtime).isoformat(timespec='minutes')
+
+    def add(self, site_dir, name=None):
+        """Add a site root; returns the name it is listed under"""
+        site_dir = Path(site_dir).resolve()
+        if not (site_dir / "index.html").exists():
+            raise ValueError(f"{site_dir} has no index.html; is it a portfolio site?")
+        name = name or site_dir.name
+        if name in self.sites and self.site_dir(name) != site_dir:
+            raise ValueError(f"The workspace already has a site called {name}")
+        try:
+            stored = Path(os.path.relpath(site_dir, self.root.resolve())).as_posix()
+        except ValueError:
+            # Another drive on Windows
+            stored = str(site_dir)
+        self.sites[name] = stored
+        self.save()
+        return name
+
+    def remove(self, name):
+        """Forget a site; its files are left alone"""
+        if self.sites.pop(name, None) is None:
+            raise ValueError(f"Not in the workspace: {name}")
+        self.save()
+
+    def job_queue(self, workers=None, on_event=None):
+        """The shared worker pool; its queue is kept in the workspace folder"""
+        return JobQueue(self.root, workers=workers, on_event=on_event, cache_dir=self.cache_dir)
+
+    def build(self, names=None, workers=None, on_event=None):
+        """Build sites side by side on one pool; returns {name: finished job}"""
+        sites = self.site_dirs(names)
+        job_queue = self.job_queue(workers, on_event)
+        job_ids = {name: job_queue.submit('build', project_dir=site_dir,
+                                          description=f"{name}: Build site")
+                   for name, site_dir in sites.items()}
+        job_queue.start()
+        job_queue.wait_idle()
+        job_queue.shutdown(wait=True)
+        jobs = {job['id']: job for job in job_queue.snapshot()}
+        return {name: jobs[job_id] for name, job_id in job_ids.items()}
+
+
+class ReferenceParser(HTMLParser):
+    """Streaming HTML parser collecting local references and work items"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.references = []
+        self.work_items = []
+        self.in_style = False
+
+    def handle_starttag(self, tag, attrs):
+        line = self.getpos()[0]
+        for name, value in attrs:
+            if value is None:
+                continue
+            if name in REFERENCE_ATTRIBUTES:
+                self.references.append((line, value))
+            elif name in ('srcset', 'imagesrcset'):
+                for candidate in value.split(','):
+                    if candidate.strip():
+                        self.references.append((line, candidate.split()[0]))
+            elif name == 'style':
+                self.references.extend((line, url) for url in CSS_URL_PATTERN.findall(value))
+            elif name == 'data-project':
+                self.work_items.append((line, value))
+        if tag == 'style':
+            self.in_style = True
+
+    def handle_endtag(self, tag):
+        if tag == 'style':
+            self.in_style = False
+
+    def handle_data(self, data):
+        if self.in_style:
+            line = self.getpos()[0]
+            self.references.extend((line, url) for url in CSS_URL_PATTERN.findall(data))
+
+
+def is_local_reference(ref):
+    """Whether a reference points into the site rather than elsewhere"""
+    ref = ref.strip()
+    return bool(ref) and not ref.startswith(('#', '//', '${')) and not EXTERNAL_REF_PATTERN.match(ref)
+
+
+class SiteChecker:
+    """Link and asset integrity check over a built (or source) site tree"""
+
+    def __init__(self, site_dir, project_dir=None, log=print):
+        self.site_dir = Path(site_dir)
+        self.project_dir = Path(project_dir) if project_dir else self.site_dir
+        self.log = log
+        self.files = {}
+
+    def index_files(self):
+        """One walk of the tree: relative path -> size"""
+        files = {}
+        for dirpath, dirnames, filenames in os.walk(self.site_dir):
+            dirnames[:] = [name for name in dirnames
+                           if not name.startswith('.') and name not in CHECK_SKIP_DIRS]
+            rel_dir = Path(dirpath).relative_to(self.site_dir).as_posix()
+            for filename in filenames:
+                if filename.endswith(tuple(COMPRESSED_SUFFIXES)):
+                    continue
+                rel_path = filename if rel_dir == '.' else f"{rel_dir}/{filename}"
+                files[rel_path] = os.path.getsize(os.path.join(dirpath, filename))
+        return files
+
+    def resolve(self, source, ref):
+        """Site-relative path a reference points to"""
+        path = unquote(ref.split('#')[0].split('?')[0].strip())
+        if path.startswith('/'):
+            target = path.lstrip('/')
+        else:
+            base = posixpath.dirname(source)
+            target = posixpath.normpath(posixpath.join(base, path)) if base else posixpath.normpath(path)
+        if target in ('.', ''):
+            return 'index.html'
+        if target.endswith('/') or target + '/index.html' in self.files:
+            return target.rstrip('/') + '/index.html'
+        return target
+
+    def scan_file(self, rel_path):
+        """Parse one file; return (references, work items)"""
+        path = self.site_dir / rel_path
+        suffix = path.suffix.lower()
+        references = []
+        work_items = []
+
+        if suffix == '.html':
+            parser = ReferenceParser()
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                for chunk in iter(lambda: f.read(64 * 1024), ''):
+                    parser.feed(chunk)
+            parser.close()
+            references = parser.references
+            work_items = parser.work_items
+        elif suffix == '.css':
+            text = path.read_text(encoding='utf-8', errors='replace')
+            for match in CSS_URL_PATTERN.finditer(text):
+                references.append((text.count('\n', 0, match.start()) + 1, match.group(1)))
+        elif suffix == '.js':
+            text = path.read_text(encoding='utf-8', errors='replace')
+            for match in JS_PATH_PATTERN.finditer(text):
+                references.append((text.count('\n', 0, match.start()) + 1, match.group(1)))
+        elif rel_path == 'precache-manifest.json':
+            manifest = json.loads(path.read_text(encoding='utf-8'))
+            references = [(0, entry['url']) for entry in manifest.get('precache', [])]
+        elif path.name == 'gallery.json':
+            manifest = json.loads(path.read_text(encoding='utf-8'))
+            names = ([manifest['main']] if manifest.get('main') else []) + manifest.get('gallery', [])
+            references = [(0, name) for name in names]
+
+        resolved = [(line, ref, self.resolve(rel_path, ref))
+                    for line, ref in references if is_local_reference(ref)]
+        return rel_path, resolved, work_items
+
+    def probed_images(self, folder):
+        """Images project pages load for a folder when there is no gallery.json"""
+        names = set(name.rsplit('/', 1)[-1] for name in self.files
+                    if name.startswith(f"images/{folder}/"))
+        found = {name for name in GRID_IMAGE_NAMES if name in names}
+        found.update(f"{stem}.{ext}" for stem in MAIN_IMAGE_STEMS for ext in PROBE_EXTENSIONS
+                     if f"{stem}.{ext}" in names)
+        gallery = [f"{stem}.{ext}" for stem in GALLERY_PROBE_NAMES for ext in PROBE_EXTENSIONS
+                   if f"{stem}.{ext}" in names]
+        return found | set(gallery[:MAX_PROBED_GALLERY_IMAGES])
+
+    def check(self):
+        """Run every check and return the report"""
+        started = time.perf_counter()
+        self.files = self.index_files()
+        scannable = [rel_path for rel_path in self.files
+                     if Path(rel_path).suffix.lower() in ('.html', '.css', '.js')
+                     or rel_path == 'precache-manifest.json'
+                     or rel_path.endswith('/gallery.json')]
+
+        with ThreadPoolExecutor(max_workers=(os.cpu_count() or 4) * 2) as pool:
+            scanned = list(pool.map(self.scan_file, scannable))
+
+        referenced = {}
+        missing = []
+        work_items = {}
+        for source, references, items in scanned:
+            for line, ref, target in references:
+                referenced.setdefault(target, set()).add(source)
+                if target not in self.files:
+                    missing.append({'source': source, 'line': line, 'reference': ref,
+                                    'resolved': target})
+            for line, project_id in items:
+                work_items.setdefault(project_id, []).append((source, line))
+
+        # Work items load project.html?id=... and images chosen at runtime
+        projects = {}
+        if 'script.js' in self.files:
+            projects = parse_script_projects(
+                (self.site_dir / 'script.js').read_text(encoding='utf-8', errors='replace'))
+        for rel_path in self.files:
+            # Built sites move projectData out of script.js into projects/<id>.json
+            chunk = re.fullmatch(r'projects/([^/]+)\.json', rel_path)
+            if chunk:
+                projects[chunk.group(1)] = json.loads((self.site_dir / rel_path).read_text(encoding='utf-8'))
+        projects_data_file = self.project_dir / "admin_data" / "projects.json"
+        if projects_data_file.exists():
+            with open(projects_data_file, 'r') as f:
+                projects.update(json.load(f))
+
+        problems = []
+        for project_id, places in sorted(work_items.items(), key=lambda item: natural_key(item[0])):
+            source, line = places[0]
+            folder = projects.get(project_id, {}).get('folder', project_id)
+            if project_id not in projects:
+                problems.append({'source': source, 'line': line,
+                                 'problem': f"work item {project_id} has no project data"})
+            gallery_manifest = f"images/{folder}/gallery.json"
+            if gallery_manifest in self.files:
+                referenced.setdefault(gallery_manifest, set()).add(source)
+                grid = next((f"images/{folder}/{name}" for name in GRID_IMAGE_NAMES
+                             if f"images/{folder}/{name}" in self.files), None)
+                if grid:
+                    referenced.setdefault(grid, set()).add(source)
+            else:
+                for name in self.probed_images(folder):
+                    referenced.setdefault(f"images/{folder}/{name}", set()).add(source)
+            if not any(f"images/{folder}/{name}" in self.files for name in GRID_IMAGE_NAMES):
+                problems.append({'source': source, 'line': line,
+                                 'problem': f"work item {project_id} has no grid image in images/{folder}/"})
+
+        entry_points = set(SITE_PAGES + SITE_EXTRA_FILES + ['sw.js', 'precache-manifest.json'])
+        orphans = sorted((rel_path for rel_path in self.files
+                          if rel_path not in referenced and rel_path not in entry_points
+                          and (Path(rel_path).suffix.lower() in ('.css', '.js')
+                               or (rel_path.startswith('images/')
+                                   and Path(rel_path).suffix.lower() in WEB_MEDIA_EXTENSIONS))),
+                         key=natural_key)
+
+        oversized = []
+        grid_images = {f"images/{projects.get(pid, {}).get('folder', pid)}/{name}"
+                       for pid in work_items for name in GRID_IMAGE_NAMES}
+        for target, sources in referenced.items():
+            size = self.files.get(target)
+            if size is None:
+                continue
+            suffix = Path(target).suffix.lower()
+            if target in grid_images:
+                limit = GRID_IMAGE_SIZE_LIMIT
+            elif suffix in WEB_IMAGE_EXTENSIONS:
+                limit = IMAGE_SIZE_LIMIT
+            elif suffix in COMPRESSIBLE_EXTENSIONS:
+                limit = TEXT_SIZE_LIMIT
+            else:
+                continue
+            if size > limit:
+                oversized.append({'path': target, 'size': size, 'limit': limit,
+                                  'referenced_by': sorted(sources)})
+        oversized.sort(key=lambda item: item['size'], reverse=True)
+
+        unsafe_names = sorted(rel_path for rel_path in self.files if ' ' in rel_path)
+
+        return {
+            'site_dir': str(self.site_dir),
+            'files': len(self.files),
+            'scanned': len(scannable),
+            'references': sum(len(references) for _, references, _ in scanned),
+            'missing': missing,
+            'problems': problems,
+            'orphans': orphans,
+            'oversized': oversized,
+            'unsafe_names': unsafe_names,
+            'seconds': time.perf_counter() - started
+        }
+
+    def log_report(self, report):
+        """Write a readable summary of a check report"""
+        self.log(f"Checked {report['references']} references in {report['scanned']} files "
+                 f"({report['files']} files in {report['site_dir']}) in {report['seconds']:.2f}s")
+        for item in report['missing']:
+            self.log(f"MISSING   {item['source']}:{item['line']}  {item['reference']}")
+        for item in report['problems']:
+            self.log(f"PROBLEM   {item['source']}:{item['line']}  {item['problem']}")
+        for item in report['oversized']:
+            self.log(f"OVERSIZED {item['path']}  {format_bytes(item['size'])} "
+                     f"(limit {format_bytes(item['limit'])})")
+        for rel_path in report['orphans']:
+            self.log(f"ORPHAN    {rel_path}")
+        for rel_path in report['unsafe_names']:
+            self.log(f"SPACES    {rel_path}")
+        self.log(f"{len(report['missing'])} missing, {len(report['problems'])} problems, "
+                 f"{len(report['oversized'])} oversized, {len(report['orphans'])} orphaned, "
+                 f"{len(report['unsafe_names'])} names with spaces")
+
+
+def json_strings(value):
+    """Every string inside a loaded JSON document"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from json_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from json_strings(item)
+
+
+class GarbageCollector:
+    """Mark-and-sweep of unreferenced files under images/ and admin_data/
+
+    Swept files are moved into .quarantine/<sweep id>/ so a sweep can be
+    undone; space is only given back when a sweep is purged.
+    """
+
+    def __init__(self, project_dir, log=print, progress=None):
+        self.project_dir = Path(project_dir)
+        self.images_dir = self.project_dir / "images"
+        self.data_dir = self.project_dir / "admin_data"
+        self.quarantine_dir = self.project_dir / QUARANTINE_DIR
+        self.log = log
+        self.progress = progress
+
+    def index_files(self):
+        """Collectable files: media under images/ and everything in admin_data/"""
+        files = {}
+        if self.images_dir.exists():
+            for path in self.images_dir.rglob('*'):
+                if path.is_file() and path.suffix.lower() in CATALOG_EXTENSIONS:
+                    files[path.relative_to(self.project_dir).as_posix()] = path.stat()
+        if self.data_dir.exists():
+            for path in self.data_dir.rglob('*'):
+                if path.is_file() and not path.name.startswith('.'):  # .<name>.lock files
+                    files[path.relative_to(self.project_dir).as_posix()] = path.stat()
+        return files
+
+    def page_references(self):
+        """Local files the pages, styles and scripts refer to"""
+        checker = SiteChecker(self.project_dir, self.project_dir, log=self.log)
+        checker.files = checker.index_files()
+        scannable = [rel_path for rel_path in checker.files
+                     if Path(rel_path).suffix.lower() in ('.html', '.css', '.js')]
+        with ThreadPoolExecutor(max_workers=(os.cpu_count() or 4) * 2) as pool:
+            scanned = list(pool.map(checker.scan_file, scannable))
+        return {target for _, references, _ in scanned for _, _, target in references}
+
+    def mark(self, files):
+        """Return {rel_path: reason it is kept} for every live file"""
+        live = {}
+        for target in self.page_references():
+            if target in files:
+                live[target] = "referenced by a page"
+
+        # Projects with an image list own exactly those files; older projects
+        # (defined only in script.js) publish everything in their folder
+        for project_id, record in load_project_records(self.project_dir).items():
+            folder = record.get('folder', project_id)
+            prefix = f"images/{folder}/"
+            if record.get('images'):
+                for name in record['images']:
+                    if prefix + name in files:
+                        live[prefix + name] = f"image of {project_id}"
+            else:
+                for rel_path in files:
+                    if rel_path.startswith(prefix):
+                        live[rel_path] = f"in the folder of {project_id}"
+
+        for name in ADMIN_DATA_FILES:
+            rel_path = f"admin_data/{name}"
+            if rel_path not in files:
+                continue
+            live[rel_path] = "content manager data"
+            try:
+                with open(self.project_dir / rel_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for value in json_strings(data):
+                target = value.strip().lstrip('./')
+                if target in files:
+                    live.setdefault(target, f"used by {rel_path}")
+        return live
+
+    def garbage_reason(self, rel_path, projects):
+        """Why an unmarked file is garbage"""
+        parts = rel_path.split('/')
+        if parts[0] == 'admin_data':
+            return "not a content manager data file"
+        if len(parts) > 2:
+            owner = next((pid for pid, record in projects.items()
+                          if record.get('folder', pid) == parts[1]), None)
+            if owner:
+                return f"not in the image list of {owner}"
+            return f"no project uses images/{parts[1]}/"
+        return "not referenced by any page"
+
+    def collect(self, scope=None, grace=GC_GRACE_SECONDS):
+        """Dry run: what a sweep would move, and how many bytes it frees
+
+        scope limits the sweep to paths under one prefix; files changed
+        within grace seconds are left alone so running imports are safe.
+        """
+        started = time.perf_counter()
+        files = self.index_files()
+        live = self.mark(files)
+        projects = load_project_records(self.project_dir)
+        cutoff = time.time() - grace
+
+        candidates = []
+        recent = 0
+        for rel_path, stat in files.items():
+            if rel_path in live or (scope and not rel_path.startswith(scope)):
+                continue
+            if stat.st_mtime > cutoff:
+                recent += 1
+                continue
+            candidates.append({'path': rel_path, 'size': stat.st_size,
+                               'reason': self.garbage_reason(rel_path, projects)})
+        candidates.sort(key=lambda item: natural_key(item['path']))
+
+        return {
+            'files': len(files),
+            'live': len(live),
+            'recent': recent,
+            'candidates': candidates,
+            'bytes': sum(item['size'] for item in candidates),
+            'quarantined_bytes': sum(sweep['bytes'] for sweep in self.list_sweeps()),
+            'seconds': time.perf_counter() - started
+        }
+
+    def sweep(self, scope=None, grace=GC_GRACE_SECONDS, paths=None):
+        """Move garbage into a new quarantine folder; return the report
+
+        With paths (e.g. the list a user confirmed from a dry run) only those
+        are moved, and only if they are still garbage.
+        """
+        report = self.collect(scope=scope, grace=grace)
+        if paths is not None:
+            confirmed = set(paths)
+            report['candidates'] = [item for item in report['candidates'] if item['path'] in confirmed]
+            report['bytes'] = sum(item['size'] for item in report['candidates'])
+        candidates = report['candidates']
+        report['sweep_id'] = None
+        if not candidates:
+            return report
+
+        sweep_id = datetime.now().strftime('%Y%m%d-%H%M%S')
+        suffix = 1
+        while (self.quarantine_dir / sweep_id).exists():
+            suffix += 1
+            sweep_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{suffix}"
+        sweep_dir = self.quarantine_dir / sweep_id
+        sweep_dir.mkdir(parents=True)
+
+        # Record the plan first so a sweep cut short can still be undone
+        record = {'id': sweep_id, 'created': datetime.now().isoformat(timespec='seconds'),
+                  'files': candidates, 'bytes': report['bytes'], 'removed_dirs': []}
+        write_if_changed(sweep_dir / "sweep.json", json.dumps(record, indent=2))
+
+        for i, item in enumerate(candidates):
+            if self.progress:
+                self.progress(i / len(candidates), f"Quarantining {item['path']}")
+            dest = sweep_dir / "files" / item['path']
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(self.project_dir / item['path']), str(dest))
+            self.log(f"Quarantined {item['path']} ({item['reason']})")
+
+        # Project folders left empty go too; undo recreates them
+        for folder in sorted({posixpath.dirname(item['path']) for item in candidates},
+                             key=len, reverse=True):
+            path = self.project_dir / folder
+            if folder.count('/') >= 1 and path.is_dir() and not any(path.iterdir()):
+                path.rmdir()
+                record['removed_dirs'].append(folder)
+        write_if_changed(sweep_dir / "sweep.json", json.dumps(record, indent=2))
+
+        report['sweep_id'] = sweep_id
+        self.log(f"Sweep {sweep_id}: {len(candidates)} files, {format_bytes(report['bytes'])} "
+                 f"moved to {QUARANTINE_DIR}/ (undo with: gc --undo {sweep_id})")
+        return report
+
+    def list_sweeps(self):
+        """Quarantined sweeps, newest first"""
+        sweeps = []
+        if self.quarantine_dir.exists():
+            for manifest in self.quarantine_dir.glob('*/sweep.json'):
+                try:
+                    with open(manifest, 'r', encoding='utf-8') as f:
+                        sweeps.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return sorted(sweeps, key=lambda sweep: sweep['id'], reverse=True)
+
+    def find_sweep(self, sweep_id=None):
+        sweeps = self.list_sweeps()
+        if sweep_id is None:
+            return sweeps[0] if sweeps else None
+        return next((sweep for sweep in sweeps if sweep['id'] == sweep_id), None)
+
+    def undo(self, sweep_id=None):
+        """Put the files of a sweep (the latest by default) back where they were"""
+        sweep = self.find_sweep(sweep_id)
+        if sweep is None:
+            raise ValueError(f"No quarantined sweep {sweep_id}" if sweep_id
+                             else "Nothing to undo")
+        sweep_dir = self.quarantine_dir / sweep['id']
+        restored = []
+        conflicts = []
+        for item in sweep['files']:
+            source = sweep_dir / "files" / item['path']
+            dest = self.project_dir / item['path']
+            if not source.exists():
+                continue
+            if dest.exists():
+                conflicts.append(item['path'])
+                continue
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(source), str(dest))
+            restored.append(item['path'])
+        for folder in sweep.get('removed_dirs', []):
+            (self.project_dir / folder).mkdir(parents=True, exist_ok=True)
+
+        if conflicts:
+            self.log(f"Kept {len(conflicts)} files in {QUARANTINE_DIR}/{sweep['id']}/ "
+                     f"because a file with the same name exists again")
+        else:
+            shutil.rmtree(sweep_dir)
+        self.log(f"Restored {len(restored)} files from sweep {sweep['id']}")
+        return {'sweep_id': sweep['id'], 'restored': restored, 'conflicts': conflicts}
+
+    def purge(self, sweep_id=None):
+        """Delete quarantined sweeps for good (all of them by default); return bytes freed"""
+        sweeps = self.list_sweeps()
+        if sweep_id is not None:
+            sweeps = [sweep for sweep in sweeps if sweep['id'] == sweep_id]
+            if not sweeps:
+                raise ValueError(f"No quarantined sweep {sweep_id}")
+        freed = 0
+        for sweep in sweeps:
+            sweep_dir = self.quarantine_dir / sweep['id']
+            for path in sweep_dir.rglob('*'):
+                if path.is_file():
+                    freed += path.stat().st_size
+            shutil.rmtree(sweep_dir)
+            self.log(f"Purged sweep {sweep['id']}")
+        if self.quarantine_dir.exists() and not any(self.quarantine_dir.iterdir()):
+            self.quarantine_dir.rmdir()
+        self.log(f"Freed {format_bytes(freed)}")
+        return freed
+
+    def log_report(self, report):
+        """Write a readable summary of a collect/sweep report"""
+        for item in report['candidates']:
+            self.log(f"{format_bytes(item['size']):>10}  {item['path']}  ({item['reason']})")
+        self.log(f"{len(report['candidates'])} of {report['files']} files unreferenced, "
+                 f"{format_bytes(report['bytes'])} reclaimable; {report['recent']} recently "
+                 f"changed files skipped; {format_bytes(report['quarantined_bytes'])} already "
+                 f"in quarantine ({report['seconds']:.2f}s)")
+
+
+def record_changes(old, new):
+    """Added, removed and changed top-level keys between two JSON documents"""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return {'added': [], 'removed': [], 'changed': {} if old == new else {'(document)': []}}
+    changed = {}
+    for key in sorted(set(old) & set(new)):
+        if old[key] != new[key]:
+            if isinstance(old[key], dict) and isinstance(new[key], dict):
+                changed[key] = sorted(field for field in set(old[key]) | set(new[key])
+                                      if old[key].get(field) != new[key].get(field))
+            else:
+                changed[key] = []
+    return {'added': sorted(set(new) - set(old)), 'removed': sorted(set(old) - set(new)),
+            'changed': changed}
+
+
+def clone_file(source, dest):
+    """Copy source to dest as a copy-on-write clone; False where the file system can't"""
+    if fcntl is None or not sys.platform.startswith('linux'):
+        return False
+    try:
+        with open(source, 'rb') as src, open(dest, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    except OSError:
+        return False
+    shutil.copystat(source, dest)
+    return True
+
+
+class ContentHistory:
+    """Versioned snapshots of admin_data/ and images/ in .history/
+
+    File contents are stored once under their SHA-256 in blobs/. Media blobs
+    are hard links to the live files, so history costs no extra space for
+    images; this is safe because every writer (import_file, write_if_changed)
+    replaces a file by renaming a new one over it rather than rewriting it in
+    place. Data files are small and get a copy of their own. A version only
+    records the paths that changed since its parent, with a full tree every
+    HISTORY_CHECKPOINT_INTERVAL versions, so listing, diffing and restoring
+    read a bounded number of small records however long the history gets.
+    """
+
+    def __init__(self, project_dir, log=print):
+        self.project_dir = Path(project_dir)
+        self.history_dir = self.project_dir / HISTORY_DIR
+        self.blobs_dir = self.history_dir / "blobs"
+        self.versions_dir = self.history_dir / "versions"
+        self.index_file = self.history_dir / "index.json"
+        self.log = log
+
+    def load_index(self):
+        """Head version and the (size, mtime, sha256) of every file it contains"""
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, 'r') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                self.log(f"Ignoring unreadable history index: {e}")
+        return {'head': 0, 'files': {}}
+
+    def tracked_files(self):
+        """{rel_path: stat} of the content manager data files and all media"""
+        files = {}
+        for name in ADMIN_DATA_FILES:
+            path = self.project_dir / "admin_data" / name
+            if path.is_file():
+                files[f"admin_data/{name}"] = path.stat()
+        images_dir = self.project_dir / "images"
+        if images_dir.exists():
+            for path in images_dir.rglob('*'):
+                if path.is_file() and path.suffix.lower() in CATALOG_EXTENSIONS:
+                    files[path.relative_to(self.project_dir).as_posix()] = path.stat()
+        return files
+
+    def blob_path(self, sha):
+        return self.blobs_dir / sha[:2] / sha
+
+    def copy_file(self, source, dest):
+        """Place a copy of source at dest, cloned where the file system allows"""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = dest.with_name(f"{dest.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            if not clone_file(source, tmp_path):
+                shutil.copy2(source, tmp_path)
+            os.replace(tmp_path, dest)
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+
+    def link_file(self, source, dest):
+        """Hard-link source at dest, falling back to a copy where links aren't possible"""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = dest.with_name(f"{dest.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            self.copy_file(source, dest)
+            return
+        try:
+            os.replace(tmp_path, dest)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def place_file(self, rel_path, source, dest):
+        """Link media between blobs/ and the site; copy data files"""
+        if rel_path.startswith('admin_data/'):
+            self.copy_file(source, dest)
+        else:
+            self.link_file(source, dest)
+
+    def read_version(self, version_id):
+        path = self.versions_dir / f"{version_id:06d}.json"
+        if not path.exists():
+            raise ValueError(f"No version {version_id}")
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def tree(self, version_id):
+        """{rel_path: sha256} of a version: the nearest checkpoint plus the deltas after it"""
+        records = [self.read_version(version_id)]
+        while 'tree' not in records[-1]:
+            records.append(self.read_version(records[-1]['parent']))
+        tree = dict(records.pop()['tree'])
+        for record in reversed(records):
+            tree.update(record['changed'])
+            for rel_path in record['removed']:
+                tree.pop(rel_path, None)
+        return tree
+
+    def snapshot(self, message):
+        """Record the current content as a new version; None when nothing changed"""
+        with DataFileLock(self.index_file):
+            index = self.load_index()
+            previous = {rel_path: cached[2] for rel_path, cached in index['files'].items()}
+            files = {}
+            for rel_path, stat in self.tracked_files().items():
+                cached = index['files'].get(rel_path)
+                if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+                    sha = cached[2]
+                else:
+                    sha = file_sha256(self.project_dir / rel_path)
+                files[rel_path] = [stat.st_size, stat.st_mtime_ns, sha]
+
+            changed = {rel_path: cached[2] for rel_path, cached in files.items()
+                       if previous.get(rel_path) != cached[2]}
+            removed = {rel_path: sha for rel_path, sha in previous.items() if rel_path not in files}
+            if not changed and not removed:
+                if files != index['files']:
+                    write_if_changed(self.index_file, json.dumps({'head': index['head'], 'files': files}))
+                return None
+
+            for rel_path, sha in changed.items():
+                if not self.blob_path(sha).exists():
+                    self.place_file(rel_path, self.project_dir / rel_path, self.blob_path(sha))
+
+            version_id = index['head'] + 1
+            record = {
+                'id': version_id,
+                'parent': index['head'] or None,
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'message': message,
+                'files': len(files),
+                'changed': changed,
+                'previous': {rel_path: previous[rel_path] for rel_path in changed
+                             if rel_path in previous},
+                'removed': removed
+            }
+            if (version_id - 1) % HISTORY_CHECKPOINT_INTERVAL == 0:
+                record['tree'] = {rel_path: cached[2] for rel_path, cached in files.items()}
+            write_if_changed(self.versions_dir / f"{version_id:06d}.json",
+                             json.dumps(record, indent=1, sort_keys=True))
+            write_if_changed(self.index_file, json.dumps({'head': version_id, 'files': files}))
+
+        self.log(f"Version {version_id}: {message} ({len(changed)} changed, "
+                 f"{len(removed)} removed)")
+        return version_id
+
+    def versions(self):
+        """Version summaries, newest first"""
+        summaries = []
+        if self.versions_dir.exists():
+            for path in sorted(self.versions_dir.glob('*.json'), reverse=True):
+                record = self.read_version(int(path.stem))
+                summaries.append({
+                    'id': record['id'],
+                    'created': record['created'],
+                    'message': record['message'],
+                    'files': record['files'],
+                    'added': len(set(record['changed']) - set(record['previous'])),
+                    'modified': len(record['previous']),
+                    'removed': len(record['removed'])
+                })
+        return summaries
+
+    def load_blob(self, sha):
+        if sha is None:
+            return {}
+        with open(self.blob_path(sha), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def diff(self, version_id, other_id=None):
+        """What changed from other_id (the version's parent by default) to version_id
+
+        Data files are compared record by record, everything else by path.
+        """
+        if other_id is None:
+            record = self.read_version(version_id)
+            other_id = record['parent']
+            before = dict(record['previous'], **record['removed'])
+            after = record['changed']
+        else:
+            before, after = self.tree(other_id), self.tree(version_id)
+            paths = {rel_path for rel_path in set(before) | set(after)
+                     if before.get(rel_path) != after.get(rel_path)}
+            before = {rel_path: sha for rel_path, sha in before.items() if rel_path in paths}
+            after = {rel_path: sha for rel_path, sha in after.items() if rel_path in paths}
+
+        records = {}
+        for rel_path in sorted(set(before) | set(after)):
+            if rel_path.startswith('admin_data/'):
+                try:
+                    records[rel_path] = record_changes(self.load_blob(before.get(rel_path)),
+                                                       self.load_blob(after.get(rel_path)))
+                except (OSError, ValueError):
+                    pass
+        return {
+            'from': other_id,
+            'to': version_id,
+            'added': sorted(set(after) - set(before)),
+            'removed': sorted(set(before) - set(after)),
+            'modified': sorted(set(before) & set(after)),
+            'records': records
+        }
+
+    def describe(self, diff):
+        """Readable lines for a diff"""
+        lines = [f"Version {diff['from'] or 'start'} -> {diff['to']}"]
+        for rel_path, changes in diff['records'].items():
+            for key in changes['added']:
+                lines.append(f"  {rel_path}: added {key}")
+            for key in changes['removed']:
+                lines.append(f"  {rel_path}: removed {key}")
+            for key, fields in changes['changed'].items():
+                lines.append(f"  {rel_path}: changed {key}"
+                             + (f" ({', '.join(fields)})" if fields else ''))
+        for label, paths in (('+', diff['added']), ('-', diff['removed']), ('~', diff['modified'])):
+            lines.extend(f"{label} {rel_path}" for rel_path in paths
+                         if rel_path not in diff['records'])
+        return lines
+
+    def restore(self, version_id):
+        """Make admin_data/ and images/ match a version
+
+        The current state is recorded first and the restore itself becomes
+        a new version, so a restore can be undone like any other change.
+        """
+        target = self.tree(version_id)
+        missing = [rel_path for rel_path, sha in target.items() if not self.blob_path(sha).exists()]
+        if missing:
+            raise ValueError(f"Version {version_id} is missing {len(missing)} stored files")
+        self.snapshot(f"Before restoring version {version_id}")
+
+        written = []
+        deleted = []
+        damaged = []
+        with DataFileLock(self.index_file):
+            current = {rel_path: cached[2] for rel_path, cached in self.load_index()['files'].items()}
+            for rel_path, sha in sorted(target.items()):
+                if current.get(rel_path) == sha:
+                    continue
+                if file_sha256(self.blob_path(sha)) != sha:
+                    damaged.append(rel_path)  # Corrupted, or an image edited in place elsewhere
+                    continue
+                self.place_file(rel_path, self.blob_path(sha), self.project_dir / rel_path)
+                written.append(rel_path)
+            for rel_path in sorted(set(current) - set(target)):
+                path = self.project_dir / rel_path
+                if path.exists():
+                    path.unlink()
+                deleted.append(rel_path)
+
+        new_version = self.snapshot(f"Restored version {version_id}")
+        self.log(f"Restored version {version_id}: {len(written)} files written, "
+                 f"{len(deleted)} removed")
+        if damaged:
+            self.log(f"{len(damaged)} stored files no longer match their snapshot and were skipped")
+        return {'version_id': version_id, 'new_version': new_version,
+                'written': written, 'deleted': deleted, 'damaged': damaged}
+
+
+def watched_source_files(project_dir):
+    """Every file a build reads: pages, assets, content manager data and media"""
+    project_dir = Path(project_dir)
+    paths = [project_dir / name for name in SITE_PAGES + SITE_SHELL_ASSETS + SITE_EXTRA_FILES]
+    paths += [project_dir / "admin_data" / name for name in ADMIN_DATA_FILES]
+    images_dir = project_dir / "images"
+    if images_dir.exists():
+        paths += [path for path in images_dir.rglob('*')
+                  if path.is_file() and path.suffix.lower() in CATALOG_EXTENSIONS]
+    return paths
+
+
+def watch_and_build(project_dir, interval=WATCH_INTERVAL_SECONDS, minify=True):
+    """Build, then rebuild whenever a source file changes, until interrupted"""
+    detector = ChangeDetector(lambda: watched_source_files(project_dir))
+    changed = ['(first build)']
+    try:
+        while True:
+            if changed:
+                report = SiteBuilder(project_dir, minify=minify).build()
+                print(f"Build {report['build_hash']} finished in {report['seconds']:.2f}s; "
+                      f"watching for changes (Ctrl+C to stop)")
+            time.sleep(interval)
+            changed = detector.poll()
+            for path in changed[:5]:
+                print(f"Changed: {Path(path).relative_to(project_dir)}")
+    except KeyboardInterrupt:
+        return 0
+
+
+class StaticSiteHandler(BaseHTTPRequestHandler):
+    """Serve a built site the way a static host would
+
+    Picks the pre-compressed .br/.gz sibling the client accepts, answers
+    byte-range requests (video seeking) and revalidates with ETags.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'RachaelSite/1.0'
+    site_dir = None
+    quiet = True
+
+    def do_GET(self):
+        self.send_file(head=False)
+
+    def do_HEAD(self):
+        self.send_file(head=True)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def resolve(self):
+        """The file for the request path, or None; never outside site_dir"""
+        rel_path = unquote(self.path.split('?', 1)[0].split('#', 1)[0])
+        path = (self.site_dir / rel_path.lstrip('/')).resolve()
+        if path != self.site_dir and self.site_dir not in path.parents:
+            return None
+        if path.is_dir():
+            path = path / 'index.html'
+        return path if path.is_file() else None
+
+    def negotiate(self, path):
+        """(path to send, Content-Encoding or None) for the client's Accept-Encoding"""
+        accepted = set()
+        for item in self.headers.get('Accept-Encoding', '').split(','):
+            name, _, params = item.strip().partition(';')
+            if name and params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+                accepted.add(name.lower())
+        for encoding, suffix in SERVE_ENCODINGS:
+            variant = path.with_name(path.name + suffix)
+            if (encoding in accepted or '*' in accepted) and variant.is_file():
+                return variant, encoding
+        return path, None
+
+    def send_file(self, head):
+        path = self.resolve()
+        if path is None:
+            self.send_error(404)
+            return
+        ranged = self.headers.get('Range')
+        sent_path, encoding = (path, None) if ranged else self.negotiate(path)
+        stat = sent_path.stat()
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{"-" + encoding if encoding else ""}"'
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+            content_type += '; charset=utf-8'
+
+        start, end = 0, stat.st_size - 1
+        status = 200
+        if ranged and self.headers.get('If-Range', etag) == etag:
+            match = re.fullmatch(r'bytes=(\d*)-(\d*)', ranged.strip())
+            if match and (match.group(1) or match.group(2)):
+                if match.group(1):
+                    start = int(match.group(1))
+                    end = min(int(match.group(2)), end) if match.group(2) else end
+                else:
+                    start = max(stat.st_size - int(match.group(2)), 0)
+                if start > end:
+                    self.send_response(416)
+                    self.send_header('Content-Range', f'bytes */{stat.st_size}')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                status = 206
+        elif etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+            status = 304
+
+        self.send_response(status)
+        self.send_header('ETag', etag)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Cache-Control', SERVE_CACHE_CONTROL.get(path.suffix.lower(), 'no-cache'))
+        self.send_header('Last-Modified', self.date_time_string(stat.st_mtime))
+        if status == 304:
+            self.end_headers()
+            return
+        self.send_header('Content-Type', content_type)
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{stat.st_size}')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        if head:
+            return
+        with open(sent_path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(SERVE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+
+class SiteServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = SERVE_BACKLOG  # The default of 5 refuses connections in a spike
+
+
+def serve_site(site_dir, host=SERVE_HOST, port=SERVE_PORT, quiet=False):
+    """Serve site_dir until interrupted"""
+    handler = type('SiteHandler', (StaticSiteHandler,), {'site_dir': Path(site_dir).resolve(),
+                                                         'quiet': quiet})
+    with SiteServer((host, port), handler) as server:
+        print(f"Serving {site_dir} at http://{host}:{server.server_address[1]}/ (Ctrl+C to stop)",
+              flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+class VisitPlanParser(HTMLParser):
+    """What a browser requests for a page: eager subresources, lazy images and work items"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.assets = []
+        self.lazy = []
+        self.media = []
+        self.work_items = []
+        self.project_pages = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or '' for name, value in attrs}
+        if tag == 'body' and 'data-project-pages' in attrs:
+            self.project_pages = True
+        if 'data-project' in attrs and tag != 'body':
+            self.work_items.append(attrs['data-project'])
+        if tag == 'link' and set(attrs.get('rel', '').split()) & {'stylesheet', 'preload', 'icon'}:
+            self.assets.append(attrs.get('href', ''))
+        elif tag == 'script' and attrs.get('src'):
+            self.assets.append(attrs['src'])
+        elif tag == 'img' and (attrs.get('src') or attrs.get('srcset')):
+            # Phones scanning a QR code are high-density screens: take the largest candidate
+            candidates = [item.split() for item in attrs.get('srcset', '').split(',') if item.strip()]
+            src = (max(candidates, key=lambda item: int(item[1].rstrip('w')) if len(item) > 1
+                       and item[1][:-1].isdigit() else 0)[0]
+                   if candidates else attrs['src'])
+            (self.lazy if attrs.get('loading') == 'lazy' else self.assets).append(src)
+        elif tag in ('video', 'source') and attrs.get('src'):
+            self.media.append(attrs['src'])
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0
+    return values[min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))]
+
+
+class LoadTestConnection:
+    """One keep-alive HTTP/1.1 connection of a simulated browser"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, path, headers, keep_body=False):
+        """GET path; returns (status, headers, body size, seconds to first byte, body or None)"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f"GET {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        started = time.perf_counter()
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        first_byte = time.perf_counter() - started
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        size = 0
+        body = [] if keep_body else None
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                length = int((await self.reader.readline()).split(b';')[0], 16)
+                chunk = await self.reader.readexactly(length + 2)
+                size += length
+                if keep_body:
+                    body.append(chunk[:-2])
+                if not length:
+                    break
+        elif status not in (204, 304):
+            remaining = int(response_headers.get('content-length', 0))
+            while remaining:
+                chunk = await self.reader.read(min(SERVE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise ConnectionError("connection closed mid-response")
+                size += len(chunk)
+                remaining -= len(chunk)
+                if keep_body:
+                    body.append(chunk)
+        if response_headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, response_headers, size, first_byte, b''.join(body) if keep_body else None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = self.reader = None
+
+
+class LoadTest:
+    """Replays QR-code visits against a served site: grid -> project page -> gallery
+
+    Each simulated visitor opens up to LOAD_TEST_CONNECTIONS keep-alive
+    connections like a browser, loads index.html with its styles, scripts
+    and eager grid tiles, scrolls through a few lazy ones, then opens a
+    random project page with its hero, data and the first gallery images.
+    Resources fetched earlier in the visit are revalidated (no-cache) or
+    reused (max-age) as a browser would; returning visitors start with
+    that cache already filled.
+    """
+
+    def __init__(self, base_url, concurrency=LOAD_TEST_CONCURRENCY, visits=LOAD_TEST_VISITS,
+                 duration=None, gallery=LOAD_TEST_GALLERY_IMAGES, returning=0.0, think=0.0,
+                 encoding=LOAD_TEST_ACCEPT_ENCODING, seed=None):
+        parts = re.match(r'http://([^/:]+)(?::(\d+))?(/.*)?$', base_url.rstrip('/') + '/')
+        if not parts:
+            raise ValueError(f"Only http:// URLs can be load tested: {base_url}")
+        self.host = parts.group(1)
+        self.port = int(parts.group(2) or 80)
+        self.base_path = parts.group(3) or '/'
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.visits = visits
+        self.duration = duration
+        self.gallery = gallery
+        self.returning = returning
+        self.think = think
+        self.encoding = encoding
+        self.random = random.Random(seed)
+        self.plans = {}
+        self.project_plans = []
+        self.shared_cache = {}
+        self.requests = []
+        self.visit_results = []
+        self.errors = {}
+
+    def url_path(self, page, ref):
+        """Request path for a reference on a page, or None for external ones"""
+        if not is_local_reference(ref):
+            return None
+        ref = ref.split('#', 1)[0]
+        page_dir = posixpath.dirname(page)
+        return self.base_path + posixpath.normpath(posixpath.join(page_dir, ref)).lstrip('/')
+
+    async def discover(self):
+        """Fetch index.html and every project page once to learn what visits request"""
+        connection = LoadTestConnection(self.host, self.port)
+        try:
+            index = await self.plan_page(connection, 'index.html')
+            project_pages = [f"project-{project_id}.html" if index['project_pages']
+                             else f"project.html?id={project_id}" for project_id in index['work_items']]
+            for page in dict.fromkeys(project_pages):
+                await self.plan_page(connection, page)
+        finally:
+            connection.close()
+        self.project_plans = [self.plans[page] for page in dict.fromkeys(project_pages)
+                              if self.plans[page]['status'] == 200]
+        if self.plans['index.html']['status'] != 200:
+            raise RuntimeError(f"index.html answered {self.plans['index.html']['status']}")
+        return len(self.project_plans)
+
+    async def plan_page(self, connection, page):
+        path = self.base_path + page
+        status, _, _, _, body = await connection.request(path, {'Accept-Encoding': 'identity'},
+                                                         keep_body=True)
+        parser = VisitPlanParser()
+        parser.feed(body.decode('utf-8', errors='replace'))
+        parser.close()
+        page_name = page.split('?', 1)[0]
+        resolve = lambda refs: [path for path in dict.fromkeys(self.url_path(page_name, ref) for ref in refs)
+                                if path]
+        self.plans[page] = {
+            'path': path,
+            'status': status,
+            'assets': resolve(parser.assets),
+            'lazy': resolve(parser.lazy),
+            'media': resolve(parser.media),
+            'work_items': parser.work_items,
+            'project_pages': parser.project_pages
+        }
+        return self.plans[page]
+
+    async def fetch(self, pool, cache, path, visit, media=False):
+        """Request one resource through the visitor's connection pool and cache"""
+        cached = cache.get(path)
+        if cached and 'max-age' in cached['cache_control']:
+            return
+        headers = {'Accept-Encoding': self.encoding, 'User-Agent': 'rachael-load-test'}
+        if cached and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if media:
+            headers['Range'] = f"bytes=0-{LOAD_TEST_MEDIA_BYTES - 1}"
+            headers['Accept-Encoding'] = 'identity'
+
+        connection = await pool.get()
+        started = time.perf_counter()
+        try:
+            status, response, size, first_byte, _ = await asyncio.wait_for(
+                connection.request(path, headers), LOAD_TEST_TIMEOUT)
+        except (OSError, ValueError, IndexError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            connection.close()
+            kind = type(e).__name__
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+            return
+        finally:
+            pool.put_nowait(connection)
+        seconds = time.perf_counter() - started
+        if status in (200, 206):
+            cache[path] = {'etag': response.get('etag'),
+                           'cache_control': response.get('cache-control', '')}
+            self.shared_cache.setdefault(path, cache[path])
+        self.requests.append((seconds, first_byte, size, status, response.get('content-encoding', 'identity')))
+        visit['bytes'] += size
+        visit['requests'] += 1
+
+    async def load_page(self, pool, cache, plan, lazy_count, visit):
+        """The page, then its eager subresources in parallel, then what scrolling reveals"""
+        await self.fetch(pool, cache, plan['path'], visit)
+        await asyncio.gather(*(self.fetch(pool, cache, path, visit) for path in plan['assets']))
+        await asyncio.gather(*(self.fetch(pool, cache, path, visit) for path in plan['lazy'][:lazy_count]),
+                             *(self.fetch(pool, cache, path, visit, media=True)
+                               for path in plan['media'][:1]))
+
+    async def visit(self):
+        returning = self.random.random() < self.returning
+        cache = dict(self.shared_cache) if returning else {}
+        pool = asyncio.Queue()
+        connections = [LoadTestConnection(self.host, self.port) for _ in range(LOAD_TEST_CONNECTIONS)]
+        for connection in connections:
+            pool.put_nowait(connection)
+        visit = {'bytes': 0, 'requests': 0, 'returning': returning}
+        started = time.perf_counter()
+        try:
+            await self.load_page(pool, cache, self.plans['index.html'], self.gallery, visit)
+            if self.think:
+                await asyncio.sleep(self.random.uniform(0, 2 * self.think))
+            if self.project_plans:
+                await self.load_page(pool, cache, self.random.choice(self.project_plans),
+                                     self.gallery, visit)
+        finally:
+            for connection in connections:
+                connection.close()
+        visit['seconds'] = time.perf_counter() - started
+        self.visit_results.append(visit)
+
+    async def run_async(self):
+        await self.discover()
+        started = time.perf_counter()
+        deadline = started + self.duration if self.duration else None
+        remaining = [self.visits]
+
+        async def visitor():
+            while (remaining[0] > 0 if deadline is None else time.perf_counter() < deadline):
+                remaining[0] -= 1
+                await self.visit()
+
+        await asyncio.gather(*(visitor() for _ in range(self.concurrency)))
+        return self.report(time.perf_counter() - started)
+
+    def run(self):
+        return asyncio.run(self.run_async())
+
+    def report(self, seconds):
+        latencies = sorted(item[0] * 1000 for item in self.requests)
+        first_bytes = sorted(item[1] * 1000 for item in self.requests)
+        visit_times = sorted(visit['seconds'] * 1000 for visit in self.visit_results)
+        total_bytes = sum(item[2] for item in self.requests)
+        statuses = {}
+        encodings = {}
+        for _, _, _, status, encoding in self.requests:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            encodings[encoding] = encodings.get(encoding, 0) + 1
+
+        def spread(values):
+            return {name: round(percentile(values, fraction), 2)
+                    for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p95', 0.95), ('p99', 0.99),
+                                           ('max', 1.0))}
+
+        visits = len(self.visit_results)
+        return {
+            'target': self.base_url,
+            'settings': {'concurrency': self.concurrency, 'visits': self.visits,
+                         'duration': self.duration, 'gallery': self.gallery,
+                         'returning': self.returning, 'think': self.think,
+                         'accept_encoding': self.encoding},
+            'seconds': round(seconds, 3),
+            'visits': visits,
+            'requests': len(self.requests),
+            'errors': self.errors,
+            'statuses': statuses,
+            'encodings': encodings,
+            'throughput': {
+                'requests_per_second': round(len(self.requests) / seconds, 1) if seconds else 0,
+                'visits_per_second': round(visits / seconds, 2) if seconds else 0,
+                'bytes_per_second': round(total_bytes / seconds) if seconds else 0
+            },
+            'latency_ms': spread(latencies),
+            'first_byte_ms': spread(first_bytes),
+            'visit_ms': spread(visit_times),
+            'bytes_per_visit': round(total_bytes / visits) if visits else 0,
+            'requests_per_visit': round(len(self.requests) / visits, 1) if visits else 0
+        }
+
+
+def log_load_test_report(report, previous=None, log=print):
+    """Print a load test report, with the change from the previous run of the same settings"""
+    def change(value, keys, label=''):
+        old = previous
+        for key in keys:
+            old = (old or {}).get(key)
+        if not old or previous.get('settings') != report['settings']:
+            return ''
+        return f" ({(value - old) / old:+.0%}{label} since the last run)"
+
+    throughput = report['throughput']
+    log(f"{report['visits']} visits, {report['requests']} requests in {report['seconds']:.1f}s "
+        f"against {report['target']}")
+    log(f"Throughput: {throughput['requests_per_second']} requests/s"
+        f"{change(throughput['requests_per_second'], ['throughput', 'requests_per_second'])}, "
+        f"{throughput['visits_per_second']} visits/s, {format_bytes(throughput['bytes_per_second'])}/s")
+    for title, key in (('Request latency', 'latency_ms'), ('Time to first byte', 'first_byte_ms'),
+                       ('Whole visit', 'visit_ms')):
+        values = report[key]
+        log(f"{title + ':':20} " + ', '.join(f"{name} {value:.1f} ms" for name, value in values.items())
+            + change(values['p99'], [key, 'p99'], ' at p99'))
+    log(f"Per visit: {report['requests_per_visit']} requests, {format_bytes(report['bytes_per_visit'])}"
+        f"{change(report['bytes_per_visit'], ['bytes_per_visit'])}")
+    log("Responses: " + ', '.join(f"{status} x{count}" for status, count in sorted(report['statuses'].items()))
+        + "; encodings: " + ', '.join(f"{name} x{count}" for name, count in sorted(report['encodings'].items())))
+    if report['errors']:
+        log("Errors: " + ', '.join(f"{name} x{count}" for name, count in sorted(report['errors'].items())))
+
+
+def free_port(host=SERVE_HOST):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def run_load_test(project_dir, url=None, site_dir=None, **options):
+    """Load test url, or a server started on the built site in its own process
+
+    The server runs in a separate process so the load generator does not
+    compete with it for the interpreter. The report is saved to
+    .build_cache/load_test_report.json and compared with the previous one.
+    """
+    project_dir = Path(project_dir)
+    server = None
+    if url is None:
+        site_dir = Path(site_dir) if site_dir else project_dir / BUILD_OUTPUT_DIR
+        if not (site_dir / 'index.html').exists():
+            raise FileNotFoundError(f"No built site in {site_dir}; run a build first")
+        port = free_port()
+        server = subprocess.Popen([sys.executable, str(Path(__file__).resolve()), 'serve', '--quiet',
+                                   '--dir', str(site_dir), '--port', str(port)],
+                                  stdout=subprocess.DEVNULL)
+        url = f"http://{SERVE_HOST}:{port}/"
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection((SERVE_HOST, port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    server.terminate()
+                    raise RuntimeError("The local server did not start")
+                time.sleep(0.05)
+    try:
+        report = LoadTest(url, **options).run()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report_file = project_dir / BUILD_STATE_DIR / "load_test_report.json"
+    previous = None
+    if report_file.exists():
+        try:
+            with open(report_file, 'r') as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            pass
+    report_file.parent.mkdir(exist_ok=True)
+    write_if_changed(report_file, json.dumps(report, indent=2, sort_keys=True))
+    return report, previous
+
+
+def main(argv=None):
+    """Command line entry point; starts the GUI when no command is given"""
+    parser = argparse.ArgumentParser(description="Rachael Juzeler Portfolio Content Manager")
+    site_options = argparse.ArgumentParser(add_help=False)
+    site_options.add_argument('--project-dir', type=Path, default=Path(__file__).parent,
+                              help="site root to manage (default: this script's folder)")
+
+    subparsers = parser.add_subparsers(dest='command')
+    gui_parser = subparsers.add_parser('gui', parents=[site_options],
+                                       help="open the content manager window (default)")
+    gui_parser.add_argument('--workspace', type=Path, metavar='FILE',
+                            help="open a workspace of several sites instead of one site")
+    build_parser = subparsers.add_parser('build', parents=[site_options],
+                                         help=f"build the site into {BUILD_OUTPUT_DIR}/")
+    build_parser.add_argument('--watch', action='store_true',
+                              help="keep running and rebuild whenever a source file changes")
+    build_parser.add_argument('--interval', type=float, default=WATCH_INTERVAL_SECONDS,
+                              help="seconds between checks for changes (default: %(default)s)")
+    build_parser.add_argument('--no-minify', dest='minify', action='store_false',
+                              help="publish HTML, CSS and JS unminified (easier to debug)")
+    catalog_parser = subparsers.add_parser('catalog', parents=[site_options],
+                                           help="scan images and list their metadata")
+    catalog_parser.add_argument('--sort', choices=['date', 'name', 'size'], default='date')
+    catalog_parser.add_argument('--reverse', action='store_true', help="newest/largest first")
+    catalog_parser.add_argument('--colour', choices=COLOUR_FAMILIES + ['neutral'])
+    catalog_parser.add_argument('--orientation', choices=['landscape', 'portrait', 'square'])
+    catalog_parser.add_argument('--project', help="only images in this project folder")
+    duplicates_parser = subparsers.add_parser('duplicates', parents=[site_options],
+                                              help="list groups of near-duplicate images")
+    duplicates_parser.add_argument('--distance', type=int, default=NEAR_DUPLICATE_DISTANCE,
+                                   help="maximum differing hash bits (default: %(default)s)")
+    check_parser = subparsers.add_parser('check', parents=[site_options],
+                                         help="check links and assets of the built site")
+    check_parser.add_argument('--dir', type=Path,
+                              help=f"tree to check (default: {BUILD_OUTPUT_DIR}/ in the project dir)")
+    check_parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    subparsers.add_parser('loading', parents=[site_options],
+                          help="image bytes loaded with each project's hero, eager vs lazy gallery")
+    subparsers.add_parser('scripts', parents=[site_options],
+                          help="JavaScript each page loads and what minifying saved")
+    tiles_parser = subparsers.add_parser('tiles', parents=[site_options],
+                                         help="grid tile crops and sizes, or set a project's focal point")
+    tiles_action = tiles_parser.add_mutually_exclusive_group()
+    tiles_action.add_argument('--focus', nargs=3, metavar=('PROJECT_ID', 'X', 'Y'),
+                              help="centre the tile on X%% across, Y%% down, e.g. --focus project1 30 60")
+    tiles_action.add_argument('--auto', metavar='PROJECT_ID',
+                              help="go back to the automatic (most detailed) crop")
+    available_parser = subparsers.add_parser('available', parents=[site_options],
+                                             help="list available works or change their status")
+    available_parser.add_argument('--status', choices=list(AVAILABLE_STATUSES),
+                                  help="only works with this status")
+    available_parser.add_argument('--min-price', type=float)
+    available_parser.add_argument('--max-price', type=float)
+    available_parser.add_argument('--set-status', nargs=2, metavar=('WORK_ID', 'STATUS'),
+                                  help="e.g. --set-status blue-vessel sold")
+    cv_parser = subparsers.add_parser('cv', parents=[site_options],
+                                      help="list CV entries or export the printable CV")
+    cv_parser.add_argument('--year', type=int, help="entries covering this year")
+    cv_parser.add_argument('--export', type=Path, metavar='PATH',
+                           help="write the print-ready CV (HTML) to PATH")
+    subparsers.add_parser('updates', parents=[site_options], help="list updates, newest first")
+    gc_parser = subparsers.add_parser('gc', parents=[site_options],
+                                      help="quarantine images and data files nothing uses")
+    gc_action = gc_parser.add_mutually_exclusive_group()
+    gc_action.add_argument('--dry-run', action='store_true',
+                           help="only report what would be moved and how much space it frees")
+    gc_action.add_argument('--list', action='store_true', help="list quarantined sweeps")
+    gc_action.add_argument('--undo', nargs='?', const='latest', metavar='SWEEP_ID',
+                           help="restore a sweep (default: the latest)")
+    gc_action.add_argument('--purge', nargs='?', const='all', metavar='SWEEP_ID',
+                           help="permanently delete a quarantined sweep (default: all)")
+    gc_parser.add_argument('--grace', type=int, default=GC_GRACE_SECONDS,
+                           help="skip files changed within this many seconds (default: %(default)s)")
+    cache_parser = subparsers.add_parser('cache', parents=[site_options],
+                                         help="build cache hit rates and size")
+    cache_action = cache_parser.add_mutually_exclusive_group()
+    cache_action.add_argument('--clear', action='store_true', help="delete every cached output")
+    cache_action.add_argument('--limit', type=float, metavar='MB',
+                              help="set the cache size limit (default: "
+                                   f"{BUILD_CACHE_MAX_BYTES // (1024 * 1024)} MB)")
+    history_parser = subparsers.add_parser('history', parents=[site_options],
+                                           help="list, compare or restore saved versions of the content")
+    history_action = history_parser.add_mutually_exclusive_group()
+    history_action.add_argument('--snapshot', metavar='MESSAGE',
+                                help="record the current content as a new version")
+    history_action.add_argument('--diff', nargs='+', type=int, metavar='VERSION',
+                                help="changes made by a version, or between two versions")
+    history_action.add_argument('--restore', type=int, metavar='VERSION',
+                                help="put admin_data/ and images/ back as they were in a version")
+    jobs_parser = subparsers.add_parser('jobs', parents=[site_options],
+                                        help="list, run or cancel queued background jobs")
+    jobs_parser.add_argument('--run', action='store_true',
+                             help="run queued jobs (including ones left by the GUI) until idle")
+    jobs_parser.add_argument('--submit', choices=sorted(JOB_HANDLERS),
+                             help="queue a job that takes no parameters, e.g. build")
+    jobs_parser.add_argument('--cancel', metavar='JOB_ID', help="cancel a queued job")
+    jobs_parser.add_argument('--clear', action='store_true', help="forget finished jobs")
+    workspace_parser = subparsers.add_parser('workspace',
+                                             help="manage and build several sites from one process")
+    workspace_parser.add_argument('--file', type=Path, default=Path.cwd() / WORKSPACE_FILE,
+                                  help=f"workspace file (default: ./{WORKSPACE_FILE})")
+    workspace_action = workspace_parser.add_mutually_exclusive_group()
+    workspace_action.add_argument('--add', type=Path, metavar='DIR', help="add a site root")
+    workspace_action.add_argument('--remove', metavar='NAME', help="remove a site from the list")
+    workspace_action.add_argument('--build', nargs='*', metavar='NAME',
+                                  help="build the named sites (default: all) on one worker pool "
+                                       "with a shared build cache")
+    workspace_parser.add_argument('--name', help="name for --add (default: the folder name)")
+    workspace_parser.add_argument('--workers', type=int,
+                                  help=f"builds to run at once (default: {JOB_WORKERS})")
+    serve_parser = subparsers.add_parser('serve', parents=[site_options],
+                                         help="serve the built site locally like a static host")
+    serve_parser.add_argument('--dir', type=Path,
+                              help=f"tree to serve (default: {BUILD_OUTPUT_DIR}/ in the project dir)")
+    serve_parser.add_argument('--host', default=SERVE_HOST)
+    serve_parser.add_argument('--port', type=int, default=SERVE_PORT)
+    serve_parser.add_argument('--quiet', action='store_true', help="do not log every request")
+    loadtest_parser = subparsers.add_parser('loadtest', parents=[site_options],
+                                            help="replay QR-code visits against the site and time them")
+    loadtest_parser.add_argument('--url', help="site to test (default: serve the build locally)")
+    loadtest_parser.add_argument('--dir', type=Path,
+                                 help=f"tree to serve (default: {BUILD_OUTPUT_DIR}/ in the project dir)")
+    loadtest_parser.add_argument('--concurrency', type=int, default=LOAD_TEST_CONCURRENCY,
+                                 help="visitors at once (default: %(default)s)")
+    loadtest_parser.add_argument('--visits', type=int, default=LOAD_TEST_VISITS,
+                                 help="visits in total (default: %(default)s)")
+    loadtest_parser.add_argument('--duration', type=float,
+                                 help="run for this many seconds instead of a number of visits")
+    loadtest_parser.add_argument('--gallery', type=int, default=LOAD_TEST_GALLERY_IMAGES,
+                                 help="lazy images each visitor scrolls to per page (default: %(default)s)")
+    loadtest_parser.add_argument('--returning', type=float, default=0.0,
+                                 help="share of visitors with a warm browser cache, 0-1 (default: %(default)s)")
+    loadtest_parser.add_argument('--think', type=float, default=0.0,
+                                 help="average seconds on the grid before opening a project")
+    loadtest_parser.add_argument('--encoding', default=LOAD_TEST_ACCEPT_ENCODING,
+                                 help="Accept-Encoding to send (default: %(default)r)")
+    loadtest_parser.add_argument('--seed', type=int, help="random seed, for repeatable visit mixes")
+    loadtest_parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        if args.watch:
+            return watch_and_build(args.project_dir, args.interval, args.minify)
+        report = SiteBuilder(args.project_dir, minify=args.minify).build()
+        print(f"Build {report['build_hash']} finished in {report['seconds']:.2f}s")
+        return 0
+
+    if args.command == 'catalog':
+        catalog = ImageCatalog(args.project_dir)
+        catalog.refresh()
+        for entry in catalog.query(colour=args.colour, orientation=args.orientation,
+                                   project=args.project, sort=args.sort, reverse=args.reverse):
+            dimensions = f"{entry['width']}x{entry['height']}" if entry.get('width') else '-'
+            print(f"{entry['path']:45} {dimensions:>11}  "
+                  f"{(entry.get('captured') or entry['modified'])[:10]}  "
+                  f"{entry.get('dominant_colour') or '-':10} {entry.get('camera') or ''}")
+        return 0
+
+    if args.command == 'duplicates':
+        catalog = ImageCatalog(args.project_dir)
+        catalog.refresh()
+        if Image is None:
+            print("Perceptual hashes need the optional 'Pillow' package")
+            return 1
+        for group in SimilarityIndex(catalog).near_duplicate_groups(args.distance):
+            print("  ".join(group))
+        return 0
+
+    if args.command == 'check':
+        site_dir = args.dir or args.project_dir / BUILD_OUTPUT_DIR
+        if not site_dir.exists():
+            print(f"{site_dir} does not exist; run the build first or pass --dir")
+            return 1
+        checker = SiteChecker(site_dir, args.project_dir)
+        report = checker.check()
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            checker.log_report(report)
+        return 1 if report['missing'] or report['problems'] else 0
+
+    if args.command == 'available':
+        store = AvailableWorksStore(args.project_dir)
+        if args.set_status:
+            try:
+                store.update(args.set_status[0], status=args.set_status[1])
+            except ValueError as e:
+                print(e)
+                return 1
+        if args.min_price is not None or args.max_price is not None:
+            works = store.in_price_range(args.min_price, args.max_price)
+        else:
+            works = store.listing()
+        for work in works:
+            if args.status and work['status'] != args.status:
+                continue
+            print(f"{work['id']:30} {AVAILABLE_STATUSES[work['status']]:10} "
+                  f"{format_price(work['price']):>18}  {work['title']}")
+        return 0
+
+    if args.command == 'cv':
+        cv = CVStore(args.project_dir)
+        if args.export:
+            fragments = [render_cv_section(section) for section in cv.sections]
+            template = (args.project_dir / 'about.html').read_text(encoding='utf-8')
+            write_if_changed(args.export, render_cv_print(template, fragments))
+            print(f"Wrote {args.export}")
+        elif args.year:
+            titles = {section['id']: section['title'] for section in cv.sections}
+            for section_id, entry in cv.by_year.get(args.year, []):
+                print(f"{titles[section_id]:45.45} {entry['years']:15} {entry['text']}")
+        else:
+            for section in cv.sections:
+                print(section['title'])
+                for entry in section['entries']:
+                    print(f"    {cv_entry_line(entry)}")
+        return 0
+
+    if args.command == 'loading':
+        report_file = args.project_dir / BUILD_STATE_DIR / "image_loading_report.json"
+        if not report_file.exists():
+            print("No image loading report yet; run a build first", file=sys.stderr)
+            return 1
+        with open(report_file, 'r') as f:
+            report = json.load(f)
+        rows = sorted(report['projects'].items()) + [('total', report['totals'])]
+        print(f"{'project':12} {'hero':>10} {'before':>10} {'after':>10} {'images':>9}  hero share")
+        for name, row in rows:
+            before, after = row['before'], row['after']
+            share = (f"{before['hero_share']:.0%} -> {after['hero_share']:.0%}"
+                     if before['hero_share'] is not None else '-')
+            hero = format_bytes(row['hero_bytes']) if 'hero_bytes' in row else ''
+            print(f"{name:12} {hero:>10} {format_bytes(before['eager_bytes']):>10} "
+                  f"{format_bytes(after['eager_bytes']):>10} "
+                  f"{before['eager_images']:>4} -> {after['eager_images']:<2} {share}")
+        return 0
+
+    if args.command == 'scripts':
+        report_file = args.project_dir / BUILD_STATE_DIR / "script_report.json"
+        if not report_file.exists():
+            print("No script report yet; run a build first", file=sys.stderr)
+            return 1
+        with open(report_file, 'r') as f:
+            report = json.load(f)
+        print(f"{'page':32} {'before':>10} {'after':>10} {'gzip':>20} {'parse':>9}  scripts")
+        for name, row in sorted(report['pages'].items(), key=lambda item: natural_key(item[0])):
+            print(f"{name:32} {format_bytes(row['before_bytes']):>10} {format_bytes(row['after_bytes']):>10} "
+                  f"{format_bytes(row['before_gzip']) + ' -> ' + format_bytes(row['after_gzip']):>20} "
+                  f"{'-' + format(row['parse_ms_saved'], '.0f') + ' ms':>9}  {' '.join(row['scripts'])}")
+        for kind, totals in sorted(report['minified'].items()):
+            print(f"{kind.upper()}: {totals['files']} files, {format_bytes(totals['raw'])} -> "
+                  f"{format_bytes(totals['minified'])}")
+        return 0
+
+    if args.command == 'tiles':
+        if args.focus or args.auto:
+            project_id = args.focus[0] if args.focus else args.auto
+            if project_id not in load_project_records(args.project_dir):
+                print(f"No project {project_id!r}", file=sys.stderr)
+                return 1
+            try:
+                focal_point = parse_focal_point(' '.join(args.focus[1:])) if args.focus else None
+            except ValueError as e:
+                print(e, file=sys.stderr)
+                return 1
+            # Projects only defined in script.js get their whole record copied into projects.json
+            update_project_record(args.project_dir, project_id,
+                                  **dict(load_project_records(args.project_dir)[project_id],
+                                         focal_point=focal_point))
+            print(f"{project_id}: {'focal point ' + format_focal_point(focal_point) if focal_point else 'automatic crop'}"
+                  " (used from the next build)")
+            return 0
+        report_file = args.project_dir / BUILD_STATE_DIR / "grid_tile_report.json"
+        if not report_file.exists():
+            print("No grid tile report yet; run a build first", file=sys.stderr)
+            return 1
+        with open(report_file, 'r') as f:
+            report = json.load(f)
+        print(f"{'project':12} {'original':>10} {'tiles':>22}  crop")
+        for name, row in sorted(report['projects'].items()):
+            tiles = ', '.join(f"{width}: {format_bytes(size)}" for width, size in row['tile_bytes'].items())
+            crop = (f"focal point {format_focal_point(row['focal_point'])}" if row['focal_point']
+                    else 'automatic')
+            print(f"{name:12} {format_bytes(row['source_bytes']):>10} {tiles:>22}  {row['crop']} {crop}")
+        totals = report['totals']
+        print(f"{'total':12} {format_bytes(totals['source_bytes']):>10} "
+              f"{format_bytes(totals['smallest_tile_bytes']):>10} -> {format_bytes(totals['largest_tile_bytes'])}")
+        if report.get('low_resolution'):
+            print(f"\nNo {GRID_TILE_SIZES[-1]}px tile (main image too small for high-density screens): "
+                  f"{', '.join(report['low_resolution'])}")
+        return 0
+
+    if args.command == 'updates':
+        for record in UpdatesStore(args.project_dir).newest_first():
+            print(f"{record['date'] or 'undated':10}  {record['id']:30} {record['title']}")
+        return 0
+
+    if args.command == 'gc':
+        collector = GarbageCollector(args.project_dir)
+        try:
+            if args.list:
+                for sweep in collector.list_sweeps():
+                    print(f"{sweep['id']}  {sweep['created']}  {len(sweep['files']):4} files  "
+                          f"{format_bytes(sweep['bytes'])}")
+            elif args.undo:
+                result = collector.undo(None if args.undo == 'latest' else args.undo)
+                return 1 if result['conflicts'] else 0
+            elif args.purge:
+                collector.purge(None if args.purge == 'all' else args.purge)
+            elif args.dry_run:
+                collector.log_report(collector.collect(grace=args.grace))
+            else:
+                report = collector.sweep(grace=args.grace)
+                if not report['candidates']:
+                    collector.log_report(report)
+        except ValueError as e:
+            print(e)
+            return 1
+        return 0
+
+    if args.command == 'cache':
+        cache = BuildCache(args.project_dir)
+        if args.clear:
+            print(f"Freed {format_bytes(cache.clear())}")
+        elif args.limit is not None:
+            evicted = cache.set_limit(int(args.limit * 1024 * 1024))
+            print(f"Build cache limit set to {format_bytes(cache.max_bytes)}, "
+                  f"{evicted} entries evicted")
+        else:
+            for stage, counts in sorted(cache.totals.items()):
+                lookups = counts['hits'] + counts['misses']
+                print(f"{stage:12} {counts['hits']:6} hits {counts['misses']:6} misses "
+                      f"{counts['hits'] / lookups if lookups else 0:6.0%}  "
+                      f"{format_bytes(counts['bytes_saved']):>10} reused")
+            print(cache.summary(cache.totals))
+        return 0
+
+    if args.command == 'history':
+        history = ContentHistory(args.project_dir)
+        try:
+            if args.snapshot:
+                if history.snapshot(args.snapshot) is None:
+                    print("Nothing changed since the last version")
+            elif args.diff:
+                if len(args.diff) > 2:
+                    print("--diff takes one or two versions")
+                    return 1
+                other = args.diff[1] if len(args.diff) == 2 else None
+                print("\n".join(history.describe(history.diff(args.diff[0], other))))
+            elif args.restore:
+                result = history.restore(args.restore)
+                return 1 if result['damaged'] else 0
+            else:
+                for version in history.versions():
+                    print(f"{version['id']:5}  {version['created'].replace('T', ' ')}  "
+                          f"+{version['added']} ~{version['modified']} -{version['removed']}  "
+                          f"{version['message']}")
+        except ValueError as e:
+            print(e)
+            return 1
+        return 0
+
+    if args.command == 'serve':
+        return serve_site(args.dir or args.project_dir / BUILD_OUTPUT_DIR, args.host, args.port, args.quiet)
+
+    if args.command == 'loadtest':
+        try:
+            report, previous = run_load_test(
+                args.project_dir, url=args.url, site_dir=args.dir, concurrency=args.concurrency,
+                visits=args.visits, duration=args.duration, gallery=args.gallery,
+                returning=args.returning, think=args.think, encoding=args.encoding, seed=args.seed)
+        except (OSError, ValueError, RuntimeError) as e:
+            print(e, file=sys.stderr)
+            return 1
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            log_load_test_report(report, previous)
+        return 1 if report['errors'] else 0
+
+    if args.command == 'jobs':
+        def print_event(event, job, detail):
+            if event == 'log':
+                print(f"[{job['id']}] {detail}")
+            elif event in ('started', 'finished'):
+                print(f"[{job['id']}] {job['description']}: {job['status']}"
+                      + (f" ({job['error']})" if job['error'] else ''))
+
+        job_queue = JobQueue(args.project_dir, on_event=print_event)
+        if args.cancel and not job_queue.cancel(args.cancel):
+            print(f"No queued or running job {args.cancel}")
+            return 1
+        if args.clear:
+            job_queue.clear_finished()
+        if args.submit:
+            job_queue.submit(args.submit)
+        if args.run:
+            job_queue.start()
+            job_queue.wait_idle()
+            job_queue.shutdown(wait=True)
+        for job in job_queue.snapshot():
+            print(f"{job['id']}  {job['status']:9} {job['progress'] * 100:3.0f}%  "
+                  f"{job['created']}  {job['description']}")
+        return 0
+
+    if args.command == 'workspace':
+        workspace = Workspace(args.file)
+        try:
+            if args.add:
+                name = workspace.add(args.add, args.name)
+                print(f"Added {name} ({workspace.sites[name]})")
+            elif args.remove:
+                workspace.remove(args.remove)
+                print(f"Removed {args.remove}")
+            elif args.build is not None:
+                def print_event(event, job, detail):
+                    if event == 'log':
+                        print(f"[{job['description']}] {detail}")
+
+                started = time.perf_counter()
+                jobs = workspace.build(args.build, args.workers, on_event=print_event)
+                for name, job in jobs.items():
+                    if job['status'] == 'done':
+                        print(f"{name}: build {job['result']['build_hash']} "
+                              f"in {job['result']['seconds']:.2f}s")
+                    else:
+                        print(f"{name}: {job['status']}" + (f" ({job['error']})" if job['error'] else ''))
+                cache = BuildCache(workspace.root, cache_dir=workspace.cache_dir)
+                print(f"Built {len(jobs)} {'site' if len(jobs) == 1 else 'sites'} in {time.perf_counter() - started:.2f}s; "
+                      f"shared cache: {cache.summary(cache.totals)}")
+                return 0 if all(job['status'] == 'done' for job in jobs.values()) else 1
+            else:
+                for name, site_dir in workspace.site_dirs().items():
+                    print(f"{name:20} {workspace.last_built(name) or 'never built':16}  {site_dir}")
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 1
+        return 0
 
-if __name__ == "__main__":
     root = tk.Tk()
-    app = RachaelContentManager(root)
-    root.mainloop()
\ No newline at end of file
+    if getattr(args, 'workspace', None):
+        app = WorkspaceWindow(root, Workspace(args.workspace))
+    else:
+        app = RachaelContentManager(root, getattr(args, 'project_dir', None))
+    root.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
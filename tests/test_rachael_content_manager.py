@@ -0,0 +1,1053 @@
+"""Tests for rachael_content_manager.py"""
+import hashlib
+import http.client
+import io
+import json
+import os
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import rachael_content_manager as rcm
+
+
+# minify_js
+
+def test_minify_js_keeps_newlines_asi_depends_on():
+    assert rcm.minify_js("let a = 1\nlet b = 2\n") == "let a=1\nlet b=2\n"
+    assert rcm.minify_js("a = b\n++c\n") == "a=b\n++c\n"
+
+
+def test_minify_js_keeps_newline_after_return():
+    assert rcm.minify_js("function f() {\n    return\n    42;\n}\n") == "function f(){return\n42;}\n"
+
+
+def test_minify_js_joins_lines_that_continue_the_statement():
+    # No ASI before '(' either: the original already calls a(b)
+    assert rcm.minify_js("const y = a\n(b)\n") == "const y=a(b)\n"
+
+
+def test_minify_js_tells_regex_from_division():
+    source = "const x = a / b / c;\nconst re = /ab+c\\/d/g.test(s);\nif (ok) x = /=+/.exec(s)\n"
+    assert rcm.minify_js(source) == "const x=a / b / c;const re=/ab+c\\/d/g.test(s);if(ok)x=/=+/.exec(s)\n"
+
+
+def test_minify_js_leaves_template_literals_alone():
+    source = "const t = `a  ${ b  +  1 }  c\n  d`;\n"
+    assert rcm.minify_js(source) == "const t=`a  ${ b  +  1 }  c\n  d`;\n"
+
+
+def test_minify_js_drops_comments_but_not_strings_that_look_like_them():
+    source = 'const s = "// not a comment"; // real comment\n/* block */ const u = 1;\n'
+    assert rcm.minify_js(source) == 'const s="// not a comment";const u=1;\n'
+
+
+def test_minify_js_keeps_unary_operators_apart():
+    assert rcm.minify_js("x = a - -b + +c\n") == "x=a - -b + +c\n"
+
+
+# merge_json
+
+BASE = {'a': {'title': 'x', 'year': 1}, 'b': {'title': 'y'}}
+
+
+def test_merge_json_keeps_a_deletion_the_other_side_did_not_touch():
+    merged, conflicts = rcm.merge_json(BASE, {'a': BASE['a']}, BASE)
+    assert merged == {'a': BASE['a']}
+    assert conflicts == []
+
+
+def test_merge_json_deletion_against_a_change_is_a_conflict_ours_wins():
+    theirs = {'a': BASE['a'], 'b': {'title': 'z'}}
+    merged, conflicts = rcm.merge_json(BASE, {'a': BASE['a']}, theirs)
+    assert merged == {'a': BASE['a']}
+    assert conflicts == ['b']
+
+
+def test_merge_json_merges_different_fields_of_one_record():
+    ours = {'a': {'title': 'x', 'year': 2}, 'b': BASE['b']}
+    theirs = {'a': {'title': 'x', 'year': 1, 'medium': 'oil'}, 'b': BASE['b']}
+    merged, conflicts = rcm.merge_json(BASE, ours, theirs)
+    assert merged == {'a': {'title': 'x', 'year': 2, 'medium': 'oil'}, 'b': BASE['b']}
+    assert conflicts == []
+
+
+def test_merge_json_same_field_changed_on_both_sides_reports_the_path():
+    ours = {'a': {'title': 'ours', 'year': 1}, 'b': BASE['b']}
+    theirs = {'a': {'title': 'theirs', 'year': 1}, 'b': BASE['b']}
+    merged, conflicts = rcm.merge_json(BASE, ours, theirs)
+    assert merged['a']['title'] == 'ours'
+    assert conflicts == ['a.title']
+
+
+def test_merge_json_merges_record_lists_by_id():
+    merged, conflicts = rcm.merge_json([{'id': 1, 'v': 1}],
+                                       [{'id': 1, 'v': 1}, {'id': 2}],
+                                       [{'id': 1, 'v': 5}])
+    assert merged == [{'id': 1, 'v': 5}, {'id': 2}]
+    assert conflicts == []
+
+
+# StaticSiteHandler
+
+@pytest.fixture
+def site_server(tmp_path):
+    (tmp_path / "video.mp4").write_bytes(bytes(range(256)) * 4)
+    handler = type('SiteHandler', (rcm.StaticSiteHandler,), {'site_dir': tmp_path.resolve(),
+                                                             'quiet': True})
+    server = rcm.SiteServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(port, path, headers=None):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    try:
+        connection.request('GET', path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def test_static_site_handler_answers_byte_ranges(site_server):
+    status, headers, body = fetch(site_server, '/video.mp4', {'Range': 'bytes=10-19'})
+    assert status == 206
+    assert headers['Content-Range'] == 'bytes 10-19/1024'
+    assert body == bytes(range(10, 20))
+
+
+def test_static_site_handler_rejects_unsatisfiable_ranges(site_server):
+    status, headers, _ = fetch(site_server, '/video.mp4', {'Range': 'bytes=5000-'})
+    assert status == 416
+    assert headers['Content-Range'] == 'bytes */1024'
+
+
+def test_static_site_handler_revalidates_with_etags(site_server):
+    status, headers, _ = fetch(site_server, '/video.mp4')
+    assert status == 200
+    status, _, body = fetch(site_server, '/video.mp4', {'If-None-Match': headers['ETag']})
+    assert status == 304
+    assert body == b''
+
+
+def test_static_site_handler_stays_inside_the_site(site_server):
+    status, _, _ = fetch(site_server, '/../../etc/passwd')
+    assert status == 404
+
+
+# BuildCache
+
+def test_build_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = rcm.BuildCache(tmp_path, log=lambda message: None)
+    for name in ('old', 'middle', 'new'):
+        cache.put('test', name, b'x' * 100)
+    for used, name in enumerate(('old', 'middle', 'new')):
+        cache.entries[cache.key('test', name)]['used'] = used
+    # Reading an entry makes it the most recently used
+    assert cache.get('test', 'old') == b'x' * 100
+
+    cache.max_bytes = 200
+    assert cache.evict() == 1
+    assert cache.get('test', 'middle') is None
+    assert cache.get('test', 'old') == b'x' * 100
+    assert cache.get('test', 'new') == b'x' * 100
+    assert not cache.object_path(cache.key('test', 'middle')).exists()
+
+
+def test_build_cache_limit_applies_to_every_editor(tmp_path):
+    cache = rcm.BuildCache(tmp_path, log=lambda message: None)
+    cache.put('test', 'a', b'a' * 100)
+    cache.put('test', 'b', b'b' * 100)
+    cache.save()
+
+    other = rcm.BuildCache(tmp_path, log=lambda message: None)
+    assert other.set_limit(150) == 1
+    assert rcm.BuildCache(tmp_path, log=lambda message: None).max_bytes == 150
+    assert other.size() <= 150
+
+
+def test_build_cache_keys_include_the_options(tmp_path):
+    cache = rcm.BuildCache(tmp_path, log=lambda message: None)
+    cache.put('gzip', 'digest', b'level 9', 9)
+    assert cache.get('gzip', 'digest', 9) == b'level 9'
+    assert cache.get('gzip', 'digest', 6) is None
+
+
+# parse_exif and image headers
+
+def exif_block(endian='<'):
+    """TIFF-structured EXIF: orientation and make in IFD0, capture date in the Exif IFD"""
+    make = b'Canon\0'
+    taken = b'2021:05:04 10:20:30\0'
+    ifd0, exif_ifd = 8, 8 + 2 + 3 * 12 + 4
+    make_at = exif_ifd + 2 + 12 + 4
+    taken_at = make_at + len(make)
+    order = b'II*\x00' if endian == '<' else b'MM\x00*'
+    data = order + struct.pack(endian + 'I', ifd0)
+    data += struct.pack(endian + 'H', 3)
+    data += struct.pack(endian + 'HHIHH', 0x0112, 3, 1, 6, 0)
+    data += struct.pack(endian + 'HHII', 0x010F, 2, len(make), make_at)
+    data += struct.pack(endian + 'HHII', 0x8769, 4, 1, exif_ifd)
+    data += struct.pack(endian + 'I', 0)
+    data += struct.pack(endian + 'H', 1)
+    data += struct.pack(endian + 'HHII', 0x9003, 2, len(taken), taken_at)
+    data += struct.pack(endian + 'I', 0)
+    return data + make + taken
+
+
+def png_chunk(chunk_type, data):
+    return struct.pack('>I', len(data)) + chunk_type + data + b'\0\0\0\0'
+
+
+@pytest.mark.parametrize('endian', ['<', '>'])
+def test_parse_exif_reads_both_byte_orders_and_the_exif_ifd(endian):
+    assert rcm.parse_exif(exif_block(endian)) == {
+        'orientation': 6,
+        'make': 'Canon',
+        'datetime_original': '2021:05:04 10:20:30'
+    }
+
+
+def test_parse_exif_ignores_foreign_data_and_keeps_what_a_truncated_block_has():
+    assert rcm.parse_exif(b'') == {}
+    assert rcm.parse_exif(b'not a tiff block') == {}
+    assert rcm.parse_exif(exif_block()[:30]) == {'orientation': 6}
+
+
+def test_read_image_header_jpeg_skips_to_the_frame_header():
+    app1 = b'Exif\0\0' + exif_block()
+    data = (b'\xff\xd8'
+            + b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\0' + bytes(9)
+            + b'\xff\xe1' + struct.pack('>H', len(app1) + 2) + app1
+            + b'\xff\xc2' + struct.pack('>HBHH', 17, 8, 480, 640) + bytes(12)
+            + b'\xff\xda' + bytes(64))
+    fmt, header = rcm.read_image_header(io.BytesIO(data))
+    assert fmt == 'jpeg'
+    assert (header['width'], header['height']) == (640, 480)
+    assert header['exif']['orientation'] == 6
+
+
+def test_read_image_header_png_reads_ihdr_exif_and_time():
+    data = (b'\x89PNG\r\n\x1a\n'
+            + png_chunk(b'IHDR', struct.pack('>IIBBBBB', 300, 200, 8, 2, 0, 0, 0))
+            + png_chunk(b'tIME', struct.pack('>HBBBBB', 2020, 1, 2, 3, 4, 5))
+            + png_chunk(b'eXIf', exif_block('>'))
+            + png_chunk(b'IDAT', bytes(10)))
+    fmt, header = rcm.read_image_header(io.BytesIO(data))
+    assert fmt == 'png'
+    assert (header['width'], header['height']) == (300, 200)
+    assert header['exif']['make'] == 'Canon'
+
+
+def test_read_image_header_png_time_chunk_is_the_capture_date():
+    data = (b'\x89PNG\r\n\x1a\n'
+            + png_chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 2, 0, 0, 0))
+            + png_chunk(b'tIME', struct.pack('>HBBBBB', 2020, 1, 2, 3, 4, 5)))
+    assert rcm.read_image_header(io.BytesIO(data))[1]['exif'] == {'datetime': '2020:01:02 03:04:05'}
+
+
+@pytest.mark.parametrize('chunk, payload, size', [
+    (b'VP8X', bytes(4) + (799).to_bytes(3, 'little') + (599).to_bytes(3, 'little'), (800, 600)),
+    (b'VP8 ', bytes(3) + b'\x9d\x01\x2a' + struct.pack('<HH', 320, 240), (320, 240)),
+    (b'VP8L', b'\x2f' + ((99) | (49 << 14)).to_bytes(4, 'little') + bytes(5), (100, 50)),
+])
+def test_read_image_header_webp_reads_every_chunk_kind(chunk, payload, size):
+    data = b'RIFF' + struct.pack('<I', 100) + b'WEBP' + chunk + struct.pack('<I', len(payload)) + payload
+    fmt, header = rcm.read_image_header(io.BytesIO(data))
+    assert fmt == 'webp'
+    assert (header['width'], header['height']) == size
+
+
+def test_read_image_header_sniffs_videos_and_rejects_the_rest():
+    assert rcm.read_image_header(io.BytesIO(bytes(4) + b'ftypisom'))[0] == 'video'
+    assert rcm.read_image_header(io.BytesIO(b'\x1a\x45\xdf\xa3' + bytes(8)))[0] == 'video'
+    assert rcm.read_image_header(io.BytesIO(b'plain text file'))[0] == 'unknown'
+
+
+# BKTree and diverse_order
+
+def test_bk_tree_search_matches_a_linear_scan():
+    values = [random.Random(seed).getrandbits(64) for seed in range(200)]
+    tree = rcm.BKTree()
+    for i, value in enumerate(values):
+        tree.add(value, f"image{i}")
+    assert tree.size == 200
+
+    target = values[7] ^ 0b1011  # Three bits away from image7
+    expected = sorted((rcm.hamming_distance(target, value), f"image{i}")
+                      for i, value in enumerate(values)
+                      if rcm.hamming_distance(target, value) <= 20)
+    results = tree.search(target, 20)
+    assert sorted(results) == expected
+    assert results[0] == (3, 'image7')
+
+
+def test_bk_tree_keeps_every_item_with_the_same_hash():
+    tree = rcm.BKTree()
+    tree.add(5, 'a')
+    tree.add(5, 'b')
+    assert tree.search(5, 0) == [(0, 'a'), (0, 'b')]
+    assert rcm.BKTree().search(5, 64) == []
+
+
+HASHES = {
+    'a.jpg': '0000000000000000',
+    'b.jpg': 'ffffffffffffffff',
+    'c.jpg': '00000000000000ff',
+    'd.jpg': '0000000000000001',  # One bit from a.jpg
+    'e.jpg': None
+}
+
+
+def test_diverse_order_puts_the_most_different_shots_first_and_near_duplicates_last():
+    ordered, duplicates = rcm.diverse_order(list(HASHES), HASHES)
+    assert ordered == ['a.jpg', 'b.jpg', 'c.jpg', 'e.jpg', 'd.jpg']
+    assert duplicates == ['d.jpg']
+
+
+def test_diverse_order_starts_from_the_requested_item():
+    ordered, duplicates = rcm.diverse_order(list(HASHES), HASHES, first='c.jpg')
+    assert ordered == ['c.jpg', 'b.jpg', 'a.jpg', 'e.jpg', 'd.jpg']
+    assert duplicates == ['d.jpg']
+
+
+def test_diverse_order_of_nothing():
+    assert rcm.diverse_order([], {}) == ([], [])
+
+
+# import_project_images
+
+def test_import_project_images_replaces_the_previous_upload(tmp_path):
+    sources = tmp_path / "uploads"
+    sources.mkdir()
+    png = (b'\x89PNG\r\n\x1a\n'
+           + png_chunk(b'IHDR', struct.pack('>IIBBBBB', 4, 4, 8, 2, 0, 0, 0)))
+    (sources / "first.png").write_bytes(png + b'1')
+    (sources / "second.png").write_bytes(png + b'2')
+    (sources / "third.PNG").write_bytes(png + b'3')
+    folder = tmp_path / "images" / "project1"
+    folder.mkdir(parents=True)
+    (folder / "notes.txt").write_text("kept")
+
+    summary = rcm.import_project_images(folder, [sources / "first.png", sources / "second.png"])
+    assert summary['images'] == ['main.png', 'detail-1.png']
+    summary = rcm.import_project_images(folder, [sources / "third.PNG", tmp_path / "missing.png"])
+    assert summary['images'] == ['main.png']
+    assert summary['failures'] == ['missing.png: file not found']
+    assert sorted(path.name for path in folder.iterdir()) == ['main.png', 'notes.txt']
+    assert (folder / "main.png").read_bytes() == png + b'3'
+
+
+def test_import_project_images_skips_identical_and_unknown_files(tmp_path):
+    png = b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', struct.pack('>IIBBBBB', 4, 4, 8, 2, 0, 0, 0))
+    (tmp_path / "a.png").write_bytes(png)
+    (tmp_path / "copy.png").write_bytes(png)
+    (tmp_path / "notes.png").write_bytes(b'not an image')
+    folder = tmp_path / "project"
+    folder.mkdir()
+    summary = rcm.import_project_images(
+        folder, [tmp_path / "a.png", tmp_path / "copy.png", tmp_path / "notes.png"])
+    assert summary['images'] == ['main.png']
+    assert summary['failures'] == ['copy.png: identical to a.png, skipped',
+                                   'notes.png: not a JPEG, PNG, GIF, WebP or video file']
+    assert sorted(path.name for path in folder.iterdir()) == ['main.png']
+
+
+# JobQueue
+
+@pytest.fixture
+def job_log(monkeypatch):
+    """A 'record' job kind that appends its name to a list"""
+    ran = []
+
+    def run_record_job(context, project_dir, name, wait=False):
+        if wait:
+            while True:
+                context.progress(0.5, "waiting to be cancelled")
+                time.sleep(0.01)
+        ran.append(name)
+        return {'name': name}
+
+    monkeypatch.setitem(rcm.JOB_HANDLERS, 'record', run_record_job)
+    return ran
+
+
+def test_job_queue_merges_identical_queued_jobs(tmp_path, job_log):
+    jobs = rcm.JobQueue(tmp_path, workers=1)
+    first = jobs.submit('record', {'name': 'a'}, priority=rcm.PRIORITY_LOW)
+    assert jobs.submit('record', {'name': 'a'}, priority=rcm.PRIORITY_HIGH) == first
+    assert jobs.submit('record', {'name': 'b'}) != first
+    assert jobs.jobs[first]['priority'] == rcm.PRIORITY_HIGH
+
+
+def test_job_queue_runs_the_most_urgent_job_first(tmp_path, job_log):
+    jobs = rcm.JobQueue(tmp_path, workers=1)
+    jobs.submit('record', {'name': 'low'}, priority=rcm.PRIORITY_LOW)
+    jobs.submit('record', {'name': 'normal'})
+    high = jobs.submit('record', {'name': 'high'}, priority=rcm.PRIORITY_HIGH)
+    jobs.start()
+    assert jobs.wait_idle(timeout=10)
+    jobs.shutdown(wait=True)
+    assert job_log == ['high', 'normal', 'low']
+    assert jobs.jobs[high]['status'] == 'done'
+    assert jobs.jobs[high]['result'] == {'name': 'high'}
+
+
+def test_job_queue_cancels_queued_and_running_jobs(tmp_path, job_log):
+    jobs = rcm.JobQueue(tmp_path, workers=1)
+    running = jobs.submit('record', {'name': 'slow', 'wait': True}, priority=rcm.PRIORITY_HIGH)
+    queued = jobs.submit('record', {'name': 'never'})
+    assert jobs.cancel(queued)
+    jobs.start()
+    deadline = time.monotonic() + 10
+    while jobs.jobs[running]['status'] != 'running' and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert jobs.cancel(running)
+    assert jobs.wait_idle(timeout=10)
+    jobs.shutdown(wait=True)
+    assert jobs.jobs[running]['status'] == 'cancelled'
+    assert jobs.jobs[queued]['status'] == 'cancelled'
+    assert job_log == []
+    assert not jobs.cancel(queued)
+
+
+def test_job_queue_persists_queued_jobs_and_resumes_crashed_ones(tmp_path, job_log):
+    jobs = rcm.JobQueue(tmp_path, workers=1)
+    queued = jobs.submit('record', {'name': 'queued'})
+    crashed = jobs.submit('record', {'name': 'crashed'})
+    # As if another process on this host claimed it and died
+    jobs.jobs[crashed].update(status='running', owner=f"{socket.gethostname()}:999999999:dead",
+                              updated=time.time())
+    jobs.shutdown()
+
+    reopened = rcm.JobQueue(tmp_path, workers=1)
+    assert reopened.jobs[queued]['status'] == 'queued'
+    assert reopened.jobs[crashed]['status'] == 'queued'
+    assert reopened.jobs[crashed]['resumed']
+    reopened.start()
+    assert reopened.wait_idle(timeout=10)
+    reopened.shutdown(wait=True)
+    assert sorted(job_log) == ['crashed', 'queued']
+
+
+def test_job_queue_sees_jobs_submitted_by_another_process(tmp_path, job_log):
+    jobs = rcm.JobQueue(tmp_path, workers=1)
+    other = rcm.JobQueue(tmp_path, workers=1)
+    job_id = other.submit('record', {'name': 'elsewhere'})
+    assert [job['id'] for job in jobs.snapshot()] == [job_id]
+    assert jobs.submit('record', {'name': 'elsewhere'}) == job_id
+
+
+# SiteChecker
+
+@pytest.fixture
+def checked_site(tmp_path):
+    site = tmp_path / "site"
+    (site / "images" / "p1").mkdir(parents=True)
+    (site / "index.html").write_text(
+        '<link rel="stylesheet" href="styles.css">\n'
+        '<a href="about.html#bio">About</a>\n'
+        '<a href="missing.html">Gone</a>\n'
+        '<img src="images/p1/main.jpg" srcset="images/p1/main.jpg 1x, images/p1/big.jpg 2x">\n'
+        '<div class="work-item" data-project="p1"></div>\n'
+        '<div class="work-item" data-project="p2"></div>\n'
+        '<a href="https://example.com/x.html">Elsewhere</a>\n')
+    (site / "about.html").write_text('<a href="./">Home</a>')
+    (site / "styles.css").write_text("body {\n  background: url('images/bg.png');\n}\n")
+    (site / "images" / "bg.png").write_bytes(b'x')
+    (site / "images" / "p1" / "main.jpg").write_bytes(b'x' * (rcm.GRID_IMAGE_SIZE_LIMIT + 1))
+    (site / "images" / "p1" / "big.jpg").write_bytes(b'x')
+    (site / "images" / "unused.png").write_bytes(b'x')
+    (site / "images" / "with space.png").write_bytes(b'x')
+    (site / "images" / "unused.png.gz").write_bytes(b'x')  # Compressed siblings aren't files of their own
+    (site / "old.js").write_text("")
+    (tmp_path / "admin_data").mkdir()
+    (tmp_path / "admin_data" / "projects.json").write_text('{"p1": {"folder": "p1"}}')
+    return rcm.SiteChecker(site, tmp_path, log=lambda message: None).check()
+
+
+def test_site_checker_reports_missing_references_with_their_line(checked_site):
+    assert [(item['source'], item['line'], item['resolved']) for item in checked_site['missing']] == [
+        ('index.html', 3, 'missing.html')]
+
+
+def test_site_checker_reports_work_items_without_data_or_grid_image(checked_site):
+    assert [item['problem'] for item in checked_site['problems']] == [
+        'work item p2 has no project data',
+        'work item p2 has no grid image in images/p2/']
+
+
+def test_site_checker_finds_orphans_oversized_grid_images_and_unsafe_names(checked_site):
+    assert checked_site['orphans'] == ['images/unused.png', 'images/with space.png', 'old.js']
+    assert [(item['path'], item['limit']) for item in checked_site['oversized']] == [
+        ('images/p1/main.jpg', rcm.GRID_IMAGE_SIZE_LIMIT)]
+    assert checked_site['unsafe_names'] == ['images/with space.png']
+
+
+def test_site_checker_resolves_relative_and_directory_references(tmp_path):
+    checker = rcm.SiteChecker(tmp_path)
+    checker.files = {'index.html': 1, 'docs/index.html': 1}
+    assert checker.resolve('about.html', './') == 'index.html'
+    assert checker.resolve('docs/page.html', '../images/a%20b.png?v=2') == 'images/a b.png'
+    assert checker.resolve('index.html', '/docs') == 'docs/index.html'
+
+
+# GarbageCollector
+
+@pytest.fixture
+def gc_project(tmp_path):
+    files = {
+        'index.html': '<img src="images/logo.png">',
+        'admin_data/projects.json': '{"p1": {"folder": "p1", "images": ["main.jpg"]}}',
+        'admin_data/available_works.json': '{"w": {"images": ["images/available/w.jpg"]}}',
+        'admin_data/notes.json': '{}',
+        'images/logo.png': 'logo',
+        'images/stray.png': 'stray',
+        'images/available/w.jpg': 'work',
+        'images/p1/main.jpg': 'main',
+        'images/p1/old.jpg': 'old upload',
+        'images/gone/only.jpg': 'orphan',
+    }
+    long_ago = time.time() - 2 * rcm.GC_GRACE_SECONDS
+    for rel_path, content in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        os.utime(path, (long_ago, long_ago))
+    (tmp_path / "images" / "fresh.png").write_text("importing")
+    return rcm.GarbageCollector(tmp_path, log=lambda message: None)
+
+
+def test_gc_marks_referenced_owned_and_data_files(gc_project):
+    live = gc_project.mark(gc_project.index_files())
+    assert live == {
+        'images/logo.png': 'referenced by a page',
+        'images/p1/main.jpg': 'image of p1',
+        'images/available/w.jpg': 'used by admin_data/available_works.json',
+        'admin_data/projects.json': 'content manager data',
+        'admin_data/available_works.json': 'content manager data'
+    }
+
+
+def test_gc_collect_explains_garbage_and_skips_recent_files(gc_project):
+    report = gc_project.collect()
+    assert [(item['path'], item['reason']) for item in report['candidates']] == [
+        ('admin_data/notes.json', 'not a content manager data file'),
+        ('images/gone/only.jpg', 'no project uses images/gone/'),
+        ('images/p1/old.jpg', 'not in the image list of p1'),
+        ('images/stray.png', 'not referenced by any page')]
+    assert report['recent'] == 1
+    assert report['bytes'] == len('{}orphanold uploadstray')
+    assert [item['path'] for item in gc_project.collect(scope='images/p1/')['candidates']] == [
+        'images/p1/old.jpg']
+
+
+def test_gc_sweep_moves_only_confirmed_garbage_and_undo_puts_it_back(gc_project):
+    project = gc_project.project_dir
+    report = gc_project.sweep(paths=['images/gone/only.jpg', 'images/p1/main.jpg'])
+    assert [item['path'] for item in report['candidates']] == ['images/gone/only.jpg']
+    assert not (project / "images" / "gone").exists()
+    assert (project / "images" / "p1" / "main.jpg").exists()
+    assert (project / rcm.QUARANTINE_DIR / report['sweep_id'] / "files" / "images" / "gone"
+            / "only.jpg").read_text() == 'orphan'
+    assert gc_project.collect()['quarantined_bytes'] == len('orphan')
+
+    result = gc_project.undo()
+    assert result == {'sweep_id': report['sweep_id'], 'restored': ['images/gone/only.jpg'],
+                      'conflicts': []}
+    assert (project / "images" / "gone" / "only.jpg").read_text() == 'orphan'
+    assert gc_project.list_sweeps() == []
+
+
+def test_gc_undo_keeps_files_whose_name_was_reused(gc_project):
+    report = gc_project.sweep()
+    (gc_project.project_dir / "images" / "stray.png").write_text("new upload")
+    result = gc_project.undo(report['sweep_id'])
+    assert result['conflicts'] == ['images/stray.png']
+    assert (gc_project.project_dir / "images" / "stray.png").read_text() == "new upload"
+    assert gc_project.purge() >= len('stray')
+    assert not (gc_project.project_dir / rcm.QUARANTINE_DIR).exists()
+    with pytest.raises(ValueError):
+        gc_project.undo()
+
+
+# import_file
+
+def test_import_file_copies_hashes_and_catalogs_in_one_read(tmp_path):
+    data = (b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', struct.pack('>IIBBBBB', 30, 20, 8, 2, 0, 0, 0))
+            + bytes(3 * 1024 * 1024))
+    source = tmp_path / "upload.png"
+    source.write_bytes(data)
+    os.utime(source, (1_600_000_000, 1_600_000_000))
+
+    result = rcm.import_file(source, tmp_path / "main.png", rel_path="images/p1/main.png")
+    assert (tmp_path / "main.png").read_bytes() == data
+    assert result['sha256'] == hashlib.sha256(data).hexdigest()
+    assert result['size'] == len(data)
+    assert result['format'] == 'png'
+    assert result['entry']['path'] == "images/p1/main.png"
+    assert (result['entry']['width'], result['entry']['height']) == (30, 20)
+    assert (tmp_path / "main.png").stat().st_mtime == 1_600_000_000
+
+
+def test_import_file_streams_files_that_cannot_be_mapped(tmp_path):
+    (tmp_path / "empty.jpg").write_bytes(b'')
+    result = rcm.import_file(tmp_path / "empty.jpg", tmp_path / "copy.jpg")
+    assert result['sha256'] == hashlib.sha256(b'').hexdigest()
+    assert result['format'] == 'unknown'
+    assert result['entry']['path'] == 'copy.jpg'
+
+
+def test_import_file_leaves_the_old_file_and_no_temporary_when_it_fails(tmp_path, monkeypatch):
+    (tmp_path / "new.jpg").write_bytes(b'new')
+    (tmp_path / "main.jpg").write_bytes(b'old')
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(rcm, 'catalog_image', fail)
+    with pytest.raises(OSError):
+        rcm.import_file(tmp_path / "new.jpg", tmp_path / "main.jpg")
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['main.jpg', 'new.jpg']
+    assert (tmp_path / "main.jpg").read_bytes() == b'old'
+
+
+# parse_price and AvailableWorksStore
+
+@pytest.mark.parametrize('text, price', [
+    ('1200', 1200), ('$1,200.00', 1200), (' $950.5 ', 950.5), ('19.999', 20.0), ('', None),
+    (None, None), (300, 300)])
+def test_parse_price_accepts_what_people_type(text, price):
+    assert rcm.parse_price(text) == price
+
+
+@pytest.mark.parametrize('text', ['ask me', '-5', '$1.2.3'])
+def test_parse_price_rejects_non_prices(text):
+    with pytest.raises(ValueError):
+        rcm.parse_price(text)
+
+
+def test_format_price():
+    assert rcm.format_price(1200) == "$1,200"
+    assert rcm.format_price(950.5) == "$950.50"
+    assert rcm.format_price(None) == "Price on request"
+
+
+def test_available_works_store_indexes_by_status_and_price(tmp_path):
+    store = rcm.AvailableWorksStore(tmp_path)
+    cheap = store.add(title="Small Study", price="$300")
+    dear = store.add(title="Large Canvas", price="4,500")
+    unpriced = store.add(title="Commission")
+    sold = store.add(title="Small Study", price=800, status="Sold")
+    assert sold == "small-study-2"
+    assert store.works[sold]['status'] == 'sold'
+
+    assert [work['id'] for work in store.listing()] == [cheap, dear, unpriced, sold]
+    assert [work['id'] for work in store.listing(['sold'])] == [sold]
+    assert [work['id'] for work in store.in_price_range(300, 800)] == [cheap, sold]
+    assert [work['id'] for work in store.in_price_range(low=1000)] == [dear]
+
+    store.update(dear, status='on hold', price='')
+    assert [work['id'] for work in store.listing(['on hold'])] == [dear]
+    assert [work['id'] for work in store.in_price_range()] == [cheap, sold]
+
+    reopened = rcm.AvailableWorksStore(tmp_path)
+    assert reopened.works == store.works
+    assert reopened.by_price == store.by_price
+
+
+def test_available_works_store_validates_before_saving(tmp_path):
+    store = rcm.AvailableWorksStore(tmp_path)
+    work_id = store.add(title="Study", price=100)
+    for fields in ({'title': '  '}, {'status': 'lost'}, {'price': 'free'}, {'frame': 'oak'}):
+        with pytest.raises(ValueError):
+            store.update(work_id, **fields)
+    assert rcm.AvailableWorksStore(tmp_path).works[work_id]['title'] == "Study"
+    with pytest.raises(ValueError):
+        store.update('nothing', title="x")
+    store.delete(work_id)
+    assert rcm.AvailableWorksStore(tmp_path).works == {}
+
+
+# parse_cv_entry and CVStore
+
+@pytest.mark.parametrize('line, entry', [
+    ('2025 - ARTSWA Public Artist Roster',
+     {'years': '2025', 'start': 2025, 'end': 2025, 'text': 'ARTSWA Public Artist Roster'}),
+    ('2012-present - Studio member',
+     {'years': '2012-present', 'start': 2012, 'end': None, 'text': 'Studio member'}),
+    ('2018 – 2020 (Seattle) - Residency',
+     {'years': '2018 – 2020 (Seattle)', 'start': 2018, 'end': 2020, 'text': 'Residency'}),
+    ('Self-taught - no dates',
+     {'years': '', 'start': None, 'end': None, 'text': 'Self-taught - no dates'}),
+])
+def test_parse_cv_entry(line, entry):
+    assert rcm.parse_cv_entry(line) == entry
+    assert rcm.cv_entry_line(entry) == line.strip()
+
+
+ABOUT_PAGE = """<div class="bio-text">
+    <p>First   paragraph.</p>
+    <p>Second &amp; last.</p>
+</div>
+<div class="cv-section">
+    <h2>Exhibitions</h2>
+    <ul class="cv-list">
+        <li><strong>2020</strong> - Group show</li>
+        <li>Ongoing project</li>
+    </ul>
+</div>
+"""
+
+
+def test_cv_store_reads_about_html_until_something_is_saved(tmp_path):
+    (tmp_path / "about.html").write_text(ABOUT_PAGE)
+    store = rcm.CVStore(tmp_path)
+    assert not store.stored
+    assert store.bio == ['First paragraph.', 'Second & last.']
+    assert store.sections == [{'id': 'exhibitions', 'title': 'Exhibitions', 'entries': [
+        {'years': '2020', 'start': 2020, 'end': 2020, 'text': 'Group show'},
+        {'years': '', 'start': None, 'end': None, 'text': 'Ongoing project'}]}]
+
+    store.set_bio("One\n\nTwo\nlines")
+    reopened = rcm.CVStore(tmp_path)
+    assert reopened.stored
+    assert reopened.bio == ['One', 'Two lines']
+    assert reopened.sections == store.sections
+
+
+def test_cv_store_sets_and_removes_sections_and_indexes_years(tmp_path):
+    store = rcm.CVStore(tmp_path)
+    store.set_section("Residencies", "2018-2020 - Long stay\n\n2019 - Short stay\n")
+    store.set_section("Awards", f"{datetime.now().year - 1}-present - Ongoing grant")
+    assert [section['id'] for section in store.sections] == ['residencies', 'awards']
+    assert [entry['text'] for _, entry in store.by_year[2019]] == ['Long stay', 'Short stay']
+    assert [section_id for section_id, _ in store.by_year[datetime.now().year]] == ['awards']
+
+    store.set_section("residencies", "2021 - Replaced")
+    assert [entry['text'] for entry in store.section("Residencies")['entries']] == ['Replaced']
+    store.set_section("Awards", "")
+    assert [section['title'] for section in rcm.CVStore(tmp_path).sections] == ['Residencies']
+
+
+def test_render_cv_section_escapes_text():
+    html = rcm.render_cv_section({'title': 'A & B', 'entries': [
+        {'years': '2020', 'text': '<Untitled>'}, {'years': '', 'text': 'Plain'}]}, indent='')
+    assert '<h2>A &amp; B</h2>' in html
+    assert '<li><strong>2020</strong> - &lt;Untitled&gt;</li>' in html
+    assert '<li>Plain</li>' in html
+
+
+# UpdatesStore pagination and feeds
+
+def test_updates_store_pages_count_from_the_oldest_update(tmp_path):
+    store = rcm.UpdatesStore(tmp_path)
+    for day in range(1, 8):
+        store.add(f"Update {day}", f"2024-03-{day:02d}", "")
+    pages = store.pages(per_page=3)
+    assert [[record['title'] for record in page] for page in pages] == [
+        ['Update 1', 'Update 2', 'Update 3'], ['Update 4', 'Update 5', 'Update 6'], ['Update 7']]
+
+    # A new update only changes the newest page
+    store.add("Update 8", "2024-03-08", "")
+    assert store.pages(per_page=3)[:2] == pages[:2]
+    assert [rcm.update_page_name(number, 3) for number in (1, 2, 3)] == [
+        'updates-page-1.html', 'updates-page-2.html', 'updates.html']
+    assert rcm.UpdatesStore(tmp_path / "empty").pages() == [[]]
+
+
+def test_update_listing_links_newer_and_older_pages():
+    records = [{'id': f"u{i}", 'title': f"U{i}", 'date': '', 'content': '', 'link': ''}
+               for i in range(2)]
+    middle = rcm.render_update_listing(records, 2, 3, indent='')
+    assert middle.index('U1') < middle.index('U0')
+    assert '<a href="updates.html">&larr; Newer</a>' in middle
+    assert '<a href="updates-page-1.html">Older &rarr;</a>' in middle
+    assert 'updates-pagination' not in rcm.render_update_listing(records, 1, 1, indent='')
+
+
+def test_updates_store_keeps_hand_written_titles_until_the_first_save(tmp_path):
+    (tmp_path / "updates.html").write_text(
+        '<div class="update-item">\n<h3>Newest</h3></div>\n<div class="update-item"><h3>Older &amp; wiser</h3></div>')
+    store = rcm.UpdatesStore(tmp_path)
+    assert [record['title'] for record in store.newest_first()] == ['Newest', 'Older & wiser']
+    store.add("Brand new", "", "")
+    assert [record['title'] for record in rcm.UpdatesStore(tmp_path).newest_first()] == [
+        'Brand new', 'Newest', 'Older & wiser']
+
+
+def test_update_feeds_describe_every_update(tmp_path):
+    store = rcm.UpdatesStore(tmp_path)
+    store.add("Show <opening>", "2024-05-01", "Come along & see", "https://example.com/show")
+    store.add("Undated note", "", "Plain")
+    records = store.newest_first()
+    site = "https://example.org/"
+
+    rss = rcm.render_rss_feed(records, site)
+    assert '<title>Show &lt;opening&gt;</title>' in rss
+    assert '<pubDate>Wed, 01 May 2024 00:00:00 +0000</pubDate>' in rss
+    assert '<guid isPermaLink="true">https://example.org/update-show-opening.html</guid>' in rss
+
+    atom = rcm.render_atom_feed(records, site)
+    assert '<updated>2024-05-01T00:00:00Z</updated>' in atom
+    assert '<summary>Come along &amp; see</summary>' in atom
+
+    feed = json.loads(rcm.render_json_feed(records, site))
+    # Undated updates sort before dated ones
+    assert [item['title'] for item in feed['items']] == ['Show <opening>', 'Undated note']
+    assert feed['items'][0]['external_url'] == "https://example.com/show"
+    assert 'external_url' not in feed['items'][1]
+
+
+# render_project_page
+
+PROJECT_TEMPLATE = """<html><head>
+</head>
+<body>
+                            <!-- PROJECT IMAGE START -->
+                            <!-- PROJECT IMAGE END -->
+                    <!-- PROJECT GALLERY START -->
+                    <!-- PROJECT GALLERY END -->
+</body></html>
+"""
+
+
+def test_render_project_page_preloads_the_hero_and_lazy_loads_the_gallery():
+    page = rcm.render_project_page(PROJECT_TEMPLATE, 'p1', 'p1', 'Tide & Time', 'main.jpg',
+                                   ['detail-1.jpg'], {'main.jpg': (1200, 900)})
+    assert '<body data-project="p1">' in page
+    assert '<link rel="preload" as="fetch" href="projects/p1.json" crossorigin>' in page
+    assert '<link rel="preload" as="image" href="images/p1/main.jpg" fetchpriority="high">' in page
+    assert ('<img src="images/p1/main.jpg" alt="Tide &amp; Time - Main Image" width="1200" '
+            'height="900" fetchpriority="high">') in page
+    assert ('<img src="images/p1/detail-1.jpg" alt="Tide &amp; Time - detail-1" '
+            'loading="lazy" decoding="async" class="project-image">') in page
+
+
+def test_render_project_page_serves_the_hero_from_scaled_copies():
+    hero = [['images/p1/hero/800.jpg', 800], ['images/p1/hero/1600.jpg', 1600]]
+    page = rcm.render_project_page(PROJECT_TEMPLATE, 'p1', 'p1', 'Title', 'main.png', [],
+                                   {'main.png': (3000, 2000)}, hero)
+    srcset = 'images/p1/hero/800.jpg 800w, images/p1/hero/1600.jpg 1600w'
+    assert (f'<link rel="preload" as="image" href="images/p1/hero/1600.jpg" imagesrcset="{srcset}" '
+            f'imagesizes="{rcm.HERO_SIZES_ATTRIBUTE}" fetchpriority="high">') in page
+    assert f'<img src="images/p1/hero/1600.jpg" srcset="{srcset}" sizes="{rcm.HERO_SIZES_ATTRIBUTE}"' in page
+    assert 'main.png' not in page
+
+
+def test_render_project_page_without_images_keeps_the_template():
+    page = rcm.render_project_page(PROJECT_TEMPLATE, 'p1', 'p1', 'Title', None, [], {})
+    assert 'as="image"' not in page
+    assert '<img' not in page
+
+
+@pytest.mark.skipif(rcm.Image is None, reason="needs Pillow")
+def test_render_hero_images_never_scales_up(tmp_path):
+    rcm.Image.new('RGBA', (1000, 500), (255, 0, 0, 128)).save(tmp_path / "main.png")
+    images = rcm.render_hero_images(tmp_path / "main.png")
+    assert sorted(images) == [800, 1000]
+    with rcm.Image.open(io.BytesIO(images[800])) as img:
+        assert (img.format, img.size, img.mode) == ('JPEG', (800, 400), 'RGB')
+
+
+# ContentHistory
+
+@pytest.fixture
+def history_project(tmp_path):
+    (tmp_path / "admin_data").mkdir()
+    (tmp_path / "images" / "p1").mkdir(parents=True)
+    return tmp_path
+
+
+def save_projects(project_dir, projects):
+    rcm.write_if_changed(project_dir / "admin_data" / "projects.json", json.dumps(projects))
+
+
+def test_content_history_records_only_what_changed(history_project):
+    history = rcm.ContentHistory(history_project, log=lambda message: None)
+    save_projects(history_project, {'p1': {'title': 'First'}})
+    (history_project / "images" / "p1" / "main.jpg").write_bytes(b'one')
+    first = history.snapshot("start")
+    assert history.snapshot("nothing new") is None
+
+    save_projects(history_project, {'p1': {'title': 'Renamed'}, 'p2': {'title': 'New'}})
+    second = history.snapshot("edit")
+    record = history.read_version(second)
+    assert list(record['changed']) == ['admin_data/projects.json']
+    assert 'tree' not in record
+
+    diff = history.diff(second)
+    assert diff['from'] == first
+    assert diff['records']['admin_data/projects.json'] == {
+        'added': ['p2'], 'removed': [], 'changed': {'p1': ['title']}}
+    assert history.describe(diff)[1:] == ['  admin_data/projects.json: added p2',
+                                          '  admin_data/projects.json: changed p1 (title)']
+    assert [version['message'] for version in history.versions()] == ['edit', 'start']
+
+
+def test_content_history_stores_images_as_links_and_restores_across_a_checkpoint(history_project,
+                                                                                 monkeypatch):
+    monkeypatch.setattr(rcm, 'HISTORY_CHECKPOINT_INTERVAL', 2)
+    history = rcm.ContentHistory(history_project, log=lambda message: None)
+    image = history_project / "images" / "p1" / "main.jpg"
+    source = history_project / "upload.jpg"
+    source.write_bytes(b'first version')
+    rcm.import_file(source, image)
+    save_projects(history_project, {'p1': {'title': 'First'}})
+    first = history.snapshot("start")
+    sha = hashlib.sha256(b'first version').hexdigest()
+    assert history.blob_path(sha).stat().st_ino == image.stat().st_ino
+
+    # Replacing the image must not touch the linked blob
+    source.write_bytes(b'second version')
+    rcm.import_file(source, image)
+    (history_project / "images" / "p1" / "detail-1.jpg").write_bytes(b'detail')
+    save_projects(history_project, {'p1': {'title': 'Second'}})
+    history.snapshot("second")
+    save_projects(history_project, {})
+    third = history.snapshot("third")
+    assert 'tree' in history.read_version(third)
+    assert history.blob_path(sha).read_bytes() == b'first version'
+
+    result = history.restore(first)
+    assert result['written'] == ['admin_data/projects.json', 'images/p1/main.jpg']
+    assert result['deleted'] == ['images/p1/detail-1.jpg']
+    assert result['damaged'] == []
+    assert image.read_bytes() == b'first version'
+    assert json.loads((history_project / "admin_data" / "projects.json").read_text()) == {
+        'p1': {'title': 'First'}}
+    assert history.tree(result['new_version']) == history.tree(first)
+
+    # The restore itself can be undone
+    history.restore(third)
+    assert image.read_bytes() == b'second version'
+    assert (history_project / "images" / "p1" / "detail-1.jpg").read_bytes() == b'detail'
+
+
+# grid_crop_box
+
+def busy_image(size, busy_box):
+    """A flat grey image with random noise inside busy_box"""
+    img = rcm.Image.new('RGB', size, (128, 128, 128))
+    noise = random.Random(1)
+    left, top, right, bottom = busy_box
+    for x in range(left, right):
+        for y in range(top, bottom):
+            img.putpixel((x, y), tuple(noise.randrange(256) for _ in range(3)))
+    return img
+
+
+@pytest.mark.skipif(rcm.Image is None, reason="needs Pillow")
+@pytest.mark.parametrize('size, focal_point, box', [
+    ((400, 200), [0.5, 0.5], (100, 0, 300, 200)),
+    ((400, 200), [0.9, 0.5], (200, 0, 400, 200)),
+    ((400, 200), [0.0, 1.0], (0, 0, 200, 200)),
+    ((200, 400), [0.5, 0.3], (0, 20, 200, 220)),
+])
+def test_grid_crop_box_centres_on_the_focal_point_within_the_image(size, focal_point, box):
+    assert rcm.grid_crop_box(rcm.Image.new('RGB', size), focal_point) == box
+
+
+@pytest.mark.skipif(rcm.Image is None, reason="needs Pillow")
+@pytest.mark.parametrize('size, busy_box', [
+    ((400, 200), (240, 0, 400, 200)),
+    ((400, 200), (0, 0, 160, 200)),
+    ((200, 400), (0, 0, 200, 150)),
+    ((200, 400), (0, 150, 200, 250)),
+])
+def test_grid_crop_box_without_a_focal_point_keeps_the_busiest_part(size, busy_box):
+    left, top, right, bottom = rcm.grid_crop_box(busy_image(size, busy_box))
+    assert right - left == bottom - top == min(size)
+    assert left <= busy_box[0] and top <= busy_box[1]
+    assert right >= busy_box[2] and bottom >= busy_box[3]
+
+
+@pytest.mark.skipif(rcm.Image is None, reason="needs Pillow")
+def test_grid_crop_box_of_a_square_is_the_whole_image():
+    assert rcm.grid_crop_box(rcm.Image.new('RGB', (300, 300))) == (0, 0, 300, 300)
+
+
+def test_grid_tile_report_names_projects_without_a_high_density_tile(tmp_path):
+    logged = []
+    builder = rcm.SiteBuilder(tmp_path, log=logged.append)
+    row = {'source': 'images/p/main.jpg', 'source_bytes': 1000, 'crop': [0, 0, 1, 1],
+           'focal_point': None}
+    totals = builder.write_grid_tile_report({
+        'sharp': dict(row, tile_bytes={'480': 10, '960': 30}),
+        'small': dict(row, tile_bytes={'480': 10}),
+        'medium': dict(row, tile_bytes={'480': 10, '700': 20})})
+    assert totals == {'source_bytes': 3000, 'smallest_tile_bytes': 30, 'largest_tile_bytes': 60}
+    report = json.loads((tmp_path / rcm.BUILD_STATE_DIR / "grid_tile_report.json").read_text())
+    assert report['low_resolution'] == ['medium', 'small']
+    assert logged[-1].endswith(": medium, small")
+
+
+# Workspace
+
+def make_site(path):
+    path.mkdir(parents=True)
+    (path / "index.html").write_text("<html></html>")
+    return path
+
+
+def test_workspace_lists_sites_relative_to_its_folder(tmp_path):
+    workspace = rcm.Workspace(tmp_path / "workspace.json", log=lambda message: None)
+    assert workspace.add(make_site(tmp_path / "sites" / "main")) == "main"
+    assert workspace.add(make_site(tmp_path / "other"), name="second") == "second"
+    assert workspace.add(tmp_path / "sites" / "main") == "main"  # Adding again is harmless
+
+    reopened = rcm.Workspace(tmp_path / "workspace.json", log=lambda message: None)
+    assert reopened.sites == {'main': 'sites/main', 'second': 'other'}
+    assert reopened.site_dirs() == {'main': (tmp_path / "sites" / "main").resolve(),
+                                    'second': (tmp_path / "other").resolve()}
+    assert reopened.last_built('main') is None
+
+    reopened.remove('second')
+    assert list(rcm.Workspace(tmp_path / "workspace.json").sites) == ['main']
+
+
+def test_workspace_rejects_unknown_and_clashing_sites(tmp_path):
+    workspace = rcm.Workspace(tmp_path / "workspace.json", log=lambda message: None)
+    workspace.add(make_site(tmp_path / "a" / "site"))
+    with pytest.raises(ValueError, match="already has a site called site"):
+        workspace.add(make_site(tmp_path / "b" / "site"))
+    with pytest.raises(ValueError, match="no index.html"):
+        workspace.add(tmp_path)
+    with pytest.raises(ValueError, match="Not in the workspace: nope"):
+        workspace.site_dirs(['site', 'nope'])
+    with pytest.raises(ValueError):
+        workspace.remove('nope')
+
+
+def test_workspace_builds_every_site_on_one_pool_with_a_shared_cache(tmp_path, monkeypatch):
+    built = []
+
+    def run_build_job(context, project_dir):
+        built.append((Path(project_dir).name, context.cache_dir))
+        return {'site': Path(project_dir).name}
+
+    monkeypatch.setitem(rcm.JOB_HANDLERS, 'build', run_build_job)
+    workspace = rcm.Workspace(tmp_path / "workspace.json", log=lambda message: None)
+    workspace.add(make_site(tmp_path / "one"))
+    workspace.add(make_site(tmp_path / "two"))
+
+    jobs = workspace.build(workers=2)
+    assert {name: job['status'] for name, job in jobs.items()} == {'one': 'done', 'two': 'done'}
+    assert jobs['two']['result'] == {'site': 'two'}
+    assert jobs['one']['description'] == "one: Build site"
+    assert sorted(built) == [('one', workspace.cache_dir), ('two', workspace.cache_dir)]
+    assert (tmp_path / rcm.BUILD_STATE_DIR / "job_queue.json").exists()
+    assert workspace.build(['one'])['one']['status'] == 'done'